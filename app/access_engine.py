@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+In-process vehicle access decision engine.
+
+The decision loop in main.py and the web api routes share one AccessEngine,
+so a tag read is validated and recorded without any loopback http request.
+"""
+
+import logging
+import time
+
+from .validation import Validator
+from .access_rules import access_time, DATETIME_FORMAT
+from .access_matrix import AccessMatrix
+
+logger = logging.getLogger("app")
+
+# transaction flags saved in Transactions table and published over mqtt
+TR_ACC1 = "Authorized"
+TR_BLK1 = "Blocked"
+TR_NDB1 = "Unauthorized"
+
+# web api routes served by the engine
+API_VEHICLE_ACCESS = "vehicle_access"
+API_SAVE_TRANSACTION = "save_transaction"
+API_SAVE_TRANSACTION_LIMIT = "save_transaction_withLimit"
+API_FLEET_ACCESS = "fleet_access"
+
+API_ROUTES = (
+    API_VEHICLE_ACCESS,
+    API_SAVE_TRANSACTION,
+    API_SAVE_TRANSACTION_LIMIT,
+    API_FLEET_ACCESS,
+)
+
+
+class AccessEngine:
+    """Vehicle access decision for a scanned tag.
+
+    Args:
+        database: Database object used for UserList lookup and transactions
+        validator: Validator object, created if not given
+        max_trans_count: int, transaction limit, defaults to database setting
+    """
+
+    def __init__(self, database, validator=None, max_trans_count=None):
+        self._db = database
+        self._validator = validator if validator is not None else Validator()
+        if max_trans_count is None:
+            max_trans_count = database._max_trans_count
+        self._max_trans_count = max_trans_count
+        # AccessMatrix of the fleet, rebuilt when tag index changes
+        self._matrix = None
+
+    @property
+    def database(self):
+        return self._db
+
+    @property
+    def validator(self):
+        return self._validator
+
+    def lookup(self, tag_id):
+        """Returns UserList row of the tag as list, None if tag is not in database
+        """
+        rows = self._db.vehicle_access(tag_id)
+        if rows:
+            return list(rows[0])
+        return None
+
+    def decide(self, tag_id, now=None):
+        """Take access decision for the tag.
+
+        Args:
+            now: AccessTime snapshot from access_rules.access_time(), None current time
+
+        Returns:
+            (tr_flag, row): tr_flag is one of TR_ACC1, TR_BLK1, TR_NDB1
+                            row is UserList row, None when tag is not in database
+        """
+        row = self.lookup(tag_id)
+        if row is None:
+            return TR_NDB1, None
+
+        rule = self._db.access_rule(tag_id)
+        if rule is not None:
+            if now is None:
+                now = access_time()
+            allowed = rule.evaluate(now)
+        else:
+            allowed = self._validator.run(row)
+
+        if allowed:
+            return TR_ACC1, row
+
+        return TR_BLK1, row
+
+    def _fleet_matrix(self) -> AccessMatrix:
+        matrix = self._matrix
+        version, tag_ids, rules = self._db.access_rules()
+        if matrix is None or matrix.version != version:
+            matrix = AccessMatrix(tag_ids, rules, version)
+            self._matrix = matrix
+        return matrix
+
+    def fleet_access(self, at=None):
+        """Access state of all vehicles at one time, evaluated in one pass.
+
+        Args:
+            at: None current time, epoch seconds or "%Y-%m-%d %H:%M:%S" local time
+
+        Returns:
+            .. code:: python
+                {
+                    "time": "2022-06-16 10:00:00",
+                    "total": int,
+                    "allowed": [tag_id, ...],
+                    "denied": [tag_id, ...],
+                }
+        """
+        if isinstance(at, str):
+            at = time.mktime(time.strptime(at, DATETIME_FORMAT))
+        if at is None:
+            at = time.time()
+
+        matrix = self._fleet_matrix()
+        access = matrix.evaluate(access_time(at))
+
+        allowed = []
+        denied = []
+        for tag_id, granted in zip(matrix.tag_ids, access.tolist()):
+            if granted:
+                allowed.append(tag_id)
+            else:
+                denied.append(tag_id)
+
+        return {
+            "time": time.strftime(DATETIME_FORMAT, time.localtime(at)),
+            "total": len(matrix),
+            "allowed": allowed,
+            "denied": denied,
+        }
+
+    def record(self, tag_id, ant_name, tr_flag):
+        """Save transaction of the tag in rotating transaction table"""
+        self._db.save_transaction_withLimit(
+            tag_id, ant_name, tr_flag, self._max_trans_count
+        )
+
+    ####################################################################################
+    ####    WEB API
+    ####################################################################################
+
+    def handle_api(self, route, body=None, frame=None):
+        """Thin web api wrapper over the engine.
+
+        Args:
+            route: one of API_ROUTES
+            body: str, raw request body (tag id for vehicle_access)
+            frame: dict, json request body for save_transaction*,
+                   optional {"at": "%Y-%m-%d %H:%M:%S"} for fleet_access
+
+        Returns:
+            (response, status_code)
+        """
+        if route == API_VEHICLE_ACCESS:
+            row = self.lookup(body)
+            if row is None:
+                # 201: tag is not available in reader memory database
+                return {"data": []}, 201
+            return {"data": row}, 200
+
+        if route in (API_SAVE_TRANSACTION, API_SAVE_TRANSACTION_LIMIT):
+            try:
+                tag_id = frame["tagid"]
+                ant_name = frame["ANT"]
+                tr_flag = frame["tr_flag"]
+            except (KeyError, TypeError):
+                return {"status": "error", "reason": "invalid data"}, 400
+
+            if route == API_SAVE_TRANSACTION:
+                self._db.save_transaction(tag_id, ant_name, tr_flag)
+            else:
+                limit = frame.get("limit", self._max_trans_count)
+                self._db.save_transaction_withLimit(tag_id, ant_name, tr_flag, limit)
+            return {"status": "success"}, 200
+
+        if route == API_FLEET_ACCESS:
+            at = frame.get("at") if isinstance(frame, dict) else None
+            try:
+                return self.fleet_access(at), 200
+            except (ValueError, OverflowError):
+                return {"status": "error", "reason": "invalid time"}, 400
+
+        return {"status": "error", "reason": "unknown route"}, 404
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Export access state of all vehicles at one time to a .csv file.
+
+usage: python3 -m app.access_export [--at "YYYY-MM-DD HH:MM:SS"] [--output FILE]
+"""
+
+import argparse
+import csv
+
+from .settings import CONFIG_TOML_FILE
+from .utils import read_local_config
+from .database import Database
+from .access_engine import AccessEngine
+
+APP_DESC = """
+Export vehicle access state of the fleet at a given time (default now).
+"""
+
+
+def export(engine, output, at=None):
+    """Write tag id and access state of every vehicle, returns fleet_access result"""
+    result = engine.fleet_access(at)
+    with open(output, "w") as csvfile:
+        writer = csv.writer(csvfile, dialect="excel-tab", quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(("TAG_ID", "ACCESS", "TIME"))
+        for tag_id in result["allowed"]:
+            writer.writerow((tag_id, 1, result["time"]))
+        for tag_id in result["denied"]:
+            writer.writerow((tag_id, 0, result["time"]))
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=APP_DESC, prog="access_export")
+    ap.add_argument("--at", help='local time "YYYY-MM-DD HH:MM:SS", default now')
+    ap.add_argument("--output", default="access_state.csv", help="csv file")
+    args = ap.parse_args()
+
+    settings = read_local_config(CONFIG_TOML_FILE)
+    engine = AccessEngine(Database(settings["database"]))
+
+    result = export(engine, args.output, args.at)
+    print(
+        "{} vehicles at {}, {} allowed, {} denied -> {}".format(
+            result["total"], result["time"], len(result["allowed"]),
+            len(result["denied"]), args.output,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
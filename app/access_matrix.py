@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Columnar access state of the whole fleet.
+
+Compiled AccessRule of every vehicle is stored in numpy columns, access of
+all vehicles at one time is evaluated in a single vectorized pass. Rules
+without window (always / never access) are stored as empty windows, an empty
+blocking window always gives access, an empty access window never does.
+"""
+
+import numpy as np
+
+from .access_rules import AccessRule, ALWAYS, access_time
+
+# empty window, lower bound greater than upper bound
+_EMPTY = (1, 0)
+
+
+class AccessMatrix:
+    """Access and block windows of the fleet.
+
+    Args:
+        tag_ids: list of tag ids
+        rules: list of AccessRule (or ALWAYS / NEVER) in order of tag_ids
+        version: version of tag index the rules are taken from
+    """
+
+    def __init__(self, tag_ids, rules, version=None):
+        self.tag_ids = list(tag_ids)
+        self.version = version
+
+        count = len(self.tag_ids)
+        self._blocking = np.zeros(count, dtype=bool)
+        self._date_from = np.empty(count, dtype=np.int64)
+        self._date_to = np.empty(count, dtype=np.int64)
+        self._time_from = np.empty(count, dtype=np.int32)
+        self._time_to = np.empty(count, dtype=np.int32)
+        self._days = np.zeros(count, dtype=np.uint8)
+
+        for idx, rule in enumerate(rules):
+            if isinstance(rule, AccessRule):
+                self._blocking[idx] = rule.blocking
+                self._date_from[idx], self._date_to[idx] = rule.date_from, rule.date_to
+                self._time_from[idx], self._time_to[idx] = rule.time_from, rule.time_to
+                self._days[idx] = rule.days
+            else:
+                self._blocking[idx] = rule is ALWAYS
+                self._date_from[idx], self._date_to[idx] = _EMPTY
+                self._time_from[idx], self._time_to[idx] = _EMPTY
+
+    def __len__(self):
+        return len(self.tag_ids)
+
+    def evaluate(self, now=None) -> np.ndarray:
+        """Returns bool array, True where vehicle has access at now
+
+        Args:
+            now: AccessTime snapshot from access_rules.access_time(), None current time
+        """
+        if now is None:
+            now = access_time()
+
+        inside = (
+            (self._date_from <= now.date_key)
+            & (now.date_key <= self._date_to)
+            & (self._time_from <= now.time_key)
+            & (now.time_key <= self._time_to)
+            & ((self._days & now.day_bit) != 0)
+        )
+        return inside != self._blocking
+
+    def allowed(self, now=None) -> list:
+        """Returns tag ids having access at now"""
+        access = self.evaluate(now)
+        return [self.tag_ids[idx] for idx in np.flatnonzero(access)]
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Precompiled access rules of UserList rows.
+
+Access and block windows of a row are parsed once into integers, a tag is
+then validated against one snapshot of the current time with integer
+comparisons only. Result is the same as Validator.run() of the row:
+
+    - dates are compared with second resolution, "0000-00-00" is 0001-01-01
+      and "00:00:00" in to date is 23:59:59
+    - times are compared as time of day
+    - week days "A" means all days, else day 1 (monday) .. 7 (sunday) is
+      allowed when its digit is in the text
+    - a date or time which can not be parsed never matches
+
+Rows of the fleet share few distinct windows, compiled rules are cached and
+shared between rows.
+"""
+
+import time
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+NO_DATE = "0000-00-00 00:00:00"
+
+# UserList columns used by rules
+ACC_FROM_DATE, ACC_TO_DATE, ACC_FROM_TIME, ACC_TO_TIME, ACC_WEEK_DAY = 6, 7, 8, 9, 10
+BLK_FROM_DATE, BLK_TO_DATE, BLK_FROM_TIME, BLK_TO_TIME, BLK_WEEK_DAY = 11, 12, 13, 14, 15
+
+# empty range, lower bound greater than upper bound
+_NEVER = (1, 0)
+
+# snapshot of current local time
+#   date_key: int, datetime key, see _datetime_key()
+#   time_key: int, time of day key, see _time_key()
+#   day_bit: int, bit of week day, monday 1 << 1 .. sunday 1 << 7
+AccessTime = namedtuple("AccessTime", "date_key time_key day_bit")
+
+
+def _time_key(hour, minute, second) -> int:
+    # strptime allows second 60 and 61, 62 per minute keeps the order of
+    # (hour, minute, second) tuples as Validator compares them
+    return (hour * 60 + minute) * 62 + second
+
+
+def _datetime_key(tm) -> int:
+    days = date(tm.tm_year, tm.tm_mon, tm.tm_mday).toordinal()
+    return days * 24 * 60 * 62 + _time_key(tm.tm_hour, tm.tm_min, tm.tm_sec)
+
+
+def access_time(timestamp=None) -> AccessTime:
+    """Returns AccessTime of timestamp (epoch seconds), None for now"""
+    tm = time.localtime(timestamp)
+    return AccessTime(
+        _datetime_key(tm),
+        _time_key(tm.tm_hour, tm.tm_min, tm.tm_sec),
+        1 << (tm.tm_wday + 1),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _date_range(fromdate, todate) -> tuple:
+    try:
+        fromdate = fromdate.replace("0000-00-00", "0001-01-01")
+        todate = todate.replace("00:00:00", "23:59:59")
+        todate = todate.replace("0000-00-00", "0001-01-01")
+        return (
+            _datetime_key(time.strptime(fromdate, DATETIME_FORMAT)),
+            _datetime_key(time.strptime(todate, DATETIME_FORMAT)),
+        )
+    except Exception:
+        return _NEVER
+
+
+@lru_cache(maxsize=1024)
+def _time_range(from_time, to_time) -> tuple:
+    try:
+        # any valid date, only time of day is compared
+        start = time.strptime("2000-01-01 {}".format(from_time), DATETIME_FORMAT)
+        end = time.strptime("2000-01-01 {}".format(to_time), DATETIME_FORMAT)
+        return (
+            _time_key(start.tm_hour, start.tm_min, start.tm_sec),
+            _time_key(end.tm_hour, end.tm_min, end.tm_sec),
+        )
+    except Exception:
+        return _NEVER
+
+
+@lru_cache(maxsize=256)
+def _day_mask(week_day) -> int:
+    try:
+        mask = 0
+        for day in range(1, 8):
+            if "A" in week_day or str(day) in week_day:
+                mask |= 1 << day
+        return mask
+    except Exception:
+        return 0
+
+
+class AccessRule:
+    """Compiled access or block window of a UserList row.
+
+    Args:
+        blocking: bool, window blocks the vehicle instead of allowing it
+        dates: (from, to) datetime keys
+        times: (from, to) time of day keys
+        days: int, week day bit mask
+    """
+    __slots__ = ("blocking", "date_from", "date_to", "time_from", "time_to", "days")
+
+    def __init__(self, blocking, dates, times, days):
+        self.blocking = blocking
+        self.date_from, self.date_to = dates
+        self.time_from, self.time_to = times
+        self.days = days
+
+    def matches(self, now: AccessTime) -> bool:
+        """True if now is inside the window"""
+        return (
+            self.date_from <= now.date_key <= self.date_to
+            and self.time_from <= now.time_key <= self.time_to
+            and self.days & now.day_bit != 0
+        )
+
+    def evaluate(self, now: AccessTime = None) -> bool:
+        """True if vehicle has access at now, None for current time"""
+        if now is None:
+            now = access_time()
+        return self.matches(now) != self.blocking
+
+    def __repr__(self):
+        return "AccessRule(blocking={}, dates=({}, {}), times=({}, {}), days={:#x})".format(
+            self.blocking, self.date_from, self.date_to,
+            self.time_from, self.time_to, self.days,
+        )
+
+
+class _Always:
+    # access dates not given, vehicle always has access
+    __slots__ = ()
+    blocking = False
+
+    def matches(self, now):
+        return True
+
+    def evaluate(self, now=None):
+        return True
+
+    def __repr__(self):
+        return "ALWAYS"
+
+
+class _Never(_Always):
+    # row can not be validated
+    __slots__ = ()
+
+    def matches(self, now):
+        return False
+
+    def evaluate(self, now=None):
+        return False
+
+    def __repr__(self):
+        return "NEVER"
+
+
+ALWAYS = _Always()
+NEVER = _Never()
+
+
+@lru_cache(maxsize=4096)
+def _compile(windows):
+    acc_from, acc_to, acc_from_time, acc_to_time, acc_days, \
+        blk_from, blk_to, blk_from_time, blk_to_time, blk_days = windows
+
+    if acc_from == NO_DATE and acc_to == NO_DATE:
+        return ALWAYS
+
+    if blk_from == NO_DATE and blk_to == NO_DATE:
+        return AccessRule(
+            False,
+            _date_range(acc_from, acc_to),
+            _time_range(acc_from_time, acc_to_time),
+            _day_mask(acc_days),
+        )
+
+    return AccessRule(
+        True,
+        _date_range(blk_from, blk_to),
+        _time_range(blk_from_time, blk_to_time),
+        _day_mask(blk_days),
+    )
+
+
+def compile_rule(row):
+    """Returns compiled rule of UserList row, shared by rows with same windows"""
+    try:
+        if row[ACC_FROM_DATE] == NO_DATE and row[ACC_TO_DATE] == NO_DATE:
+            return ALWAYS
+        return _compile(tuple(row[ACC_FROM_DATE:BLK_WEEK_DAY + 1]))
+    except Exception:
+        # short row or unhashable values
+        return NEVER
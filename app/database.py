@@ -10,6 +10,9 @@ from logging import handlers
 from .utils import get_datetime_stamp,read_local_config
 from werkzeug.security import generate_password_hash, check_password_hash
 from .settings import PATH_FILE_LOG,CONFIG_TOML_FILE
+from .tag_index import tag_index_for, DEFAULT_BUDGET
+from .db_pool import connection_manager_for
+from .txn_writer import SPOOL_SEQ_NAME
 # from .main import TR_ACC1
 
 #DATABASE_PATH = "itekAVI.sqlite3"
@@ -35,9 +38,20 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 #handler.doRollover()
 
+
+def _text(value):
+    # values were quoted in sql text before parameters were used,
+    # keep stored text identical e.g. None is stored as 'None'
+    return str(value)
+
+
 class Database:
     VEH_BLOCK = 0
     VEH_ACCESS = 1
+    # database layout version saved in Config table
+    # 1: original tables, 2: Transactions rotated by SR_NO range
+    SCHEMA_VERSION = 2
+    SCHEMA_VERSION_NAME = "schema_version"
     def __init__(self, settings):
         # print(" database.py class Database init")
         self._db_txn = "txndata"
@@ -62,14 +76,18 @@ class Database:
         self._db_path = DB_PATH + settings["db_path"]
         self._max_trans_count = settings["max_trans_count"]
         self._max_vehicle_count = settings["max_vehicle_count"]
+        # background TransactionWriter, None writes transactions directly
+        self._txn_writer = None
        
         # localconfig = read_local_config(CONFIG_TOML_FILE)        
         # print(localconfig)
 
-        # create database
-        self._db = sqlite3.connect(self._db_path, check_same_thread=False)
-        self._cursor = self._db.cursor()
+        # long lived per thread connections shared by every Database object
+        # of the same database file, writes are serialized by the pool
+        self._pool = connection_manager_for(self._db_path)
 
+        # create database
+        self._pool.begin()
         try:
             self._cursor.execute(
                 """
@@ -93,6 +111,13 @@ class Database:
         except Exception:
             logger.exception("while creating %s table", self._tb_userlists)
 
+        try:
+            self._cursor.execute(
+                "CREATE INDEX IF NOT EXISTS {0}_TAG_ID ON {0} (TAG_ID)".format(self._tb_userlists)
+            )
+        except Exception:
+            logger.exception("while creating %s index", self._tb_userlists)
+
         try:
             self._cursor.execute(
                 """
@@ -150,32 +175,103 @@ class Database:
         except Exception:
             logger.exception("while creating %s table", self._tb_loginuser)
 
-        self._db.commit()
-        self._cursor.close()
+        self._pool.end()
+
+        self._migrate()
+
+        # memory resident UserList index used for vehicle access,
+        # shared with every Database object of the same database file
+        self._tag_index = tag_index_for(
+            self._db_path, settings.get("tag_index_budget", DEFAULT_BUDGET)
+        )
+        if not self._tag_index.loaded:
+            self.refresh_tag_index()
 
         # following steps are performed when RiPi is new and project is just loaded in it
         # there is no database in RiPi so 1 default login user is created in it to login for first time
         # check if database has login user 
         
 
+    def _migrate(self):
+        """upgrade database created by older application versions"""
+        try:
+            with self._pool.transaction() as cursor:
+                version = int(self._get_config(cursor, self.SCHEMA_VERSION_NAME, 1))
+                if version >= self.SCHEMA_VERSION:
+                    return
+
+                logger.info("migrate database from version {} to {}".format(version, self.SCHEMA_VERSION))
+                if version < 2:
+                    # old rotation never deleted anything, keep newest max_trans_count
+                    # transactions, after this SR_NO of kept rows is contiguous
+                    cursor.execute(
+                        "DELETE FROM {0} WHERE SR_NO < "
+                        "(SELECT SR_NO FROM {0} ORDER BY SR_NO DESC LIMIT 1 OFFSET ?)".format(self._tb_transaction),
+                        (max(self._max_trans_count - 1, 0),)
+                    )
+
+                self._set_config(cursor, self.SCHEMA_VERSION_NAME, self.SCHEMA_VERSION)
+        except Exception:
+            logger.exception("while migrating database")
+
+    def _get_config(self, cursor, name, default=None):
+        cursor.execute(
+            "SELECT VALUE FROM {} WHERE NAME = ?".format(self._tb_config), (name,)
+        )
+        rows = cursor.fetchall()
+        return rows[0][0] if rows else default
+
+    def _set_config(self, cursor, name, value):
+        cursor.execute(
+            "UPDATE {} SET VALUE = ? WHERE NAME = ?".format(self._tb_config),
+            (str(value), name)
+        )
+        if cursor.rowcount == 0:
+            cursor.execute(
+                "INSERT INTO {} (NAME, VALUE) VALUES (?, ?)".format(self._tb_config),
+                (name, str(value))
+            )
+
+    def get_config_value(self, name, default=None):
+        """returns VALUE of NAME in Config table"""
+        return self._get_config(self._cursor, name, default)
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        # connection of current thread
+        return self._pool.connection()
+
+    @property
+    def _cursor(self) -> sqlite3.Cursor:
+        # cursor of current thread connection
+        return self._pool.cursor()
+
     def dbconnection(self):
+        """start serialized write transaction, kept for callers outside this module
+        new code uses self._pool.transaction()
+        """
         try:
-            self._db = sqlite3.connect(self._db_path, check_same_thread=False)
-            self._cursor = self._db.cursor()
+            self._pool.begin()
         except Exception:
             logger.exception("while connecting %s database", self._db_path)
 
-    # close sqlite connection
+    # commit transaction started by dbconnection(), connection stays open
     def dbclose(self):
-        if self._db:
-            self._db.commit()
-            self._db.close()
+        try:
+            self._pool.end()
+        except RuntimeError:
+            # dbclose() without dbconnection()
+            logger.warning("dbclose without dbconnection")
+
+    def close(self):
+        """close database connections of all threads, used on application exit"""
+        self._pool.close_all()
             
-    def query(self, query):
+    def query(self, query, params=()):
         # logger.debug("excecute query > "+str(query))
         data_list = None
         try:
-            self._cursor.execute(query)
+            self._cursor.execute(query, params)
         except Exception as e:
             logger.exception("while get data from!")
         return data_list
@@ -195,7 +291,10 @@ class Database:
         logger.debug("fetch one data!")
         data_list = None
         try:
-            data_list = self._cursor.fetchone()
+            # fetch till end, unfinished statement keeps read snapshot of the
+            # long lived connection open
+            rows = self._cursor.fetchall()
+            data_list = rows[0] if rows else None
             # (0,12,3)
         except Exception:
             logger.exception("while fetch one data!")
@@ -235,8 +334,9 @@ class Database:
         try:
             whr_name, whr_value, table_name = self._check_whr(whr_name, whr_value, table_name)
             self._cursor.execute(
-                "SELECT * FROM {} where {}={}"
-                .format(table_name, whr_name, whr_value)
+                "SELECT * FROM {} where {}=?"
+                .format(table_name, whr_name),
+                (whr_value,)
                 )
             data_list = self._cursor.fetchall()
         except Exception:
@@ -258,7 +358,8 @@ class Database:
             #         whr_value)
             # )
             self._cursor.execute(
-                f"UPDATE {table_name} SET {col_name} = '{value}' WHERE {whr_name} = '{whr_value}'"
+                f"UPDATE {table_name} SET {col_name} = ? WHERE {whr_name} = ?",
+                (_text(value), _text(whr_value))
             )
             # print("table_name >",table_name)
             # print("col_name >",col_name)
@@ -276,7 +377,8 @@ class Database:
         try:
             whr_name, whr_value, table_name = self._check_whr(whr_name, whr_value, table_name)
             self._cursor.execute(
-                "DELETE FROM {} WHERE {}='{}'".format(table_name, whr_name, whr_value)
+                "DELETE FROM {} WHERE {}=?".format(table_name, whr_name),
+                (_text(whr_value),)
             )
         except Exception:
             logger.exception("while delete rows")
@@ -293,9 +395,10 @@ class Database:
                 )
             else:
                 self._cursor.execute(
-                    "SELECT COUNT(*) FROM {} WHERE {}='{}'".format(table_name, whr_name, whr_value)
+                    "SELECT COUNT(*) FROM {} WHERE {}=?".format(table_name, whr_name),
+                    (_text(whr_value),)
                 )            
-            result = self._cursor.fetchone()
+            result = self._cursor.fetchall()[0]
            # print(result)
             count = result[0]
         except Exception:
@@ -310,7 +413,8 @@ class Database:
             dates = get_datetime_stamp("%Y-%m-%d")[:10] + "%"
                        
             self._cursor.execute(
-                f"select COUNT(*) from {table_name} where DATE_TIME like '{dates}' AND {whr_col1_name} = '{whr_col1_value}'"
+                f"select COUNT(*) from {table_name} where DATE_TIME like ? AND {whr_col1_name} = ?",
+                (dates, _text(whr_col1_value))
             )
         except Exception as e:
             print("while getting date time filter >",str(e))
@@ -324,23 +428,32 @@ class Database:
             dates = get_datetime_stamp("%Y-%m-%d")[:10] + "%"
             
             self._cursor.execute(
-                f"select COUNT(*) from {table_name} where DATE_TIME like '{dates}' AND {whr_col1_name} = '{whr_col1_value}' AND {whr_col2_name} = '{whr_col2_value}'"
+                f"select COUNT(*) from {table_name} where DATE_TIME like ? AND {whr_col1_name} = ? AND {whr_col2_name} = ?",
+                (dates, _text(whr_col1_value), _text(whr_col2_value))
             )
         except Exception as e:
             print("while getting date time filter multiple columns >",str(e))
             logger.exception("while getting date time filter multiple columns >",str(e))
 
    
+    def attach_writer(self, writer):
+        """save_transaction*() queue into writer (TransactionWriter) instead of
+        writing directly, None detaches
+        """
+        self._txn_writer = writer
+
     # save transactions in database in table transactions
     def save_transaction(self, tag_id, ant_name, tr_flag):
         logger.debug("save transaction tag id {}".format(tag_id))
         txn_datetime = get_datetime_stamp("%Y-%m-%d %H:%M:%S")
+        if self._txn_writer is not None and self._txn_writer.put(tag_id, txn_datetime, ant_name, tr_flag):
+            return
         try:
-            self.dbconnection()
-            self._cursor.execute(
-                "INSERT INTO {} (TAG_ID, DATE_TIME, ANT_NAME, TR_FLAG)VALUES('{}', '{}', '{}', '{}')".format(self._tb_transaction, tag_id, txn_datetime, ant_name, tr_flag)
-            )
-            self.dbclose()
+            with self._pool.transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO {} (TAG_ID, DATE_TIME, ANT_NAME, TR_FLAG)VALUES(?, ?, ?, ?)".format(self._tb_transaction),
+                    (_text(tag_id), txn_datetime, _text(ant_name), _text(tr_flag))
+                )
         except Exception as e:
             print("error while saving transaction >",str(e))
             logger.exception("while save transaction entry")
@@ -356,38 +469,64 @@ class Database:
     def save_transaction_withLimit(self, tag_id, ant_name, tr_flag, limit):
         logger.debug("save transaction with limit tag id {}".format(tag_id))
         txn_datetime = get_datetime_stamp("%Y-%m-%d %H:%M:%S")
+        if self._txn_writer is not None and self._txn_writer.put(tag_id, txn_datetime, ant_name, tr_flag, limit):
+            return
 
         try:
-            self.dbconnection()
-        # get how many transactions are in transaction table
-            self._cursor.execute(
-                    "SELECT COUNT(*) FROM {}".format(self._tb_transaction)
-                )
-            trCount = self._cursor.fetchone()
-            # print("trCount is > ",trCount[0])
-            if trCount[0] >= limit:
-                self.query("select SR_NO from {} ORDER BY SR_NO LIMIT 1".format( self._tb_transaction))
-                top_srno = self._cursor.fetchone()
-                # print("top_srno > ",top_srno)
-                self._cursor.execute(
-                    "DELETE FROM {} LIMIT 1".format(self._tb_transaction)
-                    )
-                self._cursor.execute(
-                    "INSERT INTO {} (TAG_ID, DATE_TIME, ANT_NAME, TR_FLAG)VALUES('{}', '{}', '{}', '{}')".format(self._tb_transaction, tag_id, txn_datetime, ant_name, tr_flag)
+            with self._pool.transaction() as cursor:
+                cursor.execute(
+                    "INSERT INTO {} (TAG_ID, DATE_TIME, ANT_NAME, TR_FLAG)VALUES(?, ?, ?, ?)".format(self._tb_transaction),
+                    (_text(tag_id), txn_datetime, _text(ant_name), _text(tr_flag))
                     )
-                # self._cursor.execute(
-                #     "INSERT INTO {} (SR_NO, TAG_ID, DATE_TIME, ANT_NAME, TR_FLAG)VALUES('{}', '{}', '{}', '{}', '{}')".format(self._tb_transaction, top_srno[0], tag_id, txn_datetime, ant_name, tr_flag)
-                #     )
-            else:
-                self._cursor.execute(
-                    "INSERT INTO {} (TAG_ID, DATE_TIME, ANT_NAME, TR_FLAG)VALUES('{}', '{}', '{}', '{}')".format(self._tb_transaction, tag_id, txn_datetime, ant_name, tr_flag)
-                    )
-            self.dbclose()
+                # if transactions reach max limit, delete the top most transaction
+                self._rotate_transactions(cursor, cursor.lastrowid, limit)
 
         except Exception as e:
-            self.dbclose()
             print("error while saving transaction with limit >",str(e))        
-        
+
+    def write_transactions(self, records, spool_seq=None):
+        """insert transactions in one commit, used by TransactionWriter
+        records : list of (tag_id, date_time, ant_name, tr_flag, limit),
+                  limit None is not rotated
+        spool_seq : sequence of last record, saved in Config table
+        raises exception if not written
+        """
+        with self._pool.transaction() as cursor:
+            cursor.executemany(
+                "INSERT INTO {} (TAG_ID, DATE_TIME, ANT_NAME, TR_FLAG)VALUES(?, ?, ?, ?)".format(self._tb_transaction),
+                [record[:4] for record in records]
+            )
+            limits = [record[4] for record in records if record[4] is not None]
+            if limits:
+                cursor.execute("SELECT MAX(SR_NO) FROM {}".format(self._tb_transaction))
+                self._rotate_transactions(cursor, cursor.fetchall()[0][0], limits[-1])
+            if spool_seq is not None:
+                self._set_config(cursor, SPOOL_SEQ_NAME, spool_seq)
+
+    def _rotate_transactions(self, cursor, last_srno, limit):
+        """keep newest limit transactions, constant cost for any limit
+        SR_NO grows by one per transaction and only the oldest rows are deleted,
+        so the newest limit rows are SR_NO > last_srno - limit, the delete is
+        a primary key range of usually one row
+        """
+        limit = int(limit)
+        if last_srno is None or limit <= 0:
+            return
+        cursor.execute(
+            "DELETE FROM {} WHERE SR_NO <= ?".format(self._tb_transaction),
+            (last_srno - limit,)
+        )
+
+    def trim_transactions(self, limit=None):
+        """delete transactions over limit, e.g. after max_trans_count is lowered"""
+        if limit is None:
+            limit = self._max_trans_count
+        try:
+            with self._pool.transaction() as cursor:
+                cursor.execute("SELECT MAX(SR_NO) FROM {}".format(self._tb_transaction))
+                self._rotate_transactions(cursor, cursor.fetchall()[0][0], limit)
+        except Exception:
+            logger.exception("while trimming %s table", self._tb_transaction)
 
 
     # get data from date-time to date-time (not used yet)
@@ -397,10 +536,12 @@ class Database:
         """
         logger.debug("get data from date to date time")
         txn_datetime = get_datetime_stamp()
+        data_list = None
         try:
             self._cursor.execute(
-                "select * from {} where date(datetime(timestamp, '{}'))  between {} and {}"
-                .format(table_name, self._default_datetime, fromdate, todate)
+                "select * from {} where date(datetime(timestamp, '{}'))  between ? and ?"
+                .format(table_name, self._default_datetime),
+                (fromdate, todate)
             )
             data_list = self._cursor.fetchall()
         except Exception:
@@ -408,18 +549,62 @@ class Database:
         return data_list
 
     def vehicle_access(self, tagid):
-        logger.debug("select all data from column!")
+        """lookup tag in memory resident UserList index, no disk access
+        returns [row] if tag available else []
+        """
         data_list = 0
         try:
-            self.dbconnection()
-            self.query(
-                "SELECT * FROM {} where {}='{}'".format(self._tb_userlists, "TAG_ID", tagid)
-                )
-            data_list = self.get()
-            self.dbclose()
+            if not self._tag_index.loaded:
+                self.refresh_tag_index()
+            row = self._tag_index.get(tagid)
+            data_list = [row] if row is not None else []
         except Exception:
             logger.exception("while get data from!")
         return data_list
+
+    def access_rule(self, tagid):
+        """compiled AccessRule of tag from memory resident index, None if tag not available"""
+        try:
+            if not self._tag_index.loaded:
+                self.refresh_tag_index()
+            return self._tag_index.rule(tagid)
+        except Exception:
+            logger.exception("while get access rule!")
+        return None
+
+    def access_rules(self):
+        """(version, tag_ids, rules) snapshot of compiled AccessRule of all tags"""
+        if not self._tag_index.loaded:
+            self.refresh_tag_index()
+        return self._tag_index.rules()
+
+    def refresh_tag_index(self, tag_ids=None):
+        """reload UserList index from database
+        tag_ids : list of tag id to patch, None reload complete index
+        """
+        try:
+            self._patch_tag_index(tag_ids)
+        except Exception:
+            logger.exception("while refresh tag index!")
+
+    def _patch_tag_index(self, tag_ids=None):
+        # uses current thread connection, inside a write transaction it sees
+        # rows not yet commited by the transaction
+        if tag_ids is None:
+            self._cursor.execute("SELECT * FROM {}".format(self._tb_userlists))
+            self._tag_index.load(self._cursor.fetchall())
+            return
+
+        tag_ids = [tag_id for tag_id in tag_ids if tag_id is not None]
+        # sqlite default limit of host parameters is 999
+        for start in range(0, len(tag_ids), 500):
+            chunk = tag_ids[start:start + 500]
+            self._cursor.execute(
+                "SELECT * FROM {} WHERE TAG_ID IN ({})".format(
+                    self._tb_userlists, ",".join("?" * len(chunk))),
+                chunk
+            )
+            self._tag_index.patch(chunk, self._cursor.fetchall())
     
     @staticmethod
     def avil_check(data, key):
@@ -472,78 +657,80 @@ class Database:
             # print(data_frame)
             # print("in add_user_vehicle")
             self._default_table = self._tb_userlists
-            self.dbconnection()
-            vehicle_count = self.get_count(table_name=self._tb_userlists)
-            # print("total vehicles in DB ", vehicle_count)
-            if vehicle_count < self._max_vehicle_count:
-                for _frame in data_frame:
-                    # check if _frame tagId is not equal to none
-                    if _frame["tagId"] != None:
-                        found_tag = self.get_count(table_name=self._tb_userlists, whr_name="TAG_ID", whr_value=_frame["tagId"])
-                        # print("user count :" +str(found_tag))                        
-                        if vehicle_count < self._max_vehicle_count:
-                            if found_tag == 0:
-                                inser_query = """INSERT INTO """ + self._tb_userlists + """ (TAG_ID, 
-                                    OWNER_NAME,
-                                    DATE_TIME , 
-                                    FLAT_NO, 
-                                    VEHICLE_NO, 
-                                    FROM_DATE , TO_DATE , 
-                                    FROM_TIME , TO_TIME , 
-                                    WEEK_DAY,
-                                    BLK_FROM_DATE , BLK_TO_DATE , 
-                                    BLK_FROM_TIME , BLK_TO_TIME , 
-                                    BLK_WEEK_DAY,
-                                    AUTH) VALUES """
-                                query = inser_query +"('{}', '{}', '{}', '{}', '{}', '{}', '{}', '{}', '{}', '{}', '{}', '{}', '{}', '{}', '{}', {})".format(
-                                _frame["tagId"],
-                                self.avil_check(_frame,"ownerName"),
-                                datetime,
-                                self.avil_check(_frame,"flatNo"), 
-                                self.avil_check(_frame,"vehicleNo"),
-                                self.avil_date(_frame,"fromDate"),self.avil_date(_frame,"toDate"),
-                                self.avil_time(_frame,"fromTime"),self.avil_time(_frame,"toTime"),
-                                self.avil_day(_frame,"weekDay"),
-                                self.avil_date(_frame,"blkFromDate"),
-                                self.avil_date(_frame,"blkToDate"),
-                                self.avil_time(_frame,"blkFromTime"),
-                                self.avil_time(_frame,"blkToTime"),
-                                self.avil_blkday(_frame,"blkWeekDay"),
-                                self.auth_check(_frame,"auth",self.VEH_ACCESS)                    
-                                )
-                            # print(query)
-                                self._cursor.execute(query)
-                            elif found_tag == 1:
-                                # print("Tag is already in DB >",_frame["tagId"])
-                                self._whr_col_val = _frame["tagId"]                    
-                                self.update_rows("OWNER_NAME", self.avil_check(_frame,"ownerName"))
-                                self.update_rows("FLAT_NO", self.avil_check(_frame,"flatNo"))
-                                self.update_rows("VEHICLE_NO", self.avil_check(_frame,"vehicleNo"))
-
-                                self.update_rows("FROM_DATE", self.avil_date(_frame,"fromDate"))
-                                self.update_rows("TO_DATE", self.avil_date(_frame,"toDate"))
-                                self.update_rows("FROM_TIME", self.avil_time(_frame,"fromTime"))
-                                self.update_rows("TO_TIME", self.avil_time(_frame,"toTime"))
-                                self.update_rows("WEEK_DAY", self.avil_day(_frame,"weekDay"))
-
-                                self.update_rows("BLK_FROM_DATE", self.avil_date(_frame,"blkFromDate"))
-                                self.update_rows("BLK_TO_DATE", self.avil_date(_frame,"blkToDate"))
-                                self.update_rows("BLK_FROM_TIME", self.avil_time(_frame,"blkFromTime"))
-                                self.update_rows("BLK_TO_TIME", self.avil_time(_frame,"blkToTime"))
-                                self.update_rows("BLK_WEEK_DAY", self.avil_day(_frame,"blkWeekDay"))
-                                self.update_rows("AUTH",self.auth_check(_frame,"auth",self.VEH_ACCESS))
-                            return_val = 1
-                        else:
-                            return_val = 2
-                            break
+            with self._pool.transaction() as cursor:
+                vehicle_count = self.get_count(table_name=self._tb_userlists)
+                # print("total vehicles in DB ", vehicle_count)
+                if vehicle_count < self._max_vehicle_count:
+                    for _frame in data_frame:
+                        # check if _frame tagId is not equal to none
+                        if _frame["tagId"] != None:
+                            found_tag = self.get_count(table_name=self._tb_userlists, whr_name="TAG_ID", whr_value=_frame["tagId"])
+                            # print("user count :" +str(found_tag))                        
+                            if vehicle_count < self._max_vehicle_count:
+                                if found_tag == 0:
+                                    inser_query = """INSERT INTO """ + self._tb_userlists + """ (TAG_ID, 
+                                        OWNER_NAME,
+                                        DATE_TIME , 
+                                        FLAT_NO, 
+                                        VEHICLE_NO, 
+                                        FROM_DATE , TO_DATE , 
+                                        FROM_TIME , TO_TIME , 
+                                        WEEK_DAY,
+                                        BLK_FROM_DATE , BLK_TO_DATE , 
+                                        BLK_FROM_TIME , BLK_TO_TIME , 
+                                        BLK_WEEK_DAY,
+                                        AUTH) VALUES """
+                                    query = inser_query +"(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                                    params = (
+                                    _text(_frame["tagId"]),
+                                    _text(self.avil_check(_frame,"ownerName")),
+                                    datetime,
+                                    _text(self.avil_check(_frame,"flatNo")), 
+                                    _text(self.avil_check(_frame,"vehicleNo")),
+                                    _text(self.avil_date(_frame,"fromDate")),_text(self.avil_date(_frame,"toDate")),
+                                    _text(self.avil_time(_frame,"fromTime")),_text(self.avil_time(_frame,"toTime")),
+                                    _text(self.avil_day(_frame,"weekDay")),
+                                    _text(self.avil_date(_frame,"blkFromDate")),
+                                    _text(self.avil_date(_frame,"blkToDate")),
+                                    _text(self.avil_time(_frame,"blkFromTime")),
+                                    _text(self.avil_time(_frame,"blkToTime")),
+                                    _text(self.avil_blkday(_frame,"blkWeekDay")),
+                                    self.auth_check(_frame,"auth",self.VEH_ACCESS)                    
+                                    )
+                                # print(query)
+                                    cursor.execute(query, params)
+                                elif found_tag == 1:
+                                    # print("Tag is already in DB >",_frame["tagId"])
+                                    self._whr_col_val = _frame["tagId"]                    
+                                    self.update_rows("OWNER_NAME", self.avil_check(_frame,"ownerName"))
+                                    self.update_rows("FLAT_NO", self.avil_check(_frame,"flatNo"))
+                                    self.update_rows("VEHICLE_NO", self.avil_check(_frame,"vehicleNo"))
+
+                                    self.update_rows("FROM_DATE", self.avil_date(_frame,"fromDate"))
+                                    self.update_rows("TO_DATE", self.avil_date(_frame,"toDate"))
+                                    self.update_rows("FROM_TIME", self.avil_time(_frame,"fromTime"))
+                                    self.update_rows("TO_TIME", self.avil_time(_frame,"toTime"))
+                                    self.update_rows("WEEK_DAY", self.avil_day(_frame,"weekDay"))
+
+                                    self.update_rows("BLK_FROM_DATE", self.avil_date(_frame,"blkFromDate"))
+                                    self.update_rows("BLK_TO_DATE", self.avil_date(_frame,"blkToDate"))
+                                    self.update_rows("BLK_FROM_TIME", self.avil_time(_frame,"blkFromTime"))
+                                    self.update_rows("BLK_TO_TIME", self.avil_time(_frame,"blkToTime"))
+                                    self.update_rows("BLK_WEEK_DAY", self.avil_day(_frame,"blkWeekDay"))
+                                    self.update_rows("AUTH",self.auth_check(_frame,"auth",self.VEH_ACCESS))
+                                return_val = 1
+                            else:
+                                return_val = 2
+                                break
                 
-            else:
-                return_val = 2
+                else:
+                    return_val = 2
 
-            self.dbclose()
+                self._patch_tag_index([_frame.get("tagId") for _frame in data_frame])
             return return_val
         except Exception:
-            self.dbclose()
+            # changes are rolled back but index may be patched, reload it on next lookup
+            self._tag_index.invalidate()
             logger.exception("while adding vehicle!")
 
 
@@ -557,45 +744,46 @@ class Database:
         # print(data_frame)
         try:
             print("in update_user_vehicle")
-            self.dbconnection()
-            
-            for _frame in data_frame:
-                self._whr_col_val = _frame["tagId"]
-                self._default_table = self._tb_userlists
-                if self.get_count():
-                    # self.update_rows("OWNER_NAME", self.avil_check(_frame,"ownerName"))
-                    # self.update_rows("FLAT_NO", self.avil_check(_frame,"flatNo"))
-                    # self.update_rows("VEHICLE_NO", self.avil_check(_frame,"vehicleNo"))
-                    if block_data:
-                        # print("data frame while blocking vehicle")
-                        # print(data_frame)
-                        # print((_frame["tagId"]))
-                        # print((_frame["fromDate"]))
-                        # print((_frame["toDate"]))
-                        # print((_frame["fromTime"]))
-                        # print((_frame["toTime"]))
-                        # print((_frame["weekDay"]))
+            with self._pool.transaction():
+                for _frame in data_frame:
+                    self._whr_col_val = _frame["tagId"]
+                    self._default_table = self._tb_userlists
+                    if self.get_count():
+                        # self.update_rows("OWNER_NAME", self.avil_check(_frame,"ownerName"))
+                        # self.update_rows("FLAT_NO", self.avil_check(_frame,"flatNo"))
+                        # self.update_rows("VEHICLE_NO", self.avil_check(_frame,"vehicleNo"))
+                        if block_data:
+                            # print("data frame while blocking vehicle")
+                            # print(data_frame)
+                            # print((_frame["tagId"]))
+                            # print((_frame["fromDate"]))
+                            # print((_frame["toDate"]))
+                            # print((_frame["fromTime"]))
+                            # print((_frame["toTime"]))
+                            # print((_frame["weekDay"]))
                         
                         
-                        self.update_rows("BLK_FROM_DATE", self.avil_date(_frame,"fromDate"))
-                        self.update_rows("BLK_TO_DATE", self.avil_date(_frame,"toDate"))
-                        self.update_rows("BLK_FROM_TIME", self.avil_time(_frame,"fromTime"))
-                        self.update_rows("BLK_TO_TIME", self.avil_time(_frame,"toTime"))
-                        self.update_rows("BLK_WEEK_DAY", self.avil_blkday(_frame,"weekDay"))
+                            self.update_rows("BLK_FROM_DATE", self.avil_date(_frame,"fromDate"))
+                            self.update_rows("BLK_TO_DATE", self.avil_date(_frame,"toDate"))
+                            self.update_rows("BLK_FROM_TIME", self.avil_time(_frame,"fromTime"))
+                            self.update_rows("BLK_TO_TIME", self.avil_time(_frame,"toTime"))
+                            self.update_rows("BLK_WEEK_DAY", self.avil_blkday(_frame,"weekDay"))
                     
-                    else:
-                        self.update_rows("FROM_DATE", self.avil_date(_frame,"fromDate"))
-                        self.update_rows("TO_DATE", self.avil_date(_frame,"toDate"))
-                        self.update_rows("FROM_TIME", self.avil_time(_frame,"fromTime"))
-                        self.update_rows("TO_TIME", self.avil_time(_frame,"toTime"))
-                        self.update_rows("WEEK_DAY", self.avil_day(_frame,"weekDay"))
+                        else:
+                            self.update_rows("FROM_DATE", self.avil_date(_frame,"fromDate"))
+                            self.update_rows("TO_DATE", self.avil_date(_frame,"toDate"))
+                            self.update_rows("FROM_TIME", self.avil_time(_frame,"fromTime"))
+                            self.update_rows("TO_TIME", self.avil_time(_frame,"toTime"))
+                            self.update_rows("WEEK_DAY", self.avil_day(_frame,"weekDay"))
             
-            # self._whr_col_val made to None because it is used in dashboard display and 
-            # if kept with tag id, it shows only one user in vehicle list 
-            self._whr_col_val = None
-            self.dbclose()
+                # self._whr_col_val made to None because it is used in dashboard display and 
+                # if kept with tag id, it shows only one user in vehicle list 
+                self._whr_col_val = None
+                self._patch_tag_index([_frame.get("tagId") for _frame in data_frame])
 
         except Exception as e:
+            # changes are rolled back but index may be patched, reload it on next lookup
+            self._tag_index.invalidate()
             print("while updating user vehicle id {}! {}".format(str(_frame),str(e)))
             logger.warn("while updating user vehicle id {}! {}".format(str(_frame),str(e)))
 
@@ -610,13 +798,15 @@ class Database:
         logger.debug("delete permenantly user!")
         try:
             print("in delete_user_vehicle")
-            self.dbconnection()
+            with self._pool.transaction():
+                for tagid in tagidlist:
+                    if self.get_count(self._tb_userlists, "TAG_ID", tagid):
+                        self.delete_rows(self._tb_userlists, "TAG_ID", tagid)
+                # add one step here, if database is empty after delete, set sr. no. to zero
+                # self.alter_table(self._tb_userlists)
+            # drop from index once delete is commited
             for tagid in tagidlist:
-                if self.get_count(self._tb_userlists, "TAG_ID", tagid):
-                    self.delete_rows(self._tb_userlists, "TAG_ID", tagid)
-            # add one step here, if database is empty after delete, set sr. no. to zero
-            # self.alter_table(self._tb_userlists)
-            self.dbclose()
+                self._tag_index.remove(tagid)
         except Exception:
             logger.warn("while deleting user vehicle id {}!".format(tagid))
     
@@ -633,9 +823,7 @@ class Database:
         logger.debug("get data from userlist!")
         allusers = []
         try:
-            self.dbconnection()
             allusers = self.get_from(self._tb_userlists)
-            self.dbclose()
         except Exception:
             logger.warn("while getting userlist!")
         return allusers
@@ -644,10 +832,11 @@ class Database:
         logger.debug("get data from trans vehicle list!")
         alldata = []
         try:
-            self.dbconnection()
-            self.query("select * from {} where DATE_FORMAT(substring(DATE_TIME, 1, 10),'%d-%m-%Y') BETWEEN  '{}' AND '{}'".format(self._tb_transaction, fromdate, todate))
+            self.query(
+                "select * from {} where DATE_FORMAT(substring(DATE_TIME, 1, 10),'%d-%m-%Y') BETWEEN ? AND ?".format(self._tb_transaction),
+                (fromdate, todate)
+            )
             alldata = self.get()
-            self.dbclose()
         except Exception:
             logger.warn("while getting userlist!")
         return alldata
@@ -661,14 +850,15 @@ class Database:
             if whr_value == None:
                 whr_value = "%"
             # print(fromdate, todate)
-            self.dbconnection()
             # self.query("select * from {} where (STRFTIME('%d-%m-%Y %H:%M:%S', DATE_TIME) BETWEEN  '{}' AND '{}') and {} like '{}'".format(table_name, fromdate, todate, whr_name, whr_value))
             # self.query("select * from {} where (DATE_TIME BETWEEN  '{}' AND '{}') and {} like '{}'".format(table_name, fromdate, todate, whr_name, whr_value))
             
-            self.query("select * from {} where (DATE_TIME BETWEEN '{}' AND '{}') and {} like '{}'".format(table_name, fromdate, todate, whr_name, whr_value))
+            self.query(
+                "select * from {} where (DATE_TIME BETWEEN ? AND ?) and {} like ?".format(table_name, whr_name),
+                (fromdate, todate, whr_value)
+            )
             
             alldata = self.get()
-            self.dbclose()
         except Exception:
             logger.warn("while getting userlist!")
         return alldata
@@ -697,7 +887,6 @@ class Database:
         default_count = [(0, '-', '-', '-', None)]
         # self._
         try:
-            self.dbconnection()
             usercount = self.get_count(self._tb_userlists)
             alldata["usercount"] = usercount
            # print(alldata, antNames)
@@ -705,7 +894,7 @@ class Database:
             for ants in antNames:
                 if ants != "NA":
                     # this query will give the last entry of database, whichever the last entry that 1 entry will be returned
-                    self.query("select * from {} where ANT_NAME = '{}' ORDER BY SR_NO DESC LIMIT 1".format( self._tb_transaction, ants))
+                    self.query("select * from {} where ANT_NAME = ? ORDER BY SR_NO DESC LIMIT 1".format( self._tb_transaction), (ants,))
                     dataall = self.get()
                     # print(dataall)
                     
@@ -725,8 +914,6 @@ class Database:
                         alldata["ants"][ants] = default_count
                         alldata["ants"][ants].append(0)
 
-
-            self.dbclose()
             # print(alldata)
             # 'ants': {'IN': [(43, '30361F46981138174876EDE0', '11/03/2022 15:17:01', 'IN', None), <today_count>]}
         except Exception as e:
@@ -737,9 +924,7 @@ class Database:
         logger.debug("getting tag lists name!")
         alldata = {}
         try:
-            self.dbconnection()
             alldata = self.get_from_selectedcol(self._tb_userlists, "TAG_ID,OWNER_NAME")
-            self.dbclose()
         except Exception as e:
             logger.warn("while getting tag lists name!! - {}".format(str(e)))
         return alldata
@@ -768,35 +953,25 @@ class User(Database):
         except AttributeError as e:         
             logger.error("not found : "+str(e))
             raise AttributeError("not found")
-        self.dbconnection()
         found_user = self.get_count(table_name=self._tb_loginuser)
-        self.dbclose()
         if found_user == 0:
             self._create_user("iTEKAVI","Pi4@FsGt","info@infoteksoftware.com",1)
         
-        self.dbconnection()
-        found_user = self.get_count(table_name=self._tb_transaction)
-        # DELETE FROM tbl_name WHERE NOT EXISTS in (SELECT id FROM tbl_name ORDER BY id LIMIT 100 );
-        # delete from mytable order by id limit 1
-        if found_user > self._max_trans_count:
-            self._cursor.execute(
-                "DELETE FROM {} ORDER BY '{}' LIMIT {}".format(self._tb_transaction,"SR_NO",(found_user - self._max_trans_count))
-            )
-            # self._cursor.execute(
-            #     "DELETE FROM {} WHERE '{}' NOT EXISTS in (SELECT '{}' FROM {} ORDER BY '{}' LIMIT 100)".format(self._tb_transaction,"SR_NO","SR_NO",self._tb_transaction,"SR_NO")
-            # )            
-        self.dbclose()
+        # max_trans_count may be lowered since last start
+        self.trim_transactions(self._max_trans_count)
     
     def _create_user(self, user, passwd, email=None, auth=SIMPLEUSER):
         logger.info("create new user > "+str(user))
         # print(user, passwd, email, auth)
         try:
-            self.dbconnection()
-            found_user = self.get_count(table_name=self._tb_loginuser, whr_name="NAME", whr_value=user)
-           # print(found_user)
-            if found_user == 0:
-                self.query("INSERT INTO {} (NAME, DATE_TIME, PASSWD, EMAIL, AUTH) VALUES ('{}','{}','{}','{}',{})".format(self._tb_loginuser, user, get_datetime_stamp(), generate_password_hash(passwd, method='sha256'), email, auth))
-            self.dbclose()
+            with self._pool.transaction() as cursor:
+                found_user = self.get_count(table_name=self._tb_loginuser, whr_name="NAME", whr_value=user)
+               # print(found_user)
+                if found_user == 0:
+                    cursor.execute(
+                        "INSERT INTO {} (NAME, DATE_TIME, PASSWD, EMAIL, AUTH) VALUES (?, ?, ?, ?, ?)".format(self._tb_loginuser),
+                        (_text(user), get_datetime_stamp(), generate_password_hash(passwd, method='sha256'), _text(email), auth)
+                    )
             if found_user == 0:
                 return (1, "User Successfully Created!")
             else:
@@ -809,18 +984,18 @@ class User(Database):
         """
         logger.info("updating login user " + str(user))
         try:
-            self.dbconnection()
-            found_user = self.get_count(table_name=self._tb_loginuser, whr_name="NAME", whr_value=user)
-            if found_user == 1:
-                # "UPDATE {} SET {}='{}' WHERE {}='{}'".format(table_name, col_name, value, whr_name, whr_value)
-                # print("password formating")
-                # print(generate_password_hash(passwd, method='sha256'))
-                self.query("UPDATE {} SET {}='{}' WHERE {}='{}'".format(self._tb_loginuser,"PASSWD",generate_password_hash(passwd, method='sha256'),"NAME",user))
-            else:
-                self.dbclose()
-                return (0, "User not available")
+            with self._pool.transaction() as cursor:
+                found_user = self.get_count(table_name=self._tb_loginuser, whr_name="NAME", whr_value=user)
+                if found_user == 1:
+                    # print("password formating")
+                    # print(generate_password_hash(passwd, method='sha256'))
+                    cursor.execute(
+                        "UPDATE {} SET PASSWD = ? WHERE NAME = ?".format(self._tb_loginuser),
+                        (generate_password_hash(passwd, method='sha256'), _text(user))
+                    )
+                else:
+                    return (0, "User not available")
             
-            self.dbclose()
             return (1, "User updated! ")
         except Exception as e:
             logger.error("while updating user >" + str(e))
@@ -843,15 +1018,13 @@ class User(Database):
         success = 0
         data_list = None
         try:
-            self.dbconnection()
-            self.query("SELECT PASSWD from {} where (EMAIL='{}' or NAME='{}')".format(self._tb_loginuser, user, user))
+            self.query("SELECT PASSWD from {} where (EMAIL=? or NAME=?)".format(self._tb_loginuser), (_text(user), _text(user)))
             user_passwd = self.getone()
             #print(user_passwd)
             if user_passwd and check_password_hash(user_passwd, passwd):
-                self.query("SELECT * from {} where (EMAIL='{}' or NAME='{}')".format(self._tb_loginuser, user, user))
+                self.query("SELECT * from {} where (EMAIL=? or NAME=?)".format(self._tb_loginuser), (_text(user), _text(user)))
                 data_list = self.get()
                 #print(data_list)
-            self.dbclose()
             if len(data_list) == 0 or data_list == None:
                 data_list = "Athorization Failed!"
             else:
@@ -863,24 +1036,21 @@ class User(Database):
     def _set_permission(self, user, auth):
         logger.info("block or delete user!")
         try:
-            self.dbconnection()
-            self.update_rows(
-                col_name="AUTH", 
-                value=auth, 
-                table_name=self._tb_loginuser, 
-                whr_name="NAME", 
-                whr_value=user
-                )
-            self.dbclose()
+            with self._pool.transaction():
+                self.update_rows(
+                    col_name="AUTH", 
+                    value=auth, 
+                    table_name=self._tb_loginuser, 
+                    whr_name="NAME", 
+                    whr_value=user
+                    )
         except:
             logger.warn("while user block!")
     
     def _get_loginuser_list(self):
         logger.info("get user lists!")
         try:
-            self.dbconnection()
             datalist = self.get_from(self._tb_loginuser)
-            self.dbclose()
         except:
             logger.warn("while user block!")
         return datalist
@@ -932,4 +1102,4 @@ VALUES
         "1",
         1);
 
-"""
\ No newline at end of file
+"""
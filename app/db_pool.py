@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SQLite connection manager.
+
+Each thread uses one long lived connection to the database file, opened in
+WAL journal mode so readers never wait for the writer. When the thread ends
+its connection goes back to a bounded pool of idle connections and is used by
+the next thread, e.g. the next request of the API server, instead of opening
+a new one. All writes go through transaction(), which serializes writers of
+the process with one lock and commits once at the end of the outermost
+transaction.
+
+Statements are passed with '?' parameters, sqlite3 keeps the prepared
+statement of every distinct sql text in a per connection cache.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+
+logger = logging.getLogger("db")
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    # with WAL, NORMAL is durable across application crash, only power loss
+    # may roll back last transactions, database is never corrupted
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-4096",  # KiB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",  # milliseconds, for other processes e.g. itekcsv
+)
+
+# prepared statements cached per connection
+CACHED_STATEMENTS = 256
+
+# connections of ended threads kept open for the next threads
+MAX_IDLE = 4
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def connection_manager_for(db_path):
+    """Returns ConnectionManager shared by all users of db_path"""
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = ConnectionManager(db_path)
+            _managers[key] = manager
+        return manager
+
+
+class _ThreadConnection:
+    """Connection checked out by one thread, stored in its thread local"""
+
+    __slots__ = ("conn", "cursor", "depth", "release", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.depth = 0
+
+
+class ConnectionManager:
+    """Per thread long lived sqlite connections with a serialized writer
+
+    Args:
+        db_path: str, database file path
+        max_idle: connections of ended threads kept for reuse
+    """
+
+    def __init__(self, db_path, max_idle=MAX_IDLE):
+        self._db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.RLock()
+        self._max_idle = max_idle
+        self._connections = []  # open connections, in use and idle
+        self._idle = []
+        self._connections_lock = threading.Lock()
+
+    @property
+    def db_path(self):
+        return self._db_path
+
+    def _connect(self):
+        # connection is used only by the thread which opened it,
+        # check_same_thread=False only allows close_all() on exit
+        conn = sqlite3.connect(
+            self._db_path,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        for pragma in PRAGMAS:
+            try:
+                conn.execute(pragma)
+            except sqlite3.Error:
+                logger.exception("while setting %s", pragma)
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        with self._connections_lock:
+            if self._idle:
+                return self._idle.pop()
+        conn = self._connect()
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _checkin(self, conn):
+        # called when the thread local of an ended thread is dropped,
+        # possibly on another thread
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            pass  # closed by close_all()
+
+        with self._connections_lock:
+            if conn not in self._connections:
+                return
+            if len(self._idle) < self._max_idle:
+                self._idle.append(conn)
+                return
+            self._connections.remove(conn)
+        conn.close()
+
+    def _thread_connection(self) -> _ThreadConnection:
+        local = getattr(self._local, "conn", None)
+        if local is None:
+            local = _ThreadConnection(self._checkout())
+            # must not reference local, else it is never collected
+            local.release = weakref.finalize(local, self._checkin, local.conn)
+            self._local.conn = local
+        return local
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns connection of current thread"""
+        return self._thread_connection().conn
+
+    def cursor(self) -> sqlite3.Cursor:
+        """Returns cursor of current thread connection"""
+        return self._thread_connection().cursor
+
+    def execute(self, sql, params=()) -> sqlite3.Cursor:
+        """Execute statement on current thread cursor"""
+        cursor = self.cursor()
+        cursor.execute(sql, params)
+        return cursor
+
+    def fetchall(self, sql, params=()) -> list:
+        return self.execute(sql, params).fetchall()
+
+    def fetchone(self, sql, params=()):
+        # fetch till end, an unfinished statement keeps its read snapshot open
+        rows = self.execute(sql, params).fetchall()
+        return rows[0] if rows else None
+
+    def begin(self):
+        """Start (nested) write transaction of current thread"""
+        self._write_lock.acquire()
+        self._thread_connection().depth += 1
+
+    def end(self, commit=True):
+        """End write transaction started by begin(), outermost commits or rollbacks"""
+        local = self._thread_connection()
+        try:
+            local.depth -= 1
+            if local.depth <= 0:
+                local.depth = 0
+                if commit:
+                    local.conn.commit()
+                else:
+                    local.conn.rollback()
+        finally:
+            self._write_lock.release()
+
+    @contextmanager
+    def transaction(self):
+        """Serialized write transaction, yields cursor of current thread
+
+        .. code:: python
+            with manager.transaction() as cursor:
+                cursor.execute("INSERT ...", (value,))
+        """
+        self.begin()
+        try:
+            yield self._local.conn.cursor
+        except Exception:
+            self.end(commit=False)
+            raise
+        else:
+            self.end(commit=True)
+
+    def close(self):
+        """Close connection of current thread"""
+        local = getattr(self._local, "conn", None)
+        if local is not None:
+            local.release.detach()
+            self._local.conn = None
+            with self._connections_lock:
+                if local.conn in self._connections:
+                    self._connections.remove(local.conn)
+            local.conn.close()
+
+    def close_all(self):
+        """Close connections of all threads, used on application exit"""
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+            self._idle = []
+        for conn in connections:
+            conn.close()
@@ -10,7 +10,7 @@ import queue
 import threading
 import time
 from functools import partial
-from flask import Flask
+from flask import Flask, jsonify, request as http_request
 import faulthandler
 import os
 
@@ -25,6 +25,10 @@ from .settings import CONFIG_TOML_FILE, PATH_FILE_LOG
 from .data_conversion import pars, unpars
 from .mqtt.proto_mqtt import MQTTProto as MQTT
 from .validation import Validator
+from .database import Database
+from .access_engine import AccessEngine, API_ROUTES, TR_ACC1, TR_BLK1, TR_NDB1
+from .tag_pipeline import TagPipeline
+from .txn_writer import TransactionWriter
 from .web.weber import webpage
 
 from .gpio.HandleGpio import HandleGPIO
@@ -39,10 +43,6 @@ TR_BLK = 2
 TR_NDB = 3
 RFID_DISCONNECT = 1
 
-TR_ACC1 = "Authorized"
-TR_BLK1 = "Blocked"
-TR_NDB1 = "Unauthorized"
-
 
 
 formatter = logging.Formatter(
@@ -140,9 +140,20 @@ apps.env = 'development'
 def routes_checks(route):
     return appWrap.allwebpath(route)
 
+# access engine shared by decision loop and web api, created in main()
+access_engine = None
+
 @apps.route('/api/<route>',methods=["POST","GET"])
 def api_routes(route):
     # print("API route > ",route)
+    # vehicle access and transaction api are thin wrappers over the access engine
+    if access_engine is not None and route in API_ROUTES:
+        resp, status_code = access_engine.handle_api(
+            route,
+            body=http_request.get_data(as_text=True),
+            frame=http_request.get_json(silent=True),
+        )
+        return jsonify(resp), status_code
     return appWrap.handle_api(route)
 # this function is called first, which will set rfid reader as per fastgate rquirment 
  
@@ -214,9 +225,20 @@ def msg_listener(app):
             process_rfid(reader, mesg)
 
         if topic == "mqtt":
-            process_mqtt(mesg)
-
-def process_mqtt(mesg):
+            process_mqtt(mesg, app)
+
+def _config_tag_ids(data):
+    """tag ids of vehicles in mqtt config data"""
+    frames = data if isinstance(data, list) else [data]
+    tag_ids = []
+    for frame in frames:
+        if isinstance(frame, dict) and frame.get("tagId"):
+            tag_ids.append(frame["tagId"])
+        elif isinstance(frame, str):
+            tag_ids.append(frame)
+    return tag_ids
+
+def process_mqtt(mesg, app=None):
     """all device configuration using mqtt subscribe msg
     {topic, type, data{action, data}}
     """
@@ -233,6 +255,12 @@ def process_mqtt(mesg):
         # from here it will jump to weber.py to -> def userConfig(self)
         logger.info("response : {}".format(str(resp)))
 
+        # patch access engine tag index with pushed vehicles
+        if app:
+            tag_ids = _config_tag_ids(mesg['data']['data'])
+            if tag_ids:
+                app.access_engine.database.refresh_tag_index(tag_ids)
+
 class Application:
 
     def __init__(self, settings):
@@ -257,6 +285,21 @@ class Application:
 
         self.rtc = itekRTC()
        
+        database = Database(self._db_settings)
+        # transactions are group commited in background, off the relay path
+        self.txn_writer = TransactionWriter(
+            database,
+            batch_size=self._db_settings.get("txn_batch_size", 64),
+            flush_interval=self._db_settings.get("txn_flush_ms", 200) / 1000,
+        )
+        self.txn_writer.start()
+        database.attach_writer(self.txn_writer)
+
+        # access decision is taken in-process, shared with web api routes
+        self.access_engine = AccessEngine(
+            database, Validator(), self.max_trans_count
+        )
+
         self.tag_form = settings["tag_form"]
         self.antennas = self._rfid_settings["antennas_name"]
 
@@ -291,8 +334,11 @@ class Application:
         # else system is in offline mode where everything is done localy without server
         # create que named _queue 
         self._queue = queue.Queue()
-        self.scanning_data_que = []
-        self.fastgate_data = []
+        # bounded tag handoff from rfid reader thread to decision loop
+        self.tag_pipeline = TagPipeline(
+            maxsize=self._app_settings.get("tag_queue_size", 64),
+            put_timeout=self._app_settings.get("tag_queue_put_timeout", 0.05),
+        )
 
         self.total_transaction = 0
         self.pending_transaction = 0
@@ -334,14 +380,16 @@ class Application:
     
     # put data in queue here it for rfid tag data 
     def insert_que(self, data, todays_tasks=None):
-        """ data que append from rfid scan function
+        """ data que append from rfid scan function, taglist is itekfeig.TagRead
+        same tag on same antenna already waiting for decision is coalesced
         """
         #print(data)
         if data and len(data) > 0:
-            self.fastgate_data.append(data)
             logger.debug("insert data : " + str(data))
-            if data["taglist"]!= None and len(data["taglist"]) > 0:
-                self.scanning_data_que.append(data["taglist"])
+            taglist = data.get("taglist")
+            if taglist != None and len(taglist) > 0:
+                key = (taglist.get(self.tag_form), taglist.get("ANT"))
+                self.tag_pipeline.put(taglist, key=key)
 
     # put data in queue
     def dump_que(self, mesg):
@@ -356,7 +404,7 @@ class Application:
 
 # put message in queue with given mesg dictionary 
     def start_scanning(self):
-        self.scanning_data_que = []
+        self.tag_pipeline.clear()
         mesg = {
             "topic": "rfid",
             "cmd": "fastgate",
@@ -366,13 +414,10 @@ class Application:
         self._queue.put(mesg)
         logger.debug("send start scanning : "+str(mesg))
 
-# when length of scanning_data_que is greater than zero then tag is scanned 
+# wait till tag is scanned or timeout
 # get that data out of queue and give for validation
-    def read_tags(self):
-        if len(self.scanning_data_que) > 0:
-                # when data available on queue
-            return self.scanning_data_que.pop(0)
-        return None
+    def read_tags(self, timeout=1.0):
+        return self.tag_pipeline.get(timeout=timeout)
 
     # def _append_internet_server_error(self, count):
     #     magic = 0
@@ -415,8 +460,12 @@ class Application:
                     if heartbeat_time - self._pre_hb_time >= self._app_settings["heartbeat_time"]:
                         self.heartbeat()
                         self._pre_hb_time = time.time()
+                        logger.info("tag pipeline : {}".format(self.tag_pipeline.stats(reset=True)))
+                        logger.info("transaction writer : {}".format(self.txn_writer.stats()))
             except Exception as e:
-                logger.error("error in periodic thread!, {}".format(e))    
+                logger.error("error in periodic thread!, {}".format(e))
+            # do not spin, heartbeat time is in seconds
+            time.sleep(0.5)
 
 # not called anywhere
     def _config_thread(self):
@@ -556,16 +605,14 @@ class Application:
         self.start_scanning()
         print("!!! Start Scanning....")
         logger.debug(">>> Start scanning !.....")
-        # object is valid_tag and class validator(validation.py) is asgined to it
-        valid_tag = Validator()
         # if rfid reader is not detected on red led, dont enter while loop
         # if rfid_not_detected != RFID_DISCONNECT:
         # self.gpio.prog_run_blink()
         
         while True:
-            # while 1, check if tag is present or not
-            # this function checks the queue scanning_data_que
-            # and if something is there it will return tag data
+            # while 1, wait for tag
+            # this function blocks on tag pipeline till tag is scanned
+            # and returns tag data, None if no tag within timeout
             
             tag_data = self.read_tags()
             #print(tag_data)
@@ -575,61 +622,38 @@ class Application:
                 # self.gpio.service_active_relays_off()
                 if tag_data:
                     # print(tag_data)
-                    # row_frame = appWrap.vehicle_access(tag_data[self.tag_form])
                     ant_name = self.antennas[int(tag_data["ANT"])-1]
-                    # local verification of tag done via api to avoid blocking of data
-                    # make url with api and vehicle_access to understand which api task is to be performed               
-                    url = API_URL + "vehicle_access"
-                    
-                    # make log in logs/app/app.log file
-                    logger.info("call url : "+str(url))
-                    # tag_data = {"EPC": ,"TID": , "ANT":}
-                    # requests.posts return <[status_code] 200> or <[status_code] 201> 200 means tag present in reader memory database, 201 means tag is not present in reader memory database  
-                    # url is URL + vehicle_access vehicle_access is a function in weber.py it is called and tag is searched in reader from that function
-                    # and tag information of that tag is taken from database is saved in row_frame tag id, access date, time , block date,time 
-                    row_frame = requests.post(url, data=str(tag_data[self.tag_form]))
+                    tag_id = tag_data[self.tag_form]
+                    # tag_data = TagRead, view {"EPC": ,"TID": , "ANT":}
+                    # access decision is taken in-process by access engine (access_engine.py),
+                    # tag is searched in reader memory database and validated for date, time and day access
+                    # tr_flag is TR_ACC1 for valid tag, TR_BLK1 for blocked tag, TR_NDB1 if tag not in database
+                    # row_frame is tag information from database, tag id, access date, time , block date,time
+                    tr_flag, row_frame = self.access_engine.decide(tag_id)
                     # make log in logs/app/app.log file, logger.(something) will make log in logs/app/app.log
-                    logger.info("resp url : "+str(row_frame.status_code))
+                    logger.info("access decision : {} {}".format(tag_id, tr_flag))
                 
-                    if row_frame.status_code == 200: 
-                        data_frame = row_frame.json()
-                        
-                        # print(data_frame)
-                        # data_frame from database comes like below
-                        # {'data': [3, '00361F46981138174876EE46', 'None', '30-03-2022 11:44:44', 'None',                     
-                        # 'None', '01-04-2022 00:00:00', '01-04-2022 00:00:00', '10:12:00', '17:12:00', 'A                   
-                        #  ', '01-09-2023 00:00:00', '30-11-2023 00:00:00', '16:02:00', '20:04:00', '7-6,', 1]}
-
-                        # call run function in validator class(validation.py) to check tag for date,time and day access
-                        status = valid_tag.run(data_frame["data"])
+                    if row_frame is not None:
+                        # row_frame from database comes like below
+                        # [3, '00361F46981138174876EE46', 'None', '30-03-2022 11:44:44', 'None',
+                        # 'None', '01-04-2022 00:00:00', '01-04-2022 00:00:00', '10:12:00', '17:12:00', 'A
+                        #  ', '01-09-2023 00:00:00', '30-11-2023 00:00:00', '16:02:00', '20:04:00', '7-6,', 1]
+                        status = tr_flag == TR_ACC1
                         print(status)
                         # if valid tag comes go in this if
                         if status:
                             print("Access Granted!")
 
                             # here check for has tag came from same antenna if from same antenna dont give access
-                            # ant_name = self.antennas[int(tag_data["ANT"])-1]
                             last_ant_time_now = time.time()
-                            # print("time.time function ",time.time())
-                            # print("datetime.now function ",datetime.now())
-                            # print("last ant time now ")
-                            # print(last_ant_time_now)
                             # check if same tag is detected on same antenna within access time
                             if(last_ant_time_now - last_ant_time[int(tag_data["ANT"])-1]  > self._all_boom_on_time[int(tag_data["ANT"])-1][1]):
-                            # last_ant_name = ant_name
                                 last_ant_time[int(tag_data["ANT"])-1] = last_ant_time_now
                                 # make log in logs/tags/tags.log, tag_logger.(something) will make log in logs/tags/tags.lo
-                                tag_logger.info("{} {} Access granted".format(self.right_mark, tag_data[self.tag_form]))
+                                tag_logger.info("{} {} Access granted".format(self.right_mark, tag_id))
                                 
                                 # save the log of this tag in reader memory
-                                
-                                # url = API_URL + "save_transaction"
-                                url = API_URL + "save_transaction_withLimit"
-                                logger.info("call url : "+str(url))
-                                # request.post will save transaction in reader memory database 
-                                # row_frame = requests.post(url, json={"tagid":tag_data[self.tag_form], "ANT":ant_name, "tr_flag":TR_ACC}) #"status":TR_ACC
-                                row_frame = requests.post(url, json={"tagid":tag_data[self.tag_form], "ANT":ant_name, "tr_flag":TR_ACC1, "limit":self.max_trans_count}) #"status":TR_ACC
-                                logger.info("resp url : "+str(row_frame))
+                                self.access_engine.record(tag_id, ant_name, TR_ACC1)
 
                                 # open the corsponding boom barrier
                                 self.gpio.boom_open(int(tag_data["ANT"])) #this function will open the boom for ton time and maked it off after that
@@ -639,7 +663,7 @@ class Application:
                                 # send data to server using mqtt 
                                 if self.mqtt:
                                     transaction_data = pars.vehicle_access(
-                                        data_pack={"tagId":tag_data[self.tag_form],
+                                        data_pack={"tagId":tag_id,
                                         "vehicleTime":get_datetime_stamp("%Y-%m-%d %H:%M:%S"),
                                         "gate":ant_name,
                                         "tFlag":TR_ACC1},
@@ -657,20 +681,15 @@ class Application:
                             # just on error light  
                             print("Access denied")
                             now_red_trigger1 = time.time()
-                            if self.last_invalidtag_scan != tag_data[self.tag_form] or (self.last_trigger_red - now_red_trigger1 ) > 3:
+                            if self.last_invalidtag_scan != tag_id or (self.last_trigger_red - now_red_trigger1 ) > 3:
                                 self.last_trigger_red = now_red_trigger1
 
-                                # url = API_URL + "save_transaction"
-                                url = API_URL + "save_transaction_withLimit"
-                                logger.info("call url : "+str(url))
-                                # request.post will save transaction in reader memory database 
-                                # row_frame = requests.post(url, json={"tagid":tag_data[self.tag_form], "ANT":ant_name, "tr_flag":TR_BLK})
-                                row_frame = requests.post(url, json={"tagid":tag_data[self.tag_form], "ANT":ant_name, "tr_flag":TR_BLK1, "limit":self.max_trans_count})
-                                logger.info("resp url : "+str(row_frame))
+                                # save the log of this tag in reader memory
+                                self.access_engine.record(tag_id, ant_name, TR_BLK1)
                                 
                                 if self.mqtt:
                                     transaction_data = pars.vehicle_access(
-                                        data_pack={"tagId":tag_data[self.tag_form],
+                                        data_pack={"tagId":tag_id,
                                         "vehicleTime":get_datetime_stamp("%Y-%m-%d %H:%M:%S"),
                                         "gate":ant_name,
                                         "tFlag":TR_BLK1},
@@ -682,28 +701,23 @@ class Application:
                                         qos=1
                                         )
 
-                                tag_logger.info("{} {} available in DB but access denied".format(self.wrong_mark, tag_data[self.tag_form]))
-                                self.last_invalidtag_scan = tag_data[self.tag_form]
+                                tag_logger.info("{} {} available in DB but access denied".format(self.wrong_mark, tag_id))
+                                self.last_invalidtag_scan = tag_id
                                 self.gpio.red_led_thread(int(tag_data["ANT"]))
                     
                     else:
                         print("vehicle not in database")
                         now_red_trigger = time.time()
                         #print(now_red_trigger - self.last_trigger_red)
-                        if self.last_invalidtag_scan != tag_data[self.tag_form] or (self.last_trigger_red - now_red_trigger ) > 3:
+                        if self.last_invalidtag_scan != tag_id or (self.last_trigger_red - now_red_trigger ) > 3:
                             self.last_trigger_red = now_red_trigger
 
-                            # url = API_URL + "save_transaction"
-                            url = API_URL + "save_transaction_withLimit"
-                            logger.info("call url : "+str(url))
-                            # request.post will save transaction in reader memory database 
-                            # row_frame = requests.post(url, json={"tagid":tag_data[self.tag_form], "ANT":ant_name, "tr_flag":TR_NDB})
-                            row_frame = requests.post(url, json={"tagid":tag_data[self.tag_form], "ANT":ant_name, "tr_flag":TR_NDB1, "limit":self.max_trans_count})
-                            logger.info("resp url : "+str(row_frame))
+                            # save the log of this tag in reader memory
+                            self.access_engine.record(tag_id, ant_name, TR_NDB1)
 
                             if self.mqtt:
                                     transaction_data = pars.vehicle_access(
-                                        data_pack={"tagId":tag_data[self.tag_form],
+                                        data_pack={"tagId":tag_id,
                                         "vehicleTime":get_datetime_stamp("%Y-%m-%d %H:%M:%S"),
                                         "gate":ant_name,
                                         "tFlag":TR_NDB1},
@@ -715,8 +729,8 @@ class Application:
                                         qos=1
                                         )
 
-                            tag_logger.info("{} {} tag not available in DB".format(self.skull_mark, tag_data[self.tag_form]))
-                            self.last_invalidtag_scan = tag_data[self.tag_form]
+                            tag_logger.info("{} {} tag not available in DB".format(self.skull_mark, tag_id))
+                            self.last_invalidtag_scan = tag_id
                             self.gpio.red_led_thread(int(tag_data["ANT"]))
                 
             else:
@@ -727,18 +741,22 @@ class Application:
     
     def close(self):
         logger.fatal("app Exited!")
+        self.txn_writer.close()
+        self.access_engine.database.close()
 
     def config_dump(self, data):
         print("pushing data "+str(data))
 
 def main():
+    global access_engine
     logger.info("Application VERSION= %s %s", APP_VERSION, APP_BUILD)
     print("Application VERSION=", APP_VERSION, ", Build=", APP_BUILD)
     #print(localConfig["gpio"])
     # class Application in same main.py is objected as app
     # where ever you see app.something it means that is in class Application of this file
     app = Application(localConfig)
-
+    # web api vehicle access routes use the same access engine as the app
+    access_engine = app.access_engine
 
     # Start application
     # make and start thread to listen the messages from rfid and mqtt
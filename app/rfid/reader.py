@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
 import time
 import queue
 import copy
@@ -152,6 +153,39 @@ class RFIDReader:
             elif topic == RFIDReader.PUBLISH_DIAGNOSTIC:
                 self.diagnostic(message)
 
+    @staticmethod
+    def config_cache(config):
+        """Reader info and configuration pages cache, rfid.config_cache is
+        the directory relative to the application, empty disables the cache
+        """
+        path = config.get("config_cache", "database/reader_cache")
+        if not path:
+            return None
+        return feig.ConfigCache(os.path.join(os.path.dirname(CONFIG_TOML_FILE), path))
+
+    @staticmethod
+    def simulated_interface(config, reader_name):
+        """Reader interface without hardware for load tests, rfid.interface
+        "simulator": simulator_tags tags read at simulator_rate reads/s on
+        the configured antennas, "replay": answers from replay_file recorded
+        with rfid.record
+        """
+        if config["interface"] == "replay":
+            from itekfeig.interface.feig_replay import FeigReplayInterface
+
+            return FeigReplayInterface(
+                os.path.join(os.path.dirname(CONFIG_TOML_FILE), config["replay_file"])
+            )
+
+        from itekfeig.interface.feig_simulator import FeigSimulator, tag_population
+
+        rssi = {ant[0]: 60 for ant in config["antennas"]}
+        return FeigSimulator(
+            reader=reader_name,
+            tags=tag_population(config.get("simulator_tags", 100), rssi),
+            rate=config.get("simulator_rate", 100),
+        )
+
     def setup(self, config):
         message = {
             "cmd": "setup",
@@ -168,6 +202,7 @@ class RFIDReader:
             self.on_setup(self, message)
             return
 
+        reader.config_cache = self.config_cache(config)
 
         # Get interface configuration
         interface_settings = {}
@@ -192,12 +227,24 @@ class RFIDReader:
                 }
             }
 
+        elif interface in ("simulator", "replay"):
+            interface = {
+                "interface" : self.simulated_interface(config, reader.READER_NAME),
+                "settings": {},
+            }
+
         else:
             logger.error("Reader Interface={} NOT supported".format(interface))
             message["reason"] = RFIDErrors.INVALID_INTERFACE.name
             self.on_setup(self, message)
             return
 
+        # record commands and responses for replay
+        if config.get("record", ""):
+            interface["settings"]["RECORD"] = os.path.join(
+                os.path.dirname(CONFIG_TOML_FILE), config["record"]
+            )
+
         # Start reader connection
         try:            
             print(interface["interface"], interface["settings"])
@@ -281,6 +328,8 @@ class RFIDReader:
                 self.on_setup(self, message)
                 return 
 
+            reader.config_cache = self.config_cache(config)
+
             self._reader = reader
             interface = config["interface"]
             self._interface = interface
@@ -754,62 +803,33 @@ class RFIDReader:
         nearest_antenna = min(antennas, key=lambda ant: ant['rssi'])
         return int(nearest_antenna["antno"])
 
-    def apply_rssi_filter(self, taglist):
-        # apply rssi
-        for tag in taglist.values():
-            for idx, ant in enumerate(tag["antennas"]):
-                antno = ant["antno"]
-                if antno in self._ant_rssi:
-                    if self._ant_rssi[antno] <= ant["rssi"]:
-                        tag["antennas"].pop(idx)
-
-        # remove empty antenna
-        tags = {}
-        for tid,tag in taglist.items():
-            if tag["antennas"] != []:
-                tags[tid] = tag
-
-        return tags
-
-    def update_tags_list(self, currentlist, newlist):
-        new_tag_count = 0
-        new_tags = {}
-
-        for tid, tag in newlist.items():
-            try:
-                # Update respective parameters
-                currentlist[tid]["last_seen"] = tag["last_seen"]
-                currentlist[tid]["seen_count"] += tag["seen_count"]
-
-                currentlist[tid]["antennas"] = self._reader.BufferReadMode._update_antennas(
-                    currentlist[tid]["antennas"], tag["antennas"]
-                )
-
-            except KeyError:
-                # New Tag, add it
-                new_tag_count += 1
-                new_tags[tid] = tag  # add only new tag
-
-                # update current tag list
-                currentlist[tid] = tag
+    def update_tags_list(self, aggregator, newtags):
+        """Merge tag records of a buffer read into aggregator (TagAggregator),
+        returns count and dict of NEW tags
+        """
+        new_tids = aggregator.update(newtags)
 
-                # get EAN,SerialNumber
-                try:
-                    ean, srno = gs1.sgtin96_to_ean(currentlist[tid]["epc"])
-                except gs1.SGTINDecodeError:
-                    # Make it NON-ENCODED
-                    ean, srno = "NON-ENCODED", ""
+        # get EAN,SerialNumber of all new tags
+        epcs = [aggregator.tag(tid)["epc"] for tid in new_tids]
+        decoded = gs1.decode_many(epcs)
 
-                currentlist[tid]["nearestAnt"] = self.nearest_antenna_no(currentlist[tid]["antennas"])
-                currentlist[tid]["ean"] = ean
-                currentlist[tid]["serialNo"] = srno
+        for tid, epc, ean_srno in zip(new_tids, epcs, decoded):
+            if ean_srno is None:
+                # Make it NON-ENCODED
+                ean, srno = "NON-ENCODED", ""
+            else:
+                ean, srno = ean_srno
 
+            aggregator.annotate(
+                tid,
+                nearestAnt=self.nearest_antenna_no(aggregator.antennas(tid)),
+                ean=ean,
+                serialNo=srno,
                 # Get Tagtype
-                currentlist[tid]["hard_tag"] = self.check_hard_tag(
-                    currentlist[tid]["epc"], srno
-                )
+                hard_tag=self.check_hard_tag(epc, srno),
+            )
 
-        return new_tag_count, new_tags
+        return len(new_tids), aggregator.tags(new_tids)
 
     def update_ean_list(self, taglist, eanlist):
         for tid in taglist:
@@ -847,17 +867,21 @@ class RFIDReader:
             return
 
         uniqueEanList = {}
-        uniqueTags = {}
+        # unique tags by TID, rssi filter is applied on every antenna read
+        uniqueTags = feig.TagAggregator(self._ant_rssi if self._rssi_filter else None)
 
         noTagTime = time.time()
         noTagTimeLimit = 1.0
 
         comm_timeout = 0
 
+        # polls fast while tags come in, backs off on an empty buffer
+        scheduler = self._reader.BufferReadMode.scheduler()
+
         while True:
 
-            # read buffer
-            tags = self._reader.BufferReadMode.read()
+            # read buffer, tags read are cleared by the scheduler
+            tags = scheduler.poll()
             if tags is None:
                 if self._reader.get_last_error() == FeigError.INVALID_RESPONSE:
                     # try next
@@ -872,20 +896,8 @@ class RFIDReader:
                     return
 
             if len(tags) > 0:
-                # clear buffer
-                self._reader.BufferReadMode.clear()
-                if self._reader.get_last_error() != FeigError.OK:
-                    err_msg = self._reader.get_last_error_str()
-                    logger.debug("buffer clear Failed. {}".format(err_msg))
-
-                # make unique lists
-                tags = self._reader.BufferReadMode._unique_tags(tags)
                 logger.debug("tags = {}".format(tags))
 
-                if self._rssi_filter:
-                    tags = self.apply_rssi_filter(tags)
-                    logger.debug("filtered tags = {}".format(tags))
-
                 # update current tag list and return NEW tags if found
                 new_tag_count, new_tags = self.update_tags_list(uniqueTags, tags)
                 if new_tag_count > 0:
@@ -908,10 +920,11 @@ class RFIDReader:
         # SEND FINAL RESPONSE
         message["status"] = "success"
         message["eanList"] = uniqueEanList.copy()
-        message["tagList"] = uniqueTags.copy()
+        message["tagList"] = uniqueTags.tags()
         self.on_fastgate(self, message)
 
-        logger.debug("Scanned tags={}".format(uniqueTags))
+        logger.debug("Scanned tags={}".format(message["tagList"]))
+        logger.debug("buffer read={}".format(scheduler.stats()))
 
         self.change_host()
 
@@ -972,21 +985,14 @@ class RFIDReader:
         }
         print("starting scanning ..rfid!")
         self.serial_read.flushInput()
-        EPC_OFFSET = 4
-        EPC_LEN = 12 # in bytes
-        EPC_ASCII_LEN = EPC_LEN*2
-        EPC_START = EPC_OFFSET
-        EPC_END = EPC_START + EPC_ASCII_LEN
-        
-        TID_LEN = 12 # in bytes
-        TID_ASCII_LEN = TID_LEN*2
-        TID_START = EPC_END
-        TID_END = TID_START + TID_ASCII_LEN
 
-        ANT_LEN = 12 # in bytes
-        ANT_ASCII_LEN = TID_LEN*2
-        ANT_START = TID_END + 1
-        ANT_END = ANT_START + ANT_ASCII_LEN
+        # frames: USR_HDR(4) + EPC + TID + SEP + ANT + CR LF, lengths in ASCII
+        frame_reader = feig.ScanFrameReader(
+            self.serial_read,
+            epc_len=self._config.get("epc_len", 24),
+            tid_len=self._config.get("tid_len", 24),
+        )
+        malformed = 0
 
         print("Starting reception....")
 
@@ -998,20 +1004,15 @@ class RFIDReader:
         #print("list of epcs :" +str(epc_list))
 
         while True:
-            d = self.serial_read.readline()
-            # print('\nRAW= ', d, len(d))
-            # print((d[0:len(d)-1]).decode("ascii").encode("utf16"))
-
-            if len(d) == 57:
-                # extract EPC, TID
-                EPC = d[EPC_START : EPC_END].decode('ascii')
-                TID = d[TID_START : TID_END].decode('ascii')
-                ANT = (d[ANT_START : ANT_END].decode('ascii')).replace("\r\n","")
-                # print("EPC > ",EPC)
-                # print("TID > ",TID)
-                # print("Ant no. > ",ANT)
-                # print(EPC, TID, ANT)
-                message["taglist"] = {"EPC":EPC, "TID":TID,"ANT":ANT}
+            tags = frame_reader.read()
+
+            if frame_reader.malformed != malformed:
+                malformed = frame_reader.malformed
+                logger.warning("malformed scan frames {}".format(frame_reader.stats()))
+
+            for tag in tags:
+                # keys EPC, TID, ANT are kept by the view of TagRead
+                message["taglist"] = tag
                 message["status"] = "running"
                 self.on_fastgate(self, message)
 
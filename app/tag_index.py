@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Memory resident index of UserList keyed by TAG_ID.
+
+Every row is kept as a tuple in UserList column order, values repeated across
+the fleet (dates, times, week days, "None") are interned so they are stored
+once. Next to the row its compiled access rule is kept, so validation does not
+parse dates of the row again. One index is shared by all Database objects using the same database file,
+so changes done by the web api are seen by the access decision loop.
+"""
+
+import logging
+import os
+import sys
+import threading
+
+from .access_rules import compile_rule
+
+logger = logging.getLogger("db")
+
+# default memory budget of the index
+DEFAULT_BUDGET = 16 * 1024 * 1024  # bytes
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def tag_index_for(db_path, budget=DEFAULT_BUDGET):
+    """Returns TagIndex shared by all users of db_path"""
+    key = os.path.abspath(db_path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = TagIndex(budget)
+            _indexes[key] = index
+        return index
+
+
+def _compact(row) -> tuple:
+    # TAG_ID (column 1) is unique, rest of the text values are interned
+    return tuple(
+        sys.intern(value) if isinstance(value, str) and idx != 1 else value
+        for idx, value in enumerate(row)
+    )
+
+
+class TagIndex:
+    """TAG_ID -> UserList row and compiled AccessRule
+
+    Args:
+        budget: int, memory budget in bytes, a warning is logged when exceeded
+    """
+    TAG_ID = 1  # column index of TAG_ID in UserList row
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self._rows = {}
+        self._rules = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._budget = budget
+        # incremented on every change of rows
+        self._version = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def load(self, rows):
+        """Replace complete index with given UserList rows"""
+        new_rows = {}
+        new_rules = {}
+        for row in rows:
+            new_rows[row[self.TAG_ID]] = _compact(row)
+            new_rules[row[self.TAG_ID]] = compile_rule(row)
+
+        with self._lock:
+            self._rows = new_rows
+            self._rules = new_rules
+            self._loaded = True
+            self._version += 1
+
+        logger.info("tag index loaded {} vehicles".format(len(new_rows)))
+        self.check_budget()
+
+    def invalidate(self):
+        """Mark index stale, it is loaded again on next use"""
+        with self._lock:
+            self._loaded = False
+
+    def get(self, tag_id):
+        """Returns UserList row of tag_id, None if not available"""
+        return self._rows.get(tag_id)
+
+    def rule(self, tag_id):
+        """Returns compiled AccessRule of tag_id, None if not available"""
+        return self._rules.get(tag_id)
+
+    def put(self, row):
+        """Add or replace one UserList row"""
+        rule = compile_rule(row)
+        row = _compact(row)
+        with self._lock:
+            self._rows[row[self.TAG_ID]] = row
+            self._rules[row[self.TAG_ID]] = rule
+            self._version += 1
+
+    def remove(self, tag_id):
+        with self._lock:
+            self._rows.pop(tag_id, None)
+            self._rules.pop(tag_id, None)
+            self._version += 1
+
+    def patch(self, tag_ids, rows):
+        """Update index for tag_ids from their current UserList rows,
+        tags without row are removed.
+        """
+        found = {row[self.TAG_ID]: _compact(row) for row in rows}
+        rules = {tag_id: compile_rule(row) for tag_id, row in found.items()}
+        with self._lock:
+            for tag_id in tag_ids:
+                row = found.get(tag_id)
+                if row is None:
+                    self._rows.pop(tag_id, None)
+                    self._rules.pop(tag_id, None)
+                else:
+                    self._rows[tag_id] = row
+                    self._rules[tag_id] = rules[tag_id]
+            self._version += 1
+
+    def rules(self):
+        """Returns (version, tag_ids, rules) snapshot of all rules"""
+        with self._lock:
+            return self._version, list(self._rules.keys()), list(self._rules.values())
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, tag_id):
+        return tag_id in self._rows
+
+    def memory_usage(self) -> int:
+        """Approximate memory used by index in bytes, shared values counted once"""
+        seen = set()
+        size = sys.getsizeof(self._rows) + sys.getsizeof(self._rules)
+        for tag_id, row in list(self._rows.items()):
+            size += sys.getsizeof(row)
+            for value in (tag_id, self._rules.get(tag_id)) + row:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+        return size
+
+    def check_budget(self) -> bool:
+        """Returns False and logs warning when index is over memory budget"""
+        usage = self.memory_usage()
+        if usage > self._budget:
+            logger.warning(
+                "tag index {} vehicles uses {} bytes, budget {} bytes".format(
+                    len(self._rows), usage, self._budget
+                )
+            )
+            return False
+        return True
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tag handoff from rfid reader thread to the access decision loop.
+
+A bounded queue, the decision loop blocks on get() while no tag is present
+instead of polling. When the gate is flooded the producer is held back for
+put_timeout (backpressure), after that the flood policy decides which tag
+is dropped. A tag already waiting in the queue is coalesced, not queued again.
+"""
+
+import threading
+import time
+from collections import deque
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+
+class TagPipeline:
+    """Bounded blocking tag queue with drop/coalesce policy.
+
+    Args:
+        maxsize: int, maximum tags waiting for decision
+        policy: DROP_OLDEST or DROP_NEWEST, used when queue is full
+        put_timeout: float, seconds producer waits for free slot before drop
+    """
+
+    def __init__(self, maxsize=64, policy=DROP_OLDEST, put_timeout=0.05):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0")
+        if policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError("invalid policy {}".format(policy))
+
+        self._maxsize = maxsize
+        self._policy = policy
+        self._put_timeout = put_timeout
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+        self._items = deque()  # (key, tag, enqueue time)
+        self._pending = set()  # keys of tags waiting in queue
+
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._put_count = 0
+        self._get_count = 0
+        self._dropped = 0
+        self._coalesced = 0
+        self._max_depth = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def put(self, tag, key=None) -> bool:
+        """Queue tag for decision.
+
+        Args:
+            tag: tag data
+            key: hashable, tags with same key waiting in queue are coalesced
+
+        Returns:
+            True if tag is queued
+        """
+        with self._lock:
+            if key is not None and key in self._pending:
+                self._coalesced += 1
+                return False
+
+            if len(self._items) >= self._maxsize and self._put_timeout > 0:
+                # backpressure, hold producer till decision loop frees a slot
+                self._not_full.wait_for(
+                    lambda: len(self._items) < self._maxsize, self._put_timeout
+                )
+
+            if len(self._items) >= self._maxsize:
+                self._dropped += 1
+                if self._policy == DROP_NEWEST:
+                    return False
+
+                old_key, _, _ = self._items.popleft()
+                self._pending.discard(old_key)
+
+            self._items.append((key, tag, time.monotonic()))
+            if key is not None:
+                self._pending.add(key)
+
+            self._put_count += 1
+            if len(self._items) > self._max_depth:
+                self._max_depth = len(self._items)
+
+            self._not_empty.notify()
+
+        return True
+
+    def get(self, timeout=None):
+        """Wait for next tag.
+
+        Args:
+            timeout: float or None, None wait forever
+
+        Returns:
+            tag, None if timeout
+        """
+        with self._lock:
+            if not self._not_empty.wait_for(lambda: len(self._items) > 0, timeout):
+                return None
+
+            key, tag, enqueue_time = self._items.popleft()
+            if key is not None:
+                self._pending.discard(key)
+
+            wait = time.monotonic() - enqueue_time
+            self._wait_total += wait
+            if wait > self._wait_max:
+                self._wait_max = wait
+            self._get_count += 1
+
+            self._not_full.notify()
+
+        return tag
+
+    def clear(self):
+        """Remove all waiting tags"""
+        with self._lock:
+            self._items.clear()
+            self._pending.clear()
+            self._not_full.notify_all()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def stats(self, reset=False) -> dict:
+        """Returns pipeline counters
+
+        .. code:: python
+            stats = {
+                "depth": int,           # tags waiting now
+                "max_depth": int,
+                "queued": int,
+                "processed": int,
+                "dropped": int,
+                "coalesced": int,
+                "wait_avg_ms": float,   # queue wait time of processed tags
+                "wait_max_ms": float,
+            }
+        """
+        with self._lock:
+            wait_avg = 0.0
+            if self._get_count:
+                wait_avg = self._wait_total / self._get_count
+
+            stats = {
+                "depth": len(self._items),
+                "max_depth": self._max_depth,
+                "queued": self._put_count,
+                "processed": self._get_count,
+                "dropped": self._dropped,
+                "coalesced": self._coalesced,
+                "wait_avg_ms": round(wait_avg * 1000, 3),
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+            }
+            if reset:
+                self._reset_counters()
+
+        return stats
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Background transaction writer.
+
+save_transaction*() only appends the transaction to a small spool file and
+queues it, a writer thread inserts queued transactions in one commit every
+batch_size records or flush_interval seconds. Disk latency of the database
+never sits on the relay path.
+
+Spool is an append-only file of json lines next to the database. Every record
+has a sequence number, the highest committed sequence is saved in Config table
+in the same commit as the records, so after a crash only records not yet in
+the database are replayed from the spool on next start.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger("db")
+
+# Config table NAME of highest sequence commited from spool
+SPOOL_SEQ_NAME = "txn_spool_seq"
+
+
+class TransactionWriter:
+    """Group commit writer of Transactions table.
+
+    Args:
+        database: Database object
+        batch_size: int, records commited together
+        flush_interval: float, seconds a record waits at most before commit
+        spool_path: str, spool file, defaults to database path + ".spool"
+    """
+
+    def __init__(self, database, batch_size=64, flush_interval=0.2, spool_path=None):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be greater than 0")
+
+        self._db = database
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        if spool_path is None:
+            spool_path = database._db_path + ".spool"
+        self._spool_path = spool_path
+        self._spool = None
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._flushed = threading.Condition(self._lock)
+
+        # (seq, enqueue time, record), record is (tag_id, date_time, ant_name, tr_flag, limit)
+        self._queue = deque()
+        self._seq = 0
+        self._pending = 0  # queued + being written
+        self._flush_requested = False
+        self._closing = False
+        self._thread = None
+
+        self._written = 0
+        self._commits = 0
+        self._errors = 0
+
+    def start(self):
+        """Replay spool left by previous run and start writer thread"""
+        if self._thread is not None:
+            return
+
+        commited = int(self._db.get_config_value(SPOOL_SEQ_NAME, 0))
+        self._seq = commited
+        replay = []
+        for seq, record in self._read_spool():
+            self._seq = max(self._seq, seq)
+            if seq > commited:
+                replay.append((seq, time.monotonic(), record))
+
+        if replay:
+            logger.info("replay {} transactions from spool".format(len(replay)))
+            self._queue.extend(replay)
+            self._pending += len(replay)
+        elif os.path.exists(self._spool_path):
+            os.truncate(self._spool_path, 0)
+
+        self._spool = open(self._spool_path, "a")
+
+        self._thread = threading.Thread(
+            target=self._run, name="txn_writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _read_spool(self):
+        try:
+            with open(self._spool_path) as spool:
+                lines = spool.readlines()
+        except FileNotFoundError:
+            return []
+
+        records = []
+        for line in lines:
+            try:
+                data = json.loads(line)
+                records.append((data[0], tuple(data[1:])))
+            except (ValueError, IndexError):
+                # last line is incomplete when writing was interrupted
+                logger.warning("skip invalid spool line %r", line)
+        return records
+
+    def put(self, tag_id, date_time, ant_name, tr_flag, limit=None) -> bool:
+        """Queue transaction, returns False if writer is closed
+
+        Args:
+            limit: int, rotate Transactions to limit rows, None no rotation
+        """
+        record = (str(tag_id), date_time, str(ant_name), str(tr_flag), limit)
+        with self._lock:
+            if self._closing or self._spool is None:
+                return False
+
+            self._seq += 1
+            # flushed to os only, survives application crash without fsync
+            self._spool.write(json.dumps((self._seq,) + record) + "\n")
+            self._spool.flush()
+
+            self._queue.append((self._seq, time.monotonic(), record))
+            self._pending += 1
+            self._not_empty.notify()
+        return True
+
+    def _take_batch(self):
+        with self._lock:
+            self._not_empty.wait_for(lambda: self._queue or self._closing)
+            if self._queue and not self._closing:
+                # group commit, wait for full batch till oldest record is due
+                due = self._queue[0][1] + self._flush_interval
+                self._not_empty.wait_for(
+                    lambda: len(self._queue) >= self._batch_size or self._closing or self._flush_requested,
+                    max(0.0, due - time.monotonic()),
+                )
+
+            batch = []
+            while self._queue and len(batch) < self._batch_size:
+                batch.append(self._queue.popleft())
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                # closing and nothing left
+                break
+
+            try:
+                self._db.write_transactions(
+                    [record for _, _, record in batch], spool_seq=batch[-1][0]
+                )
+            except Exception:
+                self._errors += 1
+                logger.exception("while writing {} transactions".format(len(batch)))
+                with self._lock:
+                    # keep order, records are retried with next batch
+                    self._queue.extendleft(reversed(batch))
+                    closing = self._closing
+                if closing:
+                    # records stay in spool, replayed on next start
+                    break
+                time.sleep(self._flush_interval)
+                continue
+
+            with self._lock:
+                self._written += len(batch)
+                self._commits += 1
+                self._pending -= len(batch)
+                if self._pending == 0:
+                    self._flush_requested = False
+                    if self._spool is not None:
+                        # everything is in database, start empty spool
+                        self._spool.truncate(0)
+                        self._spool.seek(0)
+                    self._flushed.notify_all()
+
+    def flush(self, timeout=None) -> bool:
+        """Commit queued transactions now, without waiting for full batch or
+        flush_interval, returns False if timeout
+        """
+        with self._lock:
+            if self._pending == 0:
+                return True
+            self._flush_requested = True
+            self._not_empty.notify()
+            return self._flushed.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout=5.0):
+        """Commit queued transactions and stop writer thread"""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            self._not_empty.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+        with self._lock:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+            if self._pending:
+                logger.warning("{} transactions left in spool".format(self._pending))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "written": self._written,
+                "commits": self._commits,
+                "errors": self._errors,
+            }
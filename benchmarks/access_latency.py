@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Access decision latency benchmark.
+
+Measures tag-to-relay time per decision of the in-process AccessEngine, i.e.
+time from a tag taken out of the scan queue till the point boom relay is
+switched (decision + transaction record), on a temporary database.
+
+usage: python3 -m benchmarks.access_latency [--vehicles N] [--decisions N] [--txn-writer]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from app.database import Database, DB_PATH
+from app.validation import Validator
+from app.access_engine import AccessEngine, TR_ACC1
+from app.txn_writer import TransactionWriter
+
+
+def _make_database(tmpdir, vehicles, max_trans_count):
+    db_file = os.path.join(tmpdir, "bench.sqlite3")
+    settings = {
+        # Database joins db_path with application root path
+        "db_path": os.path.relpath(db_file, DB_PATH),
+        "max_trans_count": max_trans_count,
+        "max_vehicle_count": vehicles + 1,
+    }
+    database = Database(settings)
+
+    frames = []
+    for idx in range(vehicles):
+        frames.append({
+            "tagId": "E200{:020X}".format(idx),
+            "ownerName": "owner{}".format(idx),
+            "fromDate": "2020-01-01 00:00:00",
+            "toDate": "2099-12-31 00:00:00",
+            "fromTime": "00:00:00",
+            "toTime": "23:59:59",
+            "weekDay": "A",
+        })
+    database.add_user_vehicle(frames)
+
+    return database
+
+
+def _percentile(samples, pct):
+    samples = sorted(samples)
+    idx = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[idx]
+
+
+def run(vehicles=1000, decisions=2000, max_trans_count=100000, txn_writer=False):
+    # keep benchmark out of application logs
+    logging.getLogger("db").setLevel(logging.WARNING)
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    tmpdir = tempfile.mkdtemp(prefix="fastgate-bench-")
+    try:
+        database = _make_database(tmpdir, vehicles, max_trans_count)
+        writer = None
+        if txn_writer:
+            writer = TransactionWriter(database)
+            writer.start()
+            database.attach_writer(writer)
+        engine = AccessEngine(database, Validator(), max_trans_count)
+
+        tag_ids = ["E200{:020X}".format(idx) for idx in range(vehicles)]
+        unknown = ["FFFF{:020X}".format(idx) for idx in range(16)]
+
+        samples = []
+        granted = 0
+        for _ in range(decisions):
+            if random.random() < 0.9:
+                tag_id = random.choice(tag_ids)
+            else:
+                tag_id = random.choice(unknown)
+
+            start = time.perf_counter()
+            tr_flag, _ = engine.decide(tag_id)
+            engine.record(tag_id, "IN", tr_flag)
+            samples.append(time.perf_counter() - start)
+
+            if tr_flag == TR_ACC1:
+                granted += 1
+
+        if writer is not None:
+            writer.close()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    return {
+        "vehicles": vehicles,
+        "decisions": decisions,
+        "granted": granted,
+        "mean_ms": statistics.mean(samples) * 1000,
+        "p50_ms": _percentile(samples, 50) * 1000,
+        "p99_ms": _percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="access engine latency benchmark")
+    parser.add_argument("--vehicles", type=int, default=1000)
+    parser.add_argument("--decisions", type=int, default=2000)
+    parser.add_argument("--max-trans-count", type=int, default=100000)
+    parser.add_argument("--txn-writer", action="store_true", help="record through background writer")
+    args = parser.parse_args()
+
+    result = run(args.vehicles, args.decisions, args.max_trans_count, args.txn_writer)
+    print("tag-to-relay per decision, {vehicles} vehicles, {decisions} decisions".format(**result))
+    print("  mean={mean_ms:.3f}ms p50={p50_ms:.3f}ms p99={p99_ms:.3f}ms max={max_ms:.3f}ms".format(**result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rotating transaction log benchmark.
+
+Measures save_transaction_withLimit cost on a full Transactions table for
+growing max_trans_count, the cost should stay flat.
+
+usage: python3 -m benchmarks.transaction_log [--limits N,N,..] [--inserts N]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from app.database import Database, DB_PATH
+
+
+def _make_database(tmpdir, limit):
+    db_file = os.path.join(tmpdir, "bench{}.sqlite3".format(limit))
+    settings = {
+        # Database joins db_path with application root path
+        "db_path": os.path.relpath(db_file, DB_PATH),
+        "max_trans_count": limit,
+        "max_vehicle_count": 1,
+    }
+    database = Database(settings)
+
+    # fill table up to the limit, next inserts rotate
+    with database._pool.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO Transactions (TAG_ID, DATE_TIME, ANT_NAME, TR_FLAG) VALUES (?, ?, ?, ?)",
+            (
+                ("E200{:020X}".format(idx), "2022-01-01 00:00:00", "IN", "Authorized")
+                for idx in range(limit)
+            ),
+        )
+    return database
+
+
+def run(limits=(1000, 10000, 100000), inserts=1000):
+    # keep benchmark out of application logs
+    logging.getLogger("db").setLevel(logging.WARNING)
+
+    results = []
+    tmpdir = tempfile.mkdtemp(prefix="fastgate-bench-")
+    try:
+        for limit in limits:
+            database = _make_database(tmpdir, limit)
+            samples = []
+            for idx in range(inserts):
+                start = time.perf_counter()
+                database.save_transaction_withLimit(
+                    "E200{:020X}".format(idx), "IN", "Authorized", limit
+                )
+                samples.append(time.perf_counter() - start)
+
+            results.append({
+                "limit": limit,
+                "rows": database.get_count("Transactions"),
+                "mean_ms": statistics.mean(samples) * 1000,
+                "max_ms": max(samples) * 1000,
+            })
+            database.close()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="rotating transaction log benchmark")
+    parser.add_argument("--limits", default="1000,10000,100000")
+    parser.add_argument("--inserts", type=int, default=1000)
+    args = parser.parse_args()
+
+    limits = [int(limit) for limit in args.limits.split(",")]
+    for result in run(limits, args.inserts):
+        print("limit={limit} rows={rows} mean={mean_ms:.3f}ms max={max_ms:.3f}ms".format(**result))
+
+
+if __name__ == "__main__":
+    main()
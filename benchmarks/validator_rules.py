@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Access validation microbenchmark.
+
+Compares Validator.run() of UserList rows with evaluation of the precompiled
+AccessRule of the same rows against one time snapshot, and checks both give
+the same result.
+
+usage: python3 -m benchmarks.validator_rules [--rows N] [--rounds N]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.validation import Validator
+from app.access_rules import compile_rule, access_time
+
+NO_DATE = "0000-00-00 00:00:00"
+
+
+def _make_rows(count):
+    now = datetime.now()
+    rows = []
+    for idx in range(count):
+        start = now + timedelta(days=random.randint(-30, 5))
+        end = start + timedelta(days=random.randint(0, 60))
+        row = [
+            idx, "E200{:020X}".format(idx), "None", now.strftime("%Y-%m-%d %H:%M:%S"), "None", "None",
+            start.strftime("%Y-%m-%d 00:00:00"), end.strftime("%Y-%m-%d 00:00:00"),
+            random.choice(["00:00:00", "06:00:00", "09:30:00"]),
+            random.choice(["23:59:59", "18:00:00", "21:30:00"]),
+            random.choice(["A", "1,2,3,4,5", "6,7"]),
+            NO_DATE, NO_DATE, "00:00:00", "00:00:00", "0",
+            1,
+        ]
+        if idx % 4 == 0:
+            # blocked window
+            row[11:16] = row[6:11]
+        rows.append(tuple(row))
+    return rows
+
+
+def _rate(func, rows, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for row in rows:
+            func(row)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(rows)) * 1e6
+
+
+def run(rows=1000, rounds=5):
+    rows = _make_rows(rows)
+    validator = Validator()
+
+    start = time.perf_counter()
+    rules = [compile_rule(row) for row in rows]
+    compile_us = (time.perf_counter() - start) / len(rows) * 1e6
+
+    # one snapshot per decision, as the access engine does
+    now = access_time()
+    mismatches = sum(
+        1 for row, rule in zip(rows, rules)
+        if bool(validator.run(row)) != rule.evaluate(now)
+    )
+
+    rule_of = dict(zip(rows, rules))
+    return {
+        "rows": len(rows),
+        "mismatches": mismatches,
+        "compile_us": compile_us,
+        "validator_us": _rate(validator.run, rows, rounds),
+        "rule_us": _rate(lambda row: rule_of[row].evaluate(access_time()), rows, rounds),
+        "rule_snapshot_us": _rate(lambda row: rule_of[row].evaluate(now), rows, rounds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="access validation microbenchmark")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    result = run(args.rows, args.rounds)
+    print("{rows} rows, {mismatches} mismatches, compile {compile_us:.2f}us/row".format(**result))
+    print("  Validator.run            {validator_us:.2f}us/row".format(**result))
+    print("  AccessRule + snapshot    {rule_us:.2f}us/row".format(**result))
+    print("  AccessRule, shared now   {rule_snapshot_us:.2f}us/row".format(**result))
+
+
+if __name__ == "__main__":
+    main()
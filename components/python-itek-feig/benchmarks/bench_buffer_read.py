@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Buffer read polling benchmark.
+
+A simulated reader fills its buffer with tags at a given rate and charges
+every command with the transfer time of its bytes on a serial link. The
+fixed 20ms poll of the former inventory loop and the tight loop of scan
+count are compared with BufferReadScheduler: reads per second, tags per
+second, serial link utilization and the delay of a tag in the buffer.
+
+usage: python3 -m benchmarks.bench_buffer_read [--rate TAGS/s] [--baudrate N] [--duration S]
+"""
+
+import argparse
+import time
+
+from itekfeig.common.feig_buffer_read import FeigBufferRead, BufferReadScheduler
+from itekfeig.common.feig_protocol import decode, encode
+
+from .frames import brm_record, TR_DATA1, TR_DATA2
+
+READER_TURNAROUND = 0.002  # seconds, reader processing of one command
+
+
+class SimulatedReader:
+    """Interface answering buffer read commands like a reader in BRM"""
+
+    ID = "Serial"
+
+    def __init__(self, rate, baudrate):
+        self.rate = rate
+        self.byte_time = 10 / baudrate
+        self.record = brm_record()
+        self.start = time.monotonic()
+
+        self._produced = 0  # tags put in buffer
+        self._cleared = 0  # tags removed from buffer
+        self._pending_clear = 0  # tags returned by last read
+        self.delay = 0.0  # sum of time tags were in buffer till read
+
+        self.commands = 0
+        self.link_time = 0.0
+
+    def _fill(self, now):
+        self._produced = int((now - self.start) * self.rate)
+
+    def _response(self, cmd, now):
+        command = cmd[0]
+        if command == 0x22:
+            data_sets = cmd[1] * 256 + cmd[2]
+            count = min(data_sets, self._produced - self._cleared)
+            # tag n arrived at (n + 1) / rate
+            for idx in range(self._cleared, self._cleared + count):
+                self.delay += now - (self.start + (idx + 1) / self.rate)
+            self._pending_clear = count
+            if count == 0:
+                return bytes([0x22, 0x92])
+            status = 0x94 if self._produced - self._cleared > count else 0x00
+            payload = bytearray([0x22, status, TR_DATA1, TR_DATA2, count >> 8, count & 0xFF])
+            payload += self.record * count
+            return bytes(payload)
+
+        if command == 0x32:
+            self._cleared += self._pending_clear
+            self._pending_clear = 0
+            return bytes([0x32, 0x00])
+
+        if command == 0x31:
+            length = self._produced - self._cleared
+            return bytes([0x31, 0x00, 0x10, 0x00, 0x00, 0x00, length >> 8, length & 0xFF])
+
+        return bytes([command, 0x00])
+
+    def transfer(self, timeout, txdata):
+        if isinstance(txdata, list):
+            txdata = encode(txdata)
+        cmd = decode(txdata)
+
+        now = time.monotonic()
+        self._fill(now)
+        response = self._response(cmd, now)
+        duration = (len(txdata) + len(response) + 6) * self.byte_time
+        time.sleep(duration + READER_TURNAROUND)
+
+        self.commands += 1
+        self.link_time += duration
+        return response
+
+    @property
+    def tags_read(self):
+        return self._cleared
+
+
+def _fixed(mode, interval, deadline):
+    # former loops: poll, clear after every read with tags
+    while time.monotonic() < deadline:
+        if interval:
+            time.sleep(interval)
+        tags = mode.read()
+        if tags:
+            mode.clear()
+
+
+def _scheduled(mode, interval, deadline):
+    scheduler = BufferReadScheduler(mode)
+    while time.monotonic() < deadline:
+        scheduler.poll(deadline)
+
+
+def run(rate=200, baudrate=38400, duration=2.0):
+    result = {}
+    for name, loop, interval in (
+        ("fixed 20ms", _fixed, 0.02),
+        ("tight loop", _fixed, 0),
+        ("scheduler", _scheduled, None),
+    ):
+        reader = SimulatedReader(rate, baudrate)
+        mode = FeigBufferRead(reader, None)
+        loop(mode, interval, reader.start + duration)
+        elapsed = time.monotonic() - reader.start
+
+        result[name] = {
+            "commands/s": reader.commands / elapsed,
+            "tags/s": reader.tags_read / elapsed,
+            "link %": reader.link_time / elapsed * 100,
+            "delay ms": reader.delay / max(reader.tags_read, 1) * 1000,
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="buffer read polling benchmark")
+    parser.add_argument("--rate", type=int, default=200, help="tags per second")
+    parser.add_argument("--baudrate", type=int, default=38400)
+    parser.add_argument("--duration", type=float, default=2.0)
+    args = parser.parse_args()
+
+    result = run(args.rate, args.baudrate, args.duration)
+    print("{} tags/s at {} baud".format(args.rate, args.baudrate))
+    print("  {:12s} {:>10s} {:>8s} {:>8s} {:>9s}".format("", *next(iter(result.values())).keys()))
+    for name, values in result.items():
+        print("  {:12s} {:10.1f} {:8.1f} {:8.1f} {:9.1f}".format(name, *values.values()))
+
+
+if __name__ == "__main__":
+    main()
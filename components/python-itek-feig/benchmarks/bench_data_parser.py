@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+BRM / notification record parser benchmark.
+
+Parses a read buffer response of N records for every TR-DATA1 / TR-DATA2
+combination with the former slicing parser and the offset parser, checks
+both give the same tags and reports parse time, and parse plus access of
+EPC / TID (lazy hex decoding).
+
+usage: python3 -m benchmarks.bench_data_parser [--records N] [--number N] [--all]
+"""
+
+import argparse
+import time
+import timeit
+from binascii import hexlify
+
+from itekfeig.common.feig_data_parser import brm_and_notif_parser
+
+from .frames import records_for_flags, flag_combinations
+
+# configurations used by the app / readers, shown with --all not given
+COMMON_FLAGS = [(0x01, 0), (0x11, 0), (0x91, 0x18), (0xB1, 0x18), (0x93, 0x1B), (0xF3, 0x1B)]
+
+def _legacy_record_parser(tr1, tr2, record):
+    record = record[2:]  # remove first 2 bytes are record length
+
+    tag = {}
+    if tr1 & 0x01:  # epc,tid
+        #trtype = record[0]
+        #iddib = record[1]
+        iddlen = record[2]
+        uid = record[3 : 3 + iddlen]
+        record = record[3 + iddlen :]
+
+        # add epc, tid
+        pc = uid[0:2]
+        uid = uid[2:]
+        epc_len = (pc[0] >> 3) * 2
+        tid_len = iddlen - epc_len - 2
+
+        tag["epc"] = hexlify(uid[0:epc_len]).decode()
+        tag["tid"] = hexlify(uid[epc_len : epc_len + tid_len]).decode()
+
+    if tr1 & 0x02:  # Data block present
+        db_len = record[0] * 256 + record[1]
+        db_size = record[2]
+        data = record[3 : 3 + (db_len * db_size)]
+        record = record[3 + (db_len * db_size) :]
+        tag["data"] = hexlify(data).decode()
+
+    if tr1 & 0x20:  # Time
+        dtime = record[0:4]
+        record = record[4:]
+        tag["rtime"] = int(hexlify(dtime).decode(), base=16)
+
+    if tr1 & 0x40:  # Date
+        ddate = record[0:5]
+        record = record[5:]
+        tag["rdate"] = hexlify(ddate).decode()
+
+    if tr1 & 0x10:  # antenna
+        tag["antno"] = record[0]
+
+        if (tr1 & 0x80) and (tr2 & 0x08):
+            # Tag Statistics
+            tag["tag_cnt"] = str(record[1] * 256 + record[2])
+            tag["rssi_max"] = str(record[3])
+            tag["rssi_avg"] = str(record[4])
+            record = record[8:]
+
+        else:
+            # Antenna No only
+            record = str(record[1:])
+
+    if tr1 & 0x80:  # Extended Data
+
+        if tr2 & 0x01:  # INPUT
+            tag["input"] = hexlify(record[0:2]).decode()
+            record = record[2:]
+
+        if tr2 & 0x02:  # MAC
+            mac = record[0:6]
+            record = record[6:]
+            tag["mac"] = hexlify(mac).decode()
+
+        if tr2 & 0x10:  # Antenna Entension
+            antennas = []
+            ant_cnt = record[0]
+            offset = 1
+            antennas = []
+            for _ in range(0, ant_cnt):
+                angle = record[offset + 2] * 256 + record[offset + 3]
+                antennas.append(
+                    {
+                        "antno": record[offset + 0],
+                        "rssi": record[offset + 1],
+                        "phase_angle": (angle * 360) // 4096,
+                    }
+                )
+
+                offset += 6
+
+            tag["antennas"] = antennas
+
+    return tag
+
+
+def _legacy_parser(data):
+    tr_data1 = data[0]
+    tr_data2 = None
+
+    offset = 1
+    if tr_data1 & 0x80:
+        tr_data2 = data[1]
+        offset = 2
+
+    data_sets = data[offset + 0] * 256 + data[offset + 1]
+
+    tags = []
+    if data_sets > 0:
+        timestamp = time.time()
+
+        data = data[offset + 2 :]  # remove data_sets
+        for _ in range(0, data_sets):
+            record_len = data[0] * 256 + data[1]  # get record lenght
+            record = data[:record_len]
+
+            tag = _legacy_record_parser(tr_data1, tr_data2, record)
+
+            data = data[record_len:]  # remove current record
+
+            tag["time"] = timestamp
+            tags.append(tag)
+
+    return tags
+
+
+def _time(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def _legacy(data):
+    try:
+        return _legacy_parser(data)
+    except (TypeError, IndexError):
+        # antenna without statistics followed by extended data
+        return None
+
+
+def _access(tags):
+    for tag in tags:
+        tag["epc"], tag["tid"]
+
+
+def _equal(old, new):
+    for tag in old:
+        tag.pop("time")
+    return old == [{key: value for key, value in tag.items() if key != "time"} for tag in new]
+
+
+def run(records=255, number=20, flags=None):
+    result = {}
+    for tr1, tr2 in flags or flag_combinations():
+        data = records_for_flags(tr1, tr2, records)
+        old = _legacy(data)
+        entry = {
+            "equal": None if old is None else _equal(old, brm_and_notif_parser(data)),
+            "legacy": None if old is None else _time(lambda: _legacy_parser(data), number),
+            "offset": _time(lambda: brm_and_notif_parser(data), number),
+        }
+        if tr1 & 0x01:
+            entry["legacy+epc"] = entry["legacy"] and _time(lambda: _access(_legacy_parser(data)), number)
+            entry["offset+epc"] = _time(lambda: _access(brm_and_notif_parser(data)), number)
+        result[(tr1, tr2)] = entry
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BRM record parser benchmark")
+    parser.add_argument("--records", type=int, default=255)
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--all", action="store_true", help="print every flag combination")
+    args = parser.parse_args()
+
+    result = run(args.records, args.number)
+    legacy = sum(entry["legacy"] for entry in result.values() if entry["legacy"])
+    offset = sum(entry["offset"] for entry in result.values() if entry["legacy"])
+    mismatches = [flags for flags, entry in result.items() if entry["equal"] is False]
+    unparsed = [flags for flags, entry in result.items() if entry["equal"] is None]
+
+    print("{} combinations of TR-DATA1/TR-DATA2, {} records each".format(len(result), args.records))
+    print("  mismatches {}, legacy parser fails on {}".format(mismatches or 0, len(unparsed)))
+    print("  total legacy {:.0f}us, offset {:.0f}us ({:.1f}x)".format(legacy, offset, legacy / offset))
+
+    print("  {:10s} {:>10s} {:>10s} {:>12s} {:>12s}".format("tr1/tr2", "legacy", "offset", "legacy+epc", "offset+epc"))
+    for flags in (result if args.all else COMMON_FLAGS):
+        entry = result[flags]
+        print("  {:02X}/{:02X}      {:>10s} {:>10.1f} {:>12s} {:>12s}".format(
+            flags[0], flags[1],
+            "fails" if entry["legacy"] is None else "{:.1f}".format(entry["legacy"]),
+            entry["offset"],
+            "-" if not entry.get("legacy+epc") else "{:.1f}".format(entry["legacy+epc"]),
+            "-" if "offset+epc" not in entry else "{:.1f}".format(entry["offset+epc"]),
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FEIG protocol codec benchmark.
+
+CRC and encode/decode of a read buffer response with 255 records, compared
+with the bit by bit CRC and list based codec used before.
+
+usage: python3 -m benchmarks.bench_feig_protocol [--records N] [--number N]
+"""
+
+import argparse
+import timeit
+
+from itekfeig.common.feig_protocol import crc16, crc16_table, encode, decode
+
+from .frames import brm_payload
+
+
+def _crc16_bitwise(data, length):
+    crc = 0xFFFF
+    for i in range(0, length):
+        crc = crc ^ data[i]
+        for _ in range(0, 8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0x8408
+            else:
+                crc = crc >> 1
+    return crc & 0xFFFF
+
+
+def _encode_list(payload):
+    packet_len = 1 + 2 + 1 + len(payload) + 2
+    packet = [0x02, (packet_len >> 8) & 0x00FF, packet_len & 0x00FF, 0xFF]
+    packet = packet + payload
+    packet_crc = _crc16_bitwise(packet, len(packet))
+    packet.append(packet_crc & 0x00FF)
+    packet.append((packet_crc >> 8) & 0x00FF)
+    return bytes(packet)
+
+
+def _decode_copy(packet):
+    plen = len(packet)
+    if plen >= 7 and packet[0] == int(b"\x02".hex(), base=16):
+        if (packet[plen - 1] * 256) + packet[plen - 2] == _crc16_bitwise(packet, plen - 2):
+            return packet[4:-2]
+    return None
+
+
+def _time(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def run(records=255, number=20):
+    payload = brm_payload(records)
+    frame = encode(payload)
+    command = [0x22, 0x00, 0xFF]
+
+    return {
+        "frame_bytes": len(frame),
+        "crc16 bitwise": _time(lambda: _crc16_bitwise(frame, len(frame) - 2), max(1, number // 10)),
+        "crc16 table": _time(lambda: crc16_table(frame, len(frame) - 2), number),
+        "crc16": _time(lambda: crc16(frame, len(frame) - 2), number),
+        "encode command, list": _time(lambda: _encode_list(command), number * 100),
+        "encode command": _time(lambda: encode(command), number * 100),
+        "decode response, copy": _time(lambda: _decode_copy(frame), max(1, number // 10)),
+        "decode response": _time(lambda: decode(frame), number),
+        "decode response, view": _time(lambda: decode(frame, view=True), number),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="feig protocol codec benchmark")
+    parser.add_argument("--records", type=int, default=255)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    result = run(args.records, args.number)
+    print("read buffer response {} records, {} bytes".format(args.records, result.pop("frame_bytes")))
+    for name, usec in result.items():
+        print("  {:24s} {:10.2f}us".format(name, usec))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SGTIN-96 decoding benchmark.
+
+sgtin96_to_ean with and without the EAN cache and decode_many are compared
+with the former decoder, which formatted the EPC as a binary string and
+parsed its slices. EPCs of a scan count are many serials of a few items.
+
+usage: python3 -m benchmarks.bench_gs1 [--epcs N] [--items N] [--number N]
+"""
+
+import argparse
+import math
+import random
+import timeit
+
+from itekfeig import gs1
+
+PARTITION_MAP = gs1.SGTIN_96_PARTITION_MAP
+
+
+def legacy_sgtin96_to_ean(sgtin96: str) -> tuple:
+    """sgtin96_to_ean before shift/mask decoding"""
+    if not sgtin96.startswith("30"):
+        raise gs1.SGTINDecodeError("Invalid SGTIN Header")
+
+    binary = "{0:020b}".format(int(sgtin96, 16)).zfill(96)
+    try:
+        m, l, n, k = PARTITION_MAP[int(binary[11:14], 2)]
+    except KeyError:
+        raise gs1.SGTINDecodeError("Invalid Partition")
+
+    company_data = int(binary[14:14 + m], 2)
+    if company_data > pow(10, l):
+        raise gs1.SGTINDecodeError("Invalid Company")
+
+    company_prefix = str(company_data).zfill(l)
+    item_reference = str(int(binary[14 + m:14 + m + n], 2)).zfill(k)
+    serial = str(int(binary[-38:], 2))
+
+    ean = company_prefix + item_reference[1:6]
+    total = 0
+    for count, char in enumerate(ean[::-1]):
+        total = total + int(char) * (3 if count % 2 == 0 else 1)
+    ean = ean + str(int(math.ceil(total / 10.0) * 10) - total)
+
+    return (ean, serial.zfill(12))
+
+
+def sgtin96(partition, company, item, serial, tag_filter=1) -> str:
+    """SGTIN-96 hex string of the given fields"""
+    m, _, n, _ = PARTITION_MAP[partition]
+    value = 0x30
+    value = (value << 3) | tag_filter
+    value = (value << 3) | partition
+    value = (value << m) | company
+    value = (value << n) | item
+    value = (value << 38) | serial
+    return "%024x" % value
+
+
+def epcs(count, items):
+    """count EPCs of items different company/item prefixes"""
+    prefixes = []
+    for _ in range(items):
+        partition = random.randrange(7)
+        _, l, n, k = PARTITION_MAP[partition]
+        prefixes.append((partition, random.randrange(pow(10, l)), random.randrange(min(1 << n, pow(10, k)))))
+
+    return [
+        sgtin96(*random.choice(prefixes), random.randrange(1 << 38))
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--epcs", type=int, default=5000, help="EPCs per run")
+    parser.add_argument("--items", type=int, default=50, help="company/item prefixes")
+    parser.add_argument("--number", type=int, default=20, help="runs")
+    args = parser.parse_args()
+
+    epc_list = epcs(args.epcs, args.items)
+    expected = [legacy_sgtin96_to_ean(epc) for epc in epc_list]
+    assert([gs1.sgtin96_to_ean(epc) for epc in epc_list] == expected)
+    assert(gs1.decode_many(epc_list) == expected)
+
+    runs = {
+        "legacy": lambda: [legacy_sgtin96_to_ean(epc) for epc in epc_list],
+        "sgtin96_to_ean cache=False": lambda: [gs1.sgtin96_to_ean(epc, cache=False) for epc in epc_list],
+        "sgtin96_to_ean": lambda: [gs1.sgtin96_to_ean(epc) for epc in epc_list],
+        "decode_many": lambda: gs1.decode_many(epc_list),
+    }
+
+    legacy = None
+    for name, func in runs.items():
+        seconds = min(timeit.repeat(func, number=1, repeat=args.number))
+        rate = args.epcs / seconds
+        legacy = legacy or rate
+        print("{:<28} {:>12.0f} EPC/s {:>7.2f}x".format(name, rate, rate / legacy))
+
+
+if __name__ == "__main__":
+    main()
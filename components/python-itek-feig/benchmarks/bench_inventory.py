@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Host mode inventory decoding benchmark.
+
+FeigHost.inventory() with the offset walking inventory_parser is compared
+with the former decoding, which sliced the response after every data set
+and appended the records one by one. The reader is replaced by an
+interface returning prepared responses, so only decoding is measured.
+
+usage: python3 -m benchmarks.bench_inventory [--antennas N] [--seconds S]
+"""
+
+import argparse
+import time
+import tracemalloc
+from binascii import hexlify
+
+from itekfeig.common.feig_errors import FeigError
+from itekfeig.common.feig_host import FeigHost, TR_TYPE_EPC_C1G2, IDDT_EPC_TID
+from itekfeig.common.feig_tag import TagRead, AntennaObservation
+
+from .frames import inventory_payloads
+
+TAG_COUNTS = (1, 10, 50, 100, 255, 500)
+
+
+class PreparedReader:
+    """Interface answering inventory commands with prepared responses"""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self._next = 0
+
+    def transfer(self, timeout, cmd):
+        payload = self.payloads[self._next]
+        self._next = (self._next + 1) % len(self.payloads)
+        return payload
+
+
+class LegacyHost(FeigHost):
+    """FeigHost with the decoding before inventory_parser"""
+
+    def _inventory(self, tags: list, ant_sel, more=False):
+        mode = 0
+        if more is True:
+            mode = mode + 0x80
+
+        if ant_sel > 0:
+            mode = mode + 0x10
+            cmd = [0xB0, 0x01, mode, ant_sel]
+        else:
+            cmd = [0xB0, 0x01, mode]
+
+        data = self._interface.transfer(2.0, cmd)
+        more = False
+        if data[0] == 0xB0:
+            self._last_error = self._feig_status_parser(data[1])
+            if (
+                self._last_error is FeigError.MORE_DATA
+                or self._last_error is FeigError.OK
+            ):
+                data_sets = data[2]
+                data = data[3:]
+                for _ in range(0, data_sets):
+                    tag = TagRead()
+                    offset = 0
+                    if ant_sel > 0:
+                        offset = 1
+
+                    tr_type = data[offset + 0]
+                    iddib = data[offset + 1]
+                    iddlen = data[offset + 2]
+
+                    idd_start = offset + 3
+                    idd_end = idd_start + iddlen
+                    idd = data[idd_start:idd_end]
+
+                    if tr_type == TR_TYPE_EPC_C1G2:
+                        pc = idd[0:2]
+                        epc_len = self._get_epc_len_from_protocol_bits(pc)
+                        epc_end = 2 + epc_len
+                        epc = hexlify(idd[2:epc_end]).decode("ascii")
+
+                        tid = ""
+                        if iddib == IDDT_EPC_TID:
+                            tid_len = iddlen - epc_len - 2
+                            tid = hexlify(idd[epc_end:epc_end + tid_len]).decode("ascii")
+
+                        tag.epc = epc
+                        tag.tid = tid
+
+                        offset = offset + 3 + iddlen
+                        if ant_sel > 0:
+                            tag.antennas = []
+                            ant_cnt = data[offset]
+                            for _ in range(0, ant_cnt):
+                                ant_nr = data[offset + 1]
+                                ant_stat = data[offset + 2]
+                                rssi = data[offset + 3]
+                                phase = data[offset + 4] * 256 + data[offset + 5]
+                                phase = (phase * 360) // 4096
+                                tag.antennas.append(
+                                    AntennaObservation(ant_nr, rssi, phase, ant_stat)
+                                )
+                                offset = offset + 7
+                            offset = offset + 1
+
+                    data = data[offset:]
+                    tags.append(tag)
+            more = self._last_error is FeigError.MORE_DATA
+
+        return more
+
+
+def _run(func, seconds):
+    """Returns calls per second of func"""
+    calls = 0
+    start = time.perf_counter()
+    end = start + seconds
+    while True:
+        func()
+        calls += 1
+        now = time.perf_counter()
+        if now >= end:
+            return calls / (now - start)
+
+
+def _peak(func):
+    """Returns peak bytes allocated by one call of func"""
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--antennas", type=int, default=2, help="antennas per tag, 0 without antenna block")
+    parser.add_argument("--seconds", type=float, default=1.0, help="run time per measurement")
+    args = parser.parse_args()
+
+    print("{:>6} {:>14} {:>14} {:>8} {:>12} {:>12}".format(
+        "tags", "legacy inv/s", "parser inv/s", "speedup", "legacy peak", "parser peak"))
+    for count in TAG_COUNTS:
+        payloads = inventory_payloads(count, antennas=args.antennas)
+        legacy = LegacyHost(PreparedReader(payloads), FeigError.OK)
+        host = FeigHost(PreparedReader(payloads), FeigError.OK)
+        antennas = [1 << ant for ant in range(args.antennas)] or None
+
+        tags = host.inventory(antennas)
+        assert(len(tags) == count)
+        assert(tags == legacy.inventory(antennas))
+
+        legacy_rate = _run(lambda: legacy.inventory(antennas), args.seconds)
+        parser_rate = _run(lambda: host.inventory(antennas), args.seconds)
+        legacy_peak = _peak(lambda: legacy.inventory(antennas))
+        parser_peak = _peak(lambda: host.inventory(antennas))
+        print("{:>6} {:>14.0f} {:>14.0f} {:>7.2f}x {:>12} {:>12}".format(
+            count, legacy_rate, parser_rate, parser_rate / legacy_rate, legacy_peak, parser_peak))
+
+
+if __name__ == "__main__":
+    main()
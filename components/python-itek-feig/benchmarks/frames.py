@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Realistic reader frames for benchmarks.
+"""
+
+import os
+
+from itekfeig.common.feig_protocol import encode
+
+# TR-DATA1: IDD (EPC + TID), antenna, extension
+# TR-DATA2: tag statistics, antenna extension
+TR_DATA1 = 0x91
+TR_DATA2 = 0x18
+
+
+def brm_record(epc_len=12, tid_len=12, antennas=2):
+    """One buffer read mode record as sent by LRU readers"""
+    pc = bytes([(epc_len // 2) << 3, 0x00])
+    idd = pc + os.urandom(epc_len) + os.urandom(tid_len)
+
+    record = bytearray()
+    record += bytes([0x84, 0x02, len(idd)])  # TR-TYPE, IDDIB, IDD-LEN
+    record += idd
+    record += bytes([0x01, 0x00, 0x05, 0xC0, 0xB8, 0x00, 0x00, 0x00])  # ANT, statistics
+    record.append(antennas)
+    for ant in range(antennas):
+        record += bytes([ant + 1, 0xC0 - ant, 0x04, 0x00, 0x00, 0x00])  # ANT, RSSI, PHASE, RFU
+
+    length = len(record) + 2
+    return bytes([length >> 8, length & 0xFF]) + bytes(record)
+
+
+def brm_payload(records=255, **kwargs):
+    """Read buffer (0x22) response payload, CONTROL BYTE till last record"""
+    payload = bytearray([0x22, 0x00, TR_DATA1, TR_DATA2, records >> 8, records & 0xFF])
+    for _ in range(records):
+        payload += brm_record(**kwargs)
+    return bytes(payload)
+
+
+def brm_response(records=255, **kwargs):
+    """Complete read buffer response frame"""
+    return encode(brm_payload(records, **kwargs))
+
+
+def record_for_flags(tr1, tr2, epc_len=12, tid_len=12, antennas=2, blocks=2):
+    """One record with every field selected by TR-DATA1 / TR-DATA2"""
+    record = bytearray()
+    if tr1 & 0x01:
+        idd = bytes([(epc_len // 2) << 3, 0x00]) + os.urandom(epc_len) + os.urandom(tid_len)
+        record += bytes([0x84, 0x02, len(idd)]) + idd
+    if tr1 & 0x02:
+        record += bytes([0x00, blocks, 4]) + os.urandom(blocks * 4)
+    if tr1 & 0x20:
+        record += os.urandom(4)
+    if tr1 & 0x40:
+        record += os.urandom(5)
+    if tr1 & 0x10:
+        if tr1 & 0x80 and tr2 & 0x08:
+            record += bytes([0x01, 0x00, 0x05, 0xC0, 0xB8, 0x00, 0x00, 0x00])
+        else:
+            record += bytes([0x01])
+    if tr1 & 0x80:
+        if tr2 & 0x01:
+            record += os.urandom(2)
+        if tr2 & 0x02:
+            record += os.urandom(6)
+        if tr2 & 0x10:
+            record.append(antennas)
+            for ant in range(antennas):
+                record += bytes([ant + 1, 0xC0 - ant]) + os.urandom(2) + bytes(2)
+
+    length = len(record) + 2
+    return bytes([length >> 8, length & 0xFF]) + bytes(record)
+
+
+def records_for_flags(tr1, tr2, records=255, **kwargs):
+    """TR-DATA and records of a read buffer response, as given to the parser"""
+    data = bytearray([tr1])
+    if tr1 & 0x80:
+        data.append(tr2)
+    data += bytes([records >> 8, records & 0xFF])
+    for _ in range(records):
+        data += record_for_flags(tr1, tr2, **kwargs)
+    return bytes(data)
+
+
+def flag_combinations():
+    """All (TR-DATA1, TR-DATA2) combinations the parser handles"""
+    tr1_bits = (0x01, 0x02, 0x10, 0x20, 0x40)
+    for mask in range(1 << len(tr1_bits)):
+        tr1 = sum(bit for idx, bit in enumerate(tr1_bits) if mask & (1 << idx))
+        yield tr1, 0
+        for tr2 in range(0x20):
+            if tr2 & ~0x1B:
+                continue  # 0x01 input, 0x02 mac, 0x08 statistics, 0x10 antennas
+            yield tr1 | 0x80, tr2
+
+
+def inventory_record(epc_len=12, tid_len=12, antennas=2):
+    """One host mode inventory data set, antenna block if antennas > 0"""
+    pc = bytes([(epc_len // 2) << 3, 0x00])
+    idd = pc + os.urandom(epc_len) + os.urandom(tid_len)
+
+    record = bytearray()
+    if antennas:
+        record.append(0x01)  # FLAGS
+    record += bytes([0x84, 0x02 if tid_len else 0x00, len(idd)])  # TR-TYPE, IDDIB, IDD-LEN
+    record += idd
+    if antennas:
+        record.append(antennas)
+        for ant in range(antennas):
+            record += bytes([1 << ant, 0x00, 0xC0 - ant, 0x04, 0x00, 0x00, 0x00])
+    return bytes(record)
+
+
+def inventory_payloads(records=255, **kwargs):
+    """Inventory (0xB0) response payloads, CONTROL BYTE till last data set,
+    split in responses of at most 255 data sets with MORE DATA status"""
+    payloads = []
+    while True:
+        count = min(records, 255)
+        records -= count
+        status = 0x94 if records else 0x00
+        payload = bytearray([0xB0, status, count])
+        for _ in range(count):
+            payload += inventory_record(**kwargs)
+        payloads.append(bytes(payload))
+        if not records:
+            return payloads
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark suite of the driver hot paths with baseline comparison.
+
+Micro benchmarks time single functions on prepared frames (CRC, codec,
+record parser, tag aggregation, host mode inventory decoding, SGTIN-96,
+scan output frames),
+macro benchmarks run the read buffer cycle of BufferReadMode against a
+FeigSimulator. Every case reports ops/s, p50 / p99 latency of one call and
+the peak memory allocated by one call (tracemalloc).
+
+Results are written as JSON with --json. With a baseline file the results
+are compared and the command fails if a case got slower or allocates more
+than --threshold, run it on the gateway before flashing. --save-baseline
+stores the results as the new baseline.
+
+usage: python3 -m benchmarks.suite [--seconds S] [--filter TEXT] [--json FILE]
+                                   [--baseline FILE] [--save-baseline] [--threshold R]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from itekfeig.version import version
+from itekfeig.common.feig_aggregator import TagAggregator
+from itekfeig.common.feig_buffer_read import FeigBufferRead
+from itekfeig.common.feig_data_parser import brm_and_notif_parser
+from itekfeig.common.feig_errors import FeigError
+from itekfeig.common.feig_host import FeigHost
+from itekfeig.common.feig_protocol import crc16, encode, decode, FrameAssembler
+from itekfeig.common.feig_scan import ScanFrameReader
+from itekfeig.interface.feig_simulator import FeigSimulator, tag_population
+from itekfeig import gs1
+
+from .bench_gs1 import epcs
+from .bench_inventory import PreparedReader
+from .frames import brm_payload, inventory_payloads
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# compared fields: (higher is better, counts as regression), p99 is too
+# noisy on a busy gateway to fail a run
+METRICS = {
+    "ops_per_s": (True, True),
+    "p50_us": (False, True),
+    "p99_us": (False, False),
+    "alloc_peak_bytes": (False, True),
+}
+
+
+def _crc16():
+    frame = encode(brm_payload(255))
+    return lambda: crc16(frame, len(frame) - 2)
+
+
+def _encode():
+    payload = brm_payload(255)
+    return lambda: encode(payload)
+
+
+def _decode():
+    frame = encode(brm_payload(255))
+    return lambda: decode(frame)
+
+
+def _frame_assembler():
+    # response arriving in segments of a TCP stream
+    frame = encode(brm_payload(255))
+    segments = [frame[idx:idx + 1460] for idx in range(0, len(frame), 1460)]
+    assembler = FrameAssembler()
+
+    def run():
+        for segment in segments:
+            assembler.feed(segment)
+
+    return run
+
+
+def _brm_parser():
+    data = brm_payload(255)[2:]
+    return lambda: brm_and_notif_parser(data)
+
+
+def _brm_parser_epc():
+    data = brm_payload(255)[2:]
+
+    def run():
+        for tag in brm_and_notif_parser(data):
+            tag.epc, tag.tid
+
+    return run
+
+
+def _unique_tags():
+    # 255 records of 50 tags, 2 antennas each
+    tags = brm_and_notif_parser(brm_payload(50)[2:]) * 5
+    tags += tags[:5]
+    mode = FeigBufferRead(None, FeigError.OK)
+    return lambda: mode._unique_tags(tags)
+
+
+def _aggregator_update():
+    tags = brm_and_notif_parser(brm_payload(50)[2:]) * 5
+    aggregator = TagAggregator()
+    aggregator.update(tags)
+    return lambda: aggregator.update(tags)
+
+
+def _host_inventory():
+    host = FeigHost(PreparedReader(inventory_payloads(255)), FeigError.OK)
+    return lambda: host.inventory([0x01, 0x02])
+
+
+def _sgtin96_to_ean():
+    epc_list = epcs(1000, 50)
+    return lambda: [gs1.sgtin96_to_ean(epc) for epc in epc_list]
+
+
+def _gs1_decode_many():
+    epc_list = epcs(1000, 50)
+    return lambda: gs1.decode_many(epc_list)
+
+
+def _scan_frames():
+    # one bulk read of scan output, 70 frames of 57 bytes
+    frame = b"0000" + b"3036" * 6 + b"e280" * 6 + b",01\r\n"
+    data = frame * 70
+    reader = ScanFrameReader()
+    return lambda: reader.feed(data)
+
+
+def _buffer_read_mode(tag_cnt):
+    """BufferReadMode of a simulated reader filled faster than it is read"""
+    simulator = FeigSimulator(tags=tag_population(tag_cnt, {1: 60, 2: 50}), rate=1e9, buffer_size=8000)
+    page = list(simulator.pages[1])
+    page[13] = 0x80  # buffer read mode
+    simulator.transfer(1.0, [0x81, 0x81] + page)
+    return FeigBufferRead(simulator, FeigError.OK)
+
+
+def _buffer_read_cycle():
+    # every read returns 255 records
+    mode = _buffer_read_mode(500)
+
+    def run():
+        tags = mode.read()
+        mode.clear()
+        return tags
+
+    return run
+
+
+def _buffer_read_unique():
+    mode = _buffer_read_mode(100)
+
+    def run():
+        aggregator = TagAggregator()
+        for _ in range(4):
+            aggregator.update(mode.read())
+            mode.clear()
+        return aggregator.tags()
+
+    return run
+
+
+# name: (kind, setup returning the timed callable)
+CASES = {
+    "crc16_255_records": ("micro", _crc16),
+    "encode_255_records": ("micro", _encode),
+    "decode_255_records": ("micro", _decode),
+    "frame_assembler_255_records": ("micro", _frame_assembler),
+    "brm_parser_255_records": ("micro", _brm_parser),
+    "brm_parser_255_records_epc_tid": ("micro", _brm_parser_epc),
+    "unique_tags_255_records": ("micro", _unique_tags),
+    "aggregator_update_255_records": ("micro", _aggregator_update),
+    "host_inventory_255_tags": ("micro", _host_inventory),
+    "sgtin96_to_ean_1000": ("micro", _sgtin96_to_ean),
+    "gs1_decode_many_1000": ("micro", _gs1_decode_many),
+    "scan_frames_70": ("micro", _scan_frames),
+    "buffer_read_cycle_255_records": ("macro", _buffer_read_cycle),
+    "buffer_read_4_cycles_unique": ("macro", _buffer_read_unique),
+}
+
+
+def _percentile(values, percent):
+    idx = min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))
+    return values[idx]
+
+
+def measure(func, seconds=1.0, min_calls=20) -> dict:
+    """Times calls of func for seconds, at least min_calls"""
+    func()  # warm up, lazy initialization
+
+    timer = time.perf_counter
+    latencies = []
+    start = timer()
+    end = start + seconds
+    while True:
+        call = timer()
+        func()
+        now = timer()
+        latencies.append(now - call)
+        if now >= end and len(latencies) >= min_calls:
+            break
+    total = now - start
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "ops_per_s": round(len(latencies) / total, 1),
+        "p50_us": round(_percentile(latencies, 50) * 1e6, 2),
+        "p99_us": round(_percentile(latencies, 99) * 1e6, 2),
+        "alloc_peak_bytes": peak,
+    }
+
+
+def run(seconds=1.0, name_filter=None) -> dict:
+    """Returns results of all cases, name_filter selects cases by substring"""
+    results = {}
+    for name, (kind, setup) in CASES.items():
+        if name_filter and name_filter not in name:
+            continue
+        result = measure(setup(), seconds)
+        result["kind"] = kind
+        results[name] = result
+
+    return {
+        "meta": {
+            "itekfeig": version,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "node": platform.node(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "seconds": seconds,
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=0.15) -> dict:
+    """Relative change of every metric against baseline, regressions are the
+    gated metrics worse than threshold
+
+    Returns:
+        {name: {metric: change, ..., "regressions": [metric, ...]}}
+    """
+    changes = {}
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+
+        change = {"regressions": []}
+        for metric, (higher_is_better, gated) in METRICS.items():
+            if not base.get(metric):
+                continue
+            ratio = result[metric] / base[metric] - 1.0
+            change[metric] = round(ratio, 4)
+            worse = -ratio if higher_is_better else ratio
+            if gated and worse > threshold:
+                change["regressions"].append(metric)
+        changes[name] = change
+
+    return changes
+
+
+def _print(results, changes):
+    print("{:<34} {:>12} {:>10} {:>10} {:>12}  {}".format(
+        "case", "ops/s", "p50 us", "p99 us", "alloc peak", "vs baseline"))
+    for name, result in results["results"].items():
+        change = changes.get(name)
+        if change is None:
+            note = "-"
+        else:
+            note = "ops/s {:+.1%}".format(change.get("ops_per_s", 0.0))
+            if change["regressions"]:
+                note += "  REGRESSION " + ",".join(change["regressions"])
+        print("{:<34} {:>12.1f} {:>10.2f} {:>10.2f} {:>12}  {}".format(
+            name, result["ops_per_s"], result["p50_us"], result["p99_us"], result["alloc_peak_bytes"], note))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=1.0, help="run time per case")
+    parser.add_argument("--filter", default=None, help="run cases containing TEXT")
+    parser.add_argument("--json", default=None, help="write results to FILE")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline results, default benchmarks/baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slow down, default 0.15")
+    args = parser.parse_args()
+
+    results = run(args.seconds, args.filter)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r") as fp:
+            baseline = json.load(fp)
+
+    changes = compare(results, baseline, args.threshold) if baseline else {}
+    results["baseline"] = {"file": args.baseline if baseline else None, "changes": changes}
+    _print(results, changes)
+
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(results, fp, indent=2)
+
+    if args.save_baseline:
+        del results["baseline"]
+        with open(args.baseline, "w") as fp:
+            json.dump(results, fp, indent=2)
+        print("baseline saved to {}".format(args.baseline))
+
+    regressions = [name for name, change in changes.items() if change["regressions"]]
+    if regressions:
+        print("{} regressions against {}".format(len(regressions), args.baseline))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
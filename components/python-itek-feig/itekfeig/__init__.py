@@ -9,14 +9,21 @@ from .version import version
 
 from .common.feig_logger import FeigLogger
 from .common.feig_errors import FeigError
+from .common.feig_aggregator import TagAggregator
+from .common.feig_scan import ScanFrameReader
+from .common.feig_tag import TagRead, AntennaObservation
+from .common.feig_config_cache import ConfigCache
 
 from .readers.LRU1002 import LRU1002
 from .readers.HyWear import HyWear
 from .readers.MRU102 import MRU102
 from .readers.LRU500i import LRU500i
 
+from .aio import AsyncFeigReader
+
 # from .gs1 import sgtin96_decoder
 from .gs1 import sgtin96_to_ean
+from .gs1 import decode_many
 from .gs1 import tid_parser
 from .gs1 import gtin_check
 
@@ -69,12 +76,19 @@ __all__ = [
     "FeigReader",
     "FeigLogger",
     "FeigError",
+    "TagAggregator",
+    "ScanFrameReader",
+    "TagRead",
+    "AntennaObservation",
+    "ConfigCache",
     "LRU1002",
     "HyWear",
     "MRU102",
     "LRU500i",
+    "AsyncFeigReader",
     #'sgtin96_decoder',
     "tid_parser",
     "sgtin96_to_ean",
+    "decode_many",
     "gtin_check",
 ]
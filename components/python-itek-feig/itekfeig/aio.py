@@ -0,0 +1,128 @@
+"""
+asyncio facade of Feig readers
+"""
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .common.feig_errors import FeigError
+from .interface.feig_async import (
+    AsyncFeigEthernet,
+    AsyncFeigSerial,
+    FeigNotificationServer,
+    buffer_read,
+    parse_tags,
+)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+class AsyncFeigReader:
+    """Drive a LRU1002, LRU500i, MRU102 (or any FeigReader) from asyncio.
+
+    Blocking reader API runs in a worker thread dedicated to this reader,
+    readers keep their own interface and last error, so several readers run
+    in parallel. Every reader method is available as coroutine:
+
+        reader = AsyncFeigReader("LRU1002")
+        await reader.connect(LRU1002.INTERFACE_ETHERNET, {"IP": ip, "PORT": 10001})
+        info = await reader.get_reader_info()
+        async for tags in reader.buffer_read():
+            ...
+
+    Args:
+        reader: reader name in SUPPORTED_READERS or reader object
+    """
+
+    def __init__(self, reader):
+        if isinstance(reader, str):
+            from . import FeigReader
+
+            reader = FeigReader(reader)
+
+        self.reader = reader
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feig-reader")
+
+    async def call(self, func, *args, **kwargs):
+        """Run any blocking method of the reader or its modes,
+        e.g. await reader.call(reader.reader.HostMode.inventory)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def __getattr__(self, name):
+        attr = getattr(self.reader, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self.call(attr, *args, **kwargs)
+
+        return method
+
+    async def connect(self, interface, settings) -> bool:
+        return await self.call(self.reader.connect, interface, settings)
+
+    async def disconnect(self):
+        await self.call(self.reader.disconnect)
+
+    def get_last_error(self) -> FeigError:
+        return self.reader.get_last_error()
+
+    async def transfer(self, timeout, txdata):
+        """Raw command through the reader interface"""
+        return await self.call(lambda: self.reader._interface.transfer(timeout, txdata))
+
+    async def buffer_read(self, interval=0.02):
+        """Async iterator over tags read in buffer read mode, ends on error
+
+        Args:
+            interval: seconds between polls of an empty buffer
+        """
+        mode = self.reader.BufferReadMode
+        if await self.call(mode.init) is None or await self.call(mode.clear) is None:
+            return
+
+        while True:
+            tags = await self.call(mode.read)
+            if tags is None:
+                return
+
+            if tags:
+                await self.call(mode.clear)
+                yield tags
+            else:
+                await asyncio.sleep(interval)
+
+    async def notifications(self, port: int, ack: bool = True, maxsize: int = 1000):
+        """Async iterator over (address, tags) pushed in notification mode"""
+        interface = self.reader._interface
+        if interface is None or interface.ID != "Ethernet":
+            self.reader._last_error = FeigError.INVALID_INTERFACE
+            return
+
+        server = FeigNotificationServer(port, ack=ack, maxsize=maxsize)
+        await server.start()
+        try:
+            async for item in server:
+                yield item
+        finally:
+            await server.stop()
+
+
+__all__ = [
+    "AsyncFeigReader",
+    "AsyncFeigEthernet",
+    "AsyncFeigSerial",
+    "FeigNotificationServer",
+    "buffer_read",
+    "parse_tags",
+]
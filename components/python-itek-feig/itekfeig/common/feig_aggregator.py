@@ -0,0 +1,154 @@
+"""
+Aggregation of tag reads by TID.
+"""
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# antenna slots allocated for a new tag, grows for higher antenna numbers
+ANTENNA_SLOTS = 9
+
+
+class _TagState:
+    """Aggregated state of one TID.
+
+    rssi and phase are indexed by antenna number, order keeps antenna
+    numbers in order of first observation.
+    """
+
+    __slots__ = ("record", "first_seen", "last_seen", "seen_count", "rssi", "phase", "order", "extra")
+
+    def __init__(self, record, timestamp):
+        self.record = record
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.seen_count = 1
+        self.rssi = [None] * ANTENNA_SLOTS
+        self.phase = [None] * ANTENNA_SLOTS
+        self.order = []
+        self.extra = None
+
+    def observe(self, antno, rssi, phase_angle):
+        if antno >= len(self.rssi):
+            grow = antno + 1 - len(self.rssi)
+            self.rssi.extend([None] * grow)
+            self.phase.extend([None] * grow)
+
+        if self.rssi[antno] is None:
+            self.order.append(antno)
+        self.rssi[antno] = rssi
+        self.phase[antno] = phase_angle
+
+    def antennas(self) -> list:
+        return [
+            {"antno": antno, "rssi": self.rssi[antno], "phase_angle": self.phase[antno]}
+            for antno in self.order
+        ]
+
+    def as_dict(self) -> dict:
+        tag = dict(self.record)
+        if self.order or "antennas" in tag:
+            tag["antennas"] = self.antennas()
+        tag["first_seen"] = self.first_seen
+        tag["last_seen"] = self.last_seen
+        tag["seen_count"] = self.seen_count
+        if self.extra:
+            tag.update(self.extra)
+        return tag
+
+
+class TagAggregator:
+    """Unique tags by TID with seen count, first/last seen time and last
+    RSSI / phase angle per antenna.
+
+    Every record of buffer read / notification parser is merged in O(1)
+    (per antenna of the record), the dict form used by _unique_tags() is
+    only built by tags() / tag().
+
+    Args:
+        rssi_limits: dict {antno: rssi}, antenna observations with rssi
+            equal or above the limit are ignored, records without remaining
+            antenna are skipped
+    """
+
+    def __init__(self, rssi_limits=None):
+        self._tags = {}
+        self._rssi_limits = rssi_limits or None
+
+    def __len__(self):
+        return len(self._tags)
+
+    def __contains__(self, tid):
+        return tid in self._tags
+
+    def __iter__(self):
+        return iter(self._tags)
+
+    def _antennas(self, record):
+        antennas = record.get("antennas")
+        if antennas is None or self._rssi_limits is None:
+            return antennas
+
+        limits = self._rssi_limits
+        return [
+            ant for ant in antennas
+            if ant["antno"] not in limits or ant["rssi"] < limits[ant["antno"]]
+        ]
+
+    def add(self, record) -> bool:
+        """Merge one tag record, returns True if TID is new (False also if
+        the record is skipped by rssi_limits)
+        """
+        antennas = self._antennas(record)
+        if antennas is not None and not antennas and self._rssi_limits is not None:
+            return False
+
+        tid = record["tid"]
+        timestamp = record.get("time")
+        state = self._tags.get(tid)
+        new = state is None
+        if new:
+            base = {key: value for key, value in record.items() if key != "time" and key != "antennas"}
+            if antennas is not None:
+                base["antennas"] = None  # placeholder, keeps key order of record
+            state = self._tags[tid] = _TagState(base, timestamp)
+        else:
+            state.seen_count += 1
+            state.last_seen = timestamp
+
+        if antennas:
+            for ant in antennas:
+                state.observe(ant["antno"], ant["rssi"], ant["phase_angle"])
+
+        return new
+
+    def update(self, records) -> list:
+        """Merge list of tag records, returns TIDs seen first time"""
+        add = self.add
+        return [record["tid"] for record in records if add(record)]
+
+    def annotate(self, tid, **fields):
+        """Attach extra fields to a tag, returned with it by tags()"""
+        state = self._tags[tid]
+        if state.extra is None:
+            state.extra = {}
+        state.extra.update(fields)
+
+    def antennas(self, tid) -> list:
+        """Antennas of tag as list of dict(antno, rssi, phase_angle)"""
+        return self._tags[tid].antennas()
+
+    def seen_count(self, tid) -> int:
+        return self._tags[tid].seen_count
+
+    def tag(self, tid) -> dict:
+        return self._tags[tid].as_dict()
+
+    def tags(self, tids=None) -> dict:
+        """Returns {tid: tag dict} of all (or given) tags"""
+        if tids is None:
+            return {tid: state.as_dict() for tid, state in self._tags.items()}
+        return {tid: self._tags[tid].as_dict() for tid in tids}
+
+    def clear(self):
+        self._tags.clear()
@@ -6,8 +6,28 @@ from binascii import hexlify, unhexlify
 from ..common.feig_errors import FeigError
 
 
+class FeigState:
+    """Connection state of one reader: interface, last error and mode.
+
+    Owned by the reader object and shared with its operating modes
+    (HostMode, BufferReadMode, ...), readers don't share state with each
+    other and can be driven from different threads.
+    """
+
+    __slots__ = ("interface", "last_error", "current_mode", "mask_list")
+
+    def __init__(self, interface=None, last_error=None):
+        self.interface = interface
+        self.last_error = last_error
+        self.current_mode = None
+        self.mask_list = None
+
+
 class FeigBase:
     """Base class for all readers
+
+    Args:
+        state: FeigState shared with the reader, new state if None
     """
     MAX_CONFIGURATION_PAGES = 64
 
@@ -20,26 +40,53 @@ class FeigBase:
     FILTER_RSSI = 2
     FILTER_DATA = 3
 
-    _interface = None
-    _last_error = None
-
-    _current_mode = None
-    _mask_list = None
-
-    def __init__(self):
+    def __init__(self, state=None):
         # print("feig_base.py class FeigBase init")
+        self._state = state if state is not None else FeigState()
         self._all_reader_config = []
         self.filters = {}
 
+        # reader info responses {mode: bytes} and configuration pages
+        # {addr: list} of reader (device ID, firmware), read on first use
+        self.config_cache = None  # ConfigCache, keeps them between runs
+        self._config_key = None
+        self._info_pages = {}
+        self._config_pages = {}
+        self._config_changed = False  # pages read since last save
+
+    @property
+    def _interface(self):
+        return self._state.interface
+
+    @_interface.setter
+    def _interface(self, interface):
+        self._state.interface = interface
+
+    @property
+    def _last_error(self):
+        return self._state.last_error
+
+    @_last_error.setter
+    def _last_error(self, error):
+        self._state.last_error = error
+
+    @property
+    def _current_mode(self):
+        return self._state.current_mode
+
+    @_current_mode.setter
+    def _current_mode(self, mode):
+        self._state.current_mode = mode
+
     def get_last_error(self) -> FeigError:
         """Returns Last Error
         """
-        return FeigBase._last_error
+        return self._last_error
 
     def get_last_error_str(self) -> str:
         """Returns Last Error as string
         """
-        return FeigBase._last_error.name
+        return self._last_error.name
 
     def _feig_status_parser(self, status: int) -> FeigError:
         if status == 0x00:
@@ -119,8 +166,102 @@ class FeigBase:
 
         return FeigError.UNKNOWN
 
+    def _save_config_cache(self):
+        if self.config_cache is not None and self._config_key is not None:
+            self.config_cache.store(*self._config_key, self._info_pages, self._config_pages)
+        self._config_changed = False
+
+    def save_config_cache(self):
+        """Write reader info and configuration pages read since last save to
+        config_cache, done by connect() and disconnect() of the readers
+        """
+        if self._config_changed:
+            self._save_config_cache()
+
+    def invalidate_config_cache(self):
+        """Drop cached reader info and configuration pages of the connected
+        reader, in memory and in config_cache. They are read from the reader
+        again on next use.
+
+        The cache only follows changes done through this driver, call it
+        after the configuration was changed by another tool e.g. ISOStart.
+        """
+        self._info_pages = {}
+        self._config_pages = {}
+        self._config_changed = False
+        if self.config_cache is not None and self._config_key is not None:
+            self.config_cache.remove(self._config_key[0])
+
+    def _check_config_cache(self):
+        """Compare device ID and firmware version of the connected reader with
+        the cached reader info and configuration pages, a single command.
+        Pages of another reader or firmware are dropped, config_cache is
+        looked up for the new one.
+
+        Returns:
+            None if error, True if cached data belongs to the reader
+        """
+        cmd = [0x66, 0x80]
+        data = self._interface.transfer(1.0, cmd)
+        if data is None:
+            self._last_error = FeigError.COMM_TIMEOUT
+            return
+
+        self._last_error = FeigError.INVALID_RESPONSE
+        if data[0] != 0x66:
+            return
+
+        self._last_error = self._feig_status_parser(data[1])
+        if self._last_error is not FeigError.OK:
+            return
+
+        data = bytes(data[2:])
+        key = (hexlify(data[0:4]).decode("ascii"), hexlify(data[8:10]).decode("ascii"))
+        if key == self._config_key:
+            return True
+
+        self._config_key = key
+        self._info_pages = {}
+        self._config_pages = {}
+        if self.config_cache is not None:
+            entry = self.config_cache.load(*key)
+            if entry is not None:
+                self._info_pages, self._config_pages = entry
+        self._info_pages[0x80] = data
+
+        return False
+
+    def _read_reader_info(self, mode):
+        """Reader info (0x66) response data of mode, cached by _check_config_cache()
+
+        Returns:
+            bytes, None if error
+        """
+        data = self._info_pages.get(mode)
+        if data is not None:
+            self._last_error = FeigError.OK
+            return data
+
+        cmd = [0x66, mode]
+        data = self._interface.transfer(1.0, cmd)
+        if data is None:
+            self._last_error = FeigError.COMM_TIMEOUT
+            return
+
+        self._last_error = FeigError.INVALID_RESPONSE
+        if data[0] == 0x66:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
+                data = bytes(data[2:])  # remove control & status byte
+                if self._config_key is not None:
+                    self._info_pages[mode] = data
+                    self._config_changed = True
+                return data
+
     def read_config(self, addr) -> list:
-        """Read configuration from reader.
+        """Read configuration from reader, pages read once are returned from
+        cache till the reader or its firmware changes. Pages changed by
+        another tool are not seen, see invalidate_config_cache().
 
         Args:
             addr: int, configuration page/address,
@@ -129,18 +270,26 @@ class FeigBase:
         Returns:
             data:list, empty if error
         """
+        config_data = self._config_pages.get(addr)
+        if config_data is not None:
+            self._last_error = FeigError.OK
+            return list(config_data)
+
         config_data = []
         cmd = [0x80, addr + 0x80]
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return config_data
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x80:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 config_data = list(data[2:])  # remove control & status byte
+                if self._config_key is not None:
+                    self._config_pages[addr] = list(config_data)
+                    self._config_changed = True
 
         return config_data
 
@@ -156,16 +305,23 @@ class FeigBase:
         """
         cmd = [0x81, addr + 0x80]
         cmd = cmd + data
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
-            return False
-
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
-        if data[0] == 0x81:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
-                return True
+            self._last_error = FeigError.COMM_TIMEOUT
+        else:
+            self._last_error = FeigError.INVALID_RESPONSE
+            if data[0] == 0x81:
+                self._last_error = self._feig_status_parser(data[1])
+
+        if self._last_error is FeigError.OK:
+            if self._config_key is not None:
+                self._config_pages[addr] = list(cmd[2:])
+                self._save_config_cache()
+            return True
+
+        # page in reader is unknown, read again on next use
+        if self._config_pages.pop(addr, None) is not None:
+            self._save_config_cache()
 
         return False
 
@@ -192,36 +348,45 @@ class FeigBase:
             value = value + 0x80
 
         cmd = [0x83, value]
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return False
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x83:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
+                if all_blocks is True:
+                    self._config_pages.clear()
+                else:
+                    self._config_pages.pop(addr, None)
+                self._save_config_cache()
                 return True
 
         return False
 
     def read_all_config(self) -> bool:
-        """Read ALL Configuration from READER"""
+        """Read ALL Configuration from READER, refreshes the configuration cache"""
+        self._all_reader_config = []
         for i in range(0, 64):
             cmd = [0x80, 0x80 + i]
-            data = FeigBase._interface.transfer(2.0, cmd)
+            data = self._interface.transfer(2.0, cmd)
             if data is None:
-                FeigBase._last_error = FeigError.COMM_TIMEOUT
+                self._last_error = FeigError.COMM_TIMEOUT
                 return False
 
             if data[0] != 0x80:
-                FeigBase._last_error = FeigError.INVALID_RESPONSE
+                self._last_error = FeigError.INVALID_RESPONSE
                 return False
 
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 self._all_reader_config.append([i, data[2:]])
+                if self._config_key is not None:
+                    self._config_pages[i] = list(data[2:])
 
+        self._save_config_cache()
         return True
 
     def get_software_version(self) -> dict:
@@ -243,15 +408,15 @@ class FeigBase:
         software_version = {}
 
         cmd = [0x02, 0x00, 0x07, 0xFF, 0x65, 0x6E, 0x61]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return software_version
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x65:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 sw_rev = hexlify(data[2:5]).decode("ascii")
                 hw_rev = hexlify(data[5:6]).decode("ascii")
                 fw_rev = int(data[6])
@@ -272,15 +437,15 @@ class FeigBase:
 
     def _get_reader_type(self):
         cmd = [0x02, 0x00, 0x08, 0xFF, 0x66, 0x00, 0x88, 0x12]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x66:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return data[6]
 
     ####################################################################################
@@ -296,15 +461,15 @@ class FeigBase:
         .. note:: wait for atleast 1second after calling this function
         """
         cmd = [0x02, 0x00, 0x07, 0xFF, 0x63, 0x58, 0x04]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return False
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x63:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
         return False
@@ -318,15 +483,15 @@ class FeigBase:
         .. note:: wait for atleast 1second after calling this function
         """
         cmd = [0x02, 0x00, 0x08, 0xFF, 0x64, 0x38, 0x21]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x64:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
         return False
@@ -334,15 +499,15 @@ class FeigBase:
     def rf_reset(self) -> bool:
         """Returns True if RF reset done"""
         cmd = [0x02, 0x00, 0x07, 0xFF, 0x69, 0x02, 0xAB]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return False
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x69:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
         return False
@@ -359,15 +524,15 @@ class FeigBase:
             True if login success.
         """
         cmd = [0xA0] + list(unhexlify(password))
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return False
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0xA0:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
         return False
@@ -1,73 +1,83 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import threading
+import logging
 import time
 
+from ..common.feig_aggregator import TagAggregator
 from ..common.feig_base import FeigBase
 from ..common.feig_data_parser import brm_and_notif_parser
 from ..common.feig_errors import FeigError
+from ..common.feig_protocol import encode
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# largest number of data sets in one read buffer response
+MAX_DATA_SETS = 255
 
 
 class FeigBufferRead(FeigBase):
-    def __init__(self, interface, lastError):
+    def __init__(self, interface, lastError=None, state=None):
         """This class implements Buffer Read mode functionality of Feig reader.
 
         Args:
             interface: This the interface on which communication will happen.
-            lastError: This parameter is shared for reporting error
+            lastError: initial last error
+            state: FeigState of the reader, shared with it (interface and
+                last error) instead of the given ones
         """
-        super().__init__()
-
-        FeigBase._interface = interface
-        FeigBase._last_error = lastError
+        super().__init__(state)
+        if state is None:
+            self._interface = interface
+            self._last_error = lastError
 
     def init(self):
         """This function initializes internal buffer of the reader.
         """
         cmd = [0x02, 0x00, 0x07, 0xFF, 0x33, 0xDD, 0x56]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x33:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
     def clear(self):
         """This function clears internal buffer of the reader.
         """
         cmd = [0x02, 0x00, 0x07, 0xFF, 0x32, 0x54, 0x47]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x32:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
     def info(self):
         """This function gives info of internal buffer of the reader.
         """
         cmd = [0x02, 0x00, 0x07, 0xFF, 0x31, 0xCF, 0x75]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x31:
-            FeigBase._last_error = self._feig_status_parser(data[1])
+            self._last_error = self._feig_status_parser(data[1])
             if (
-                FeigBase._last_error is FeigError.OK
-                or FeigBase._last_error is FeigError.RF_WARNING
-                or FeigBase._last_error is FeigError.DATA_BUFFER_OVERFLOW
+                self._last_error is FeigError.OK
+                or self._last_error is FeigError.RF_WARNING
+                or self._last_error is FeigError.DATA_BUFFER_OVERFLOW
             ):
                 info = {
                     "TableSize": data[2] * 256 + data[3],
@@ -77,85 +87,69 @@ class FeigBufferRead(FeigBase):
 
                 return info
 
-    def read(self):
+    def read(self, data_sets=MAX_DATA_SETS):
         """This function read internal buffer of the reader.
+
+        Args:
+            data_sets: int, maximum number of data sets in the response
         """
-        cmd = [0x02, 0x00, 0x09, 0xFF, 0x22, 0x00, 0xFF, 0x79, 0x69]  # MAX 255 data set
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        if data_sets == MAX_DATA_SETS:
+            cmd = bytes([0x02, 0x00, 0x09, 0xFF, 0x22, 0x00, 0xFF, 0x79, 0x69])  # MAX 255 data set
+        else:
+            cmd = encode([0x22, (data_sets >> 8) & 0xFF, data_sets & 0xFF])
+        data = self._interface.transfer(1.0, cmd)
 
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
         if data[0] != 0x22:
-            FeigBase._last_error = FeigError.INVALID_RESPONSE
+            self._last_error = FeigError.INVALID_RESPONSE
             return
 
-        FeigBase._last_error = self._feig_status_parser(data[1])
+        self._last_error = self._feig_status_parser(data[1])
         if (
-            FeigBase._last_error is FeigError.OK
-            or FeigBase._last_error is FeigError.DATA_BUFFER_OVERFLOW
-            or FeigBase._last_error is FeigError.RF_WARNING
+            self._last_error is FeigError.OK
+            or self._last_error is FeigError.MORE_DATA
+            or self._last_error is FeigError.DATA_BUFFER_OVERFLOW
+            or self._last_error is FeigError.RF_WARNING
         ):
             return brm_and_notif_parser(data[2:])
 
         elif (
-            FeigBase._last_error is FeigError.NO_TAG
-            or FeigBase._last_error is FeigError.NO_VALID_DATA
+            self._last_error is FeigError.NO_TAG
+            or self._last_error is FeigError.NO_VALID_DATA
         ):
             return []
 
     def _update_antennas(self, current_antennalist, new_antennalist):
-        for i in range(0, len(current_antennalist)):
-            for j in range(0, len(new_antennalist)):
-                if current_antennalist[i]["antno"] == new_antennalist[j]["antno"]:
-                    current_antennalist[i]["phase_angle"] = new_antennalist[j]["phase_angle"]
-                    current_antennalist[i]["rssi"] = new_antennalist[j]["rssi"]
-                    # remove same antenna
-                    new_antennalist.pop(j)
-                    break
-
-        # add new antenna
+        current = {ant["antno"]: ant for ant in current_antennalist}
         for ant in new_antennalist:
-            current_antennalist.append(ant)
+            same = current.get(ant["antno"])
+            if same is None:
+                # add new antenna
+                current_antennalist.append(ant)
+                current[ant["antno"]] = ant
+            else:
+                same["phase_angle"] = ant["phase_angle"]
+                same["rssi"] = ant["rssi"]
 
         return current_antennalist
 
     def _unique_tags(self, taglist):
-        unique_tags = {}  # based on TID only
-
-        for tag in taglist:
-            tid = tag["tid"]
-            try:
-                unique_tags[tid]["seen_count"] += 1
-                unique_tags[tid]["last_seen"] = tag["time"]
-                current_antennalist = unique_tags[tid]["antennas"]
-
-                new_antennalist = tag["antennas"]
-
-                unique_tags[tid]["antennas"] = self._update_antennas(
-                    current_antennalist, new_antennalist
-                )
-
-            except KeyError:
-                # add new tag
-                timestamp = tag.pop("time")  # individual tag time is not required
-                unique_tags[tid] = tag
-                unique_tags[tid]["first_seen"] = timestamp
-                unique_tags[tid]["last_seen"] = timestamp
-                unique_tags[tid]["seen_count"] = 1
+        aggregator = TagAggregator()  # based on TID only
+        aggregator.update(taglist)
+        return aggregator.tags()
 
-        return unique_tags
+    def scheduler(self, **kwargs):
+        """Returns BufferReadScheduler polling this buffer"""
+        return BufferReadScheduler(self, **kwargs)
 
     def inventory(self, timeout: int, unique=False):
-        timeout_event = threading.Event()
-        timeout_event.clear()
-
         if timeout < 100:  # min 0.1sec
             timeout = 100
 
-        readTimer = threading.Timer(timeout / 1000, timeout_event.set)
-        readTimer.start()
+        deadline = time.monotonic() + timeout / 1000
 
         ret = self.init()
         if ret is None:
@@ -167,17 +161,13 @@ class FeigBufferRead(FeigBase):
 
         tagList = []
 
-        while not timeout_event.isSet():
-            time.sleep(0.02)  # wait for 20msec
-
-            tags = self.read()
+        scheduler = self.scheduler()
+        while time.monotonic() < deadline:
+            tags = scheduler.poll(deadline)
             if tags is None:
-                readTimer.cancel()
                 break
 
-            if len(tags) > 0:
-                tagList.extend(tags)
-                self.clear()
+            tagList.extend(tags)
 
         self.clear()
         if len(tagList) > 0 and unique is True:
@@ -195,13 +185,13 @@ class FeigBufferRead(FeigBase):
         noNewTagsCount = 0
 
         self.clear()
+        scheduler = self.scheduler()
         while True:
-            tags = self.read()
+            tags = scheduler.poll()
             if tags is None:
                 break
 
             if len(tags) > 0:
-                self.clear()
                 uniqueTags.update(self._unique_tags(tags))
 
                 if len(uniqueTags) > uniqueTagsCount:
@@ -218,3 +208,112 @@ class FeigBufferRead(FeigBase):
                 break
 
         return uniqueTags
+
+
+class BufferReadScheduler:
+    """Adaptive polling of the reader buffer.
+
+    The buffer is read again at once while the reader reports more data
+    (MORE_DATA or full response), after a read with tags it is polled after
+    min_interval, every empty read doubles the interval up to max_interval.
+    Tags read are cleared with one clear per read, an empty read needs no
+    clear. DATA_BUFFER_OVERFLOW hides MORE_DATA, then the fill level from
+    info() (TableLength) gives the records left in the buffer, which are
+    read at once till none is left.
+
+    Args:
+        mode: FeigBufferRead
+        min_interval: seconds, poll interval while tags are in the field
+        max_interval: seconds, poll interval of an idle buffer
+        data_sets: maximum data sets per read
+    """
+
+    def __init__(self, mode, min_interval=0.005, max_interval=0.05, data_sets=MAX_DATA_SETS):
+        self._mode = mode
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.data_sets = data_sets
+
+        self.interval = min_interval
+        self._next_poll = 0.0
+
+        self.polls = 0
+        self.reads = 0  # reads with tags
+        self.tags = 0
+        self.overflows = 0
+        self.clear_errors = 0
+        self.table_length = None  # from info() after overflow
+        self.backlog = 0  # records left in buffer after last overflow
+
+    def poll(self, deadline=None):
+        """Wait till next poll is due (not after deadline), read buffer.
+
+        Returns:
+            list of tags, empty if no tag, None if error (see get_last_error())
+        """
+        wait = self._next_poll - time.monotonic()
+        if deadline is not None:
+            wait = min(wait, deadline - time.monotonic())
+        if wait > 0:
+            time.sleep(wait)
+
+        mode = self._mode
+        tags = mode.read(self.data_sets)
+        self.polls += 1
+        if tags is None:
+            return None
+
+        status = mode.get_last_error()
+        if not tags:
+            self.backlog = 0
+            self.interval = min(self.interval * 2, self.max_interval)
+            self._next_poll = time.monotonic() + self.interval
+            return tags
+
+        self.reads += 1
+        self.tags += len(tags)
+
+        more = status is FeigError.MORE_DATA or len(tags) >= self.data_sets
+        if status is FeigError.DATA_BUFFER_OVERFLOW:
+            self.overflows += 1
+            info = mode.info()
+            if info:
+                # table length counts the records read, till they are cleared
+                self.table_length = info["TableLength"]
+                self.backlog = max(self.table_length - len(tags), 0)
+                logger.warning("buffer overflow, table length=%s", self.table_length)
+            else:
+                # fill level unknown, read again
+                self.backlog = self.data_sets
+        elif self.backlog:
+            self.backlog = max(self.backlog - len(tags), 0)
+        more = more or self.backlog > 0
+
+        if not mode.clear():
+            self.clear_errors += 1
+            logger.debug("buffer clear failed %s", mode.get_last_error_str())
+
+        # tags in the field, poll fast
+        self.interval = self.min_interval
+        self._next_poll = 0.0 if more else time.monotonic() + self.interval
+        return tags
+
+    def __iter__(self):
+        """Yields lists of tags till read error"""
+        while True:
+            tags = self.poll()
+            if tags is None:
+                return
+            if tags:
+                yield tags
+
+    def stats(self) -> dict:
+        return {
+            "polls": self.polls,
+            "reads": self.reads,
+            "tags": self.tags,
+            "overflows": self.overflows,
+            "clear_errors": self.clear_errors,
+            "interval": self.interval,
+            "backlog": self.backlog,
+        }
@@ -0,0 +1,80 @@
+"""
+Reader information and configuration pages cached on disk.
+"""
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+
+class ConfigCache:
+    """Reader information (0x66) responses and configuration pages of a
+    reader, one JSON file per device ID.
+
+    An entry is only returned for the firmware version it was stored with,
+    after a firmware update the pages are read from the reader again.
+    Configuration changed by another tool (e.g. ISOStart) is not detected,
+    drop the entry with FeigBase.invalidate_config_cache() or remove().
+
+    Args:
+        path: directory of the cache files, created on first store
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _file(self, device_id) -> str:
+        return os.path.join(self.path, "{}.json".format(device_id))
+
+    def load(self, device_id, firmware):
+        """Returns (info, pages) stored for device_id / firmware, None if
+        not cached
+
+        info: dict {mode: bytes}, pages: dict {addr: list}
+        """
+        try:
+            with open(self._file(device_id), "r") as fp:
+                entry = json.load(fp)
+
+            if entry["device_id"] != device_id or entry["firmware"] != firmware:
+                return None
+
+            info = {int(mode): bytes.fromhex(data) for mode, data in entry["info"].items()}
+            pages = {int(addr): list(bytes.fromhex(data)) for addr, data in entry["pages"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+        return info, pages
+
+    def store(self, device_id, firmware, info, pages) -> bool:
+        """Write entry of device_id, replaces the former one
+
+        Returns:
+            True if written
+        """
+        entry = {
+            "device_id": device_id,
+            "firmware": firmware,
+            "info": {str(mode): bytes(data).hex() for mode, data in info.items()},
+            "pages": {str(addr): bytes(data).hex() for addr, data in pages.items()},
+        }
+
+        filename = self._file(device_id)
+        tmpname = filename + ".tmp"
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(tmpname, "w") as fp:
+                json.dump(entry, fp)
+            os.replace(tmpname, filename)
+        except OSError:
+            return False
+
+        return True
+
+    def remove(self, device_id):
+        try:
+            os.remove(self._file(device_id))
+        except OSError:
+            pass
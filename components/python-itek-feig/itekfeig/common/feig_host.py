@@ -5,6 +5,7 @@ from binascii import hexlify, unhexlify
 
 from ..common.feig_base import FeigBase
 from ..common.feig_errors import FeigError
+from ..common.feig_tag import TagRead, AntennaObservation
 
 TR_TYPE_BARCODE = 0xC2
 TR_TYPE_EPC_C1G2 = 0x84
@@ -12,6 +13,72 @@ TR_TYPE_EPC_C1G2 = 0x84
 IDDT_EPC = 0x00
 IDDT_EPC_TID = 0x02
 
+_new_tag = TagRead.__new__
+_new_ant = AntennaObservation.__new__
+
+
+def inventory_parser(data, antennas=False) -> list:
+    """Parse data sets of an inventory (0xB0/0x01) response, data starts with
+    the control byte. Records are read at their offset in data.
+
+    Args:
+        data: response bytes
+        antennas: True if data sets have FLAGS and antenna block (mode 0x10)
+
+    Returns:
+        list of TagRead, IndexError if the response is truncated
+    """
+    if not isinstance(data, (bytes, memoryview)):
+        data = bytes(data)
+
+    data_sets = data[2]
+    offset = 3
+    tags = [None] * data_sets
+    for idx in range(0, data_sets):
+        tag = _new_tag(TagRead)
+        if antennas:
+            offset += 1  # FLAGS
+
+        tr_type = data[offset]
+        idd = offset + 3
+        end = idd + data[offset + 2]  # IDD consits of PC+EPC+TID
+
+        if tr_type == TR_TYPE_EPC_C1G2:
+            # EPC length from PC(2bytes), TID only when IDDIB = 02 i.e EPC+TID
+            if data[offset + 1] == IDDT_EPC_TID:
+                epc_end = idd + 2 + (data[idd] >> 3) * 2
+                tag.epc = data[idd + 2:epc_end].hex()
+                tag.tid = data[epc_end:end].hex()
+            else:
+                tag.epc = data[idd + 2:end].hex()
+                tag.tid = ""
+
+        elif tr_type == TR_TYPE_BARCODE:
+            tag.barcode = str(data[idd:end], "ascii")
+
+        offset = end
+        if antennas:
+            # ANT_CNT, then ANT_NR, ANT_STAT, RSSI, PHASE(2), RFU(2) per antenna
+            ant_cnt = data[offset]
+            offset += 1
+            observations = [None] * ant_cnt
+            for ant_idx in range(0, ant_cnt):
+                ant = _new_ant(AntennaObservation)
+                ant.antno = data[offset]
+                ant.status = data[offset + 1]
+                ant.rssi = data[offset + 2]
+                ant.phase_angle = ((data[offset + 3] << 8 | data[offset + 4]) * 360) // 4096
+                observations[ant_idx] = ant
+                offset += 7
+            tag.antennas = observations
+
+        tags[idx] = tag
+
+    if len(data) < offset:
+        raise IndexError("inventory response truncated")
+
+    return tags
+
 
 class FeigHost(FeigBase):
 
@@ -42,16 +109,19 @@ class FeigHost(FeigBase):
     USER_LOCK = 0x008020
     USER_LOCK_PERMANENT = 0x00C030
 
-    def __init__(self, interface, lastError):
+    def __init__(self, interface, lastError=None, state=None):
         """This class implements HOST mode functionality of Feig reader.
 
         Args:
             interface: This the interface on which communication will happen.
-            lastError: This parameter is shared for reporting error
+            lastError: initial last error
+            state: FeigState of the reader, shared with it (interface and
+                last error) instead of the given ones
         """
-        super().__init__()
-        FeigBase._interface = interface
-        FeigBase._last_error = lastError
+        super().__init__(state)
+        if state is None:
+            self._interface = interface
+            self._last_error = lastError
 
     def _write_block(self, uid, bank, addr, db_size, wdata, access):
         uid_lng = len(uid)
@@ -78,15 +148,15 @@ class FeigHost(FeigBase):
         # Data
         cmd = cmd + wdata
 
-        data = FeigBase._interface.transfer(2.0, cmd)
+        data = self._interface.transfer(2.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0xB0:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            return FeigBase._last_error is FeigError.OK
+            self._last_error = self._feig_status_parser(data[1])
+            return self._last_error is FeigError.OK
 
     def _read_block(self, uid, bank, addr, count, access):
         uid_lng = len(uid)
@@ -106,16 +176,16 @@ class FeigHost(FeigBase):
 
         cmd.append(count)
 
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
         rblock = None
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0xB0:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 if data[2] == count:
                     block_size = data[3]
                     offset = 4
@@ -124,7 +194,7 @@ class FeigHost(FeigBase):
                         if data[offset] != 0:
                             rblock.clear()
                             rblock = None
-                            FeigBase._last_error = FeigError.INVALID_RESPONSE
+                            self._last_error = FeigError.INVALID_RESPONSE
                             break  # invalid block data
 
                         # copy
@@ -152,89 +222,25 @@ class FeigHost(FeigBase):
         else:
             cmd = [0xB0, 0x01, mode]
 
-        data = FeigBase._interface.transfer(2.0, cmd)
+        data = self._interface.transfer(2.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
         more = False
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0xB0:
-            FeigBase._last_error = self._feig_status_parser(data[1])
+            self._last_error = self._feig_status_parser(data[1])
             if (
-                FeigBase._last_error is FeigError.MORE_DATA
-                or FeigBase._last_error is FeigError.OK
+                self._last_error is FeigError.MORE_DATA
+                or self._last_error is FeigError.OK
             ):
-                data_sets = data[2]
-                data = data[3:]
-                for _ in range(0, data_sets):
-                    tag = {}
-                    offset = 0
-                    if ant_sel > 0:
-                        #flags = data[0]
-                        offset = 1
-
-                    tr_type = data[offset + 0]
-                    iddib = data[offset + 1]
-                    iddlen = data[offset + 2]
-
-                    # extract IDD consits of PC+EPC+TID
-                    idd_start = offset + 3
-                    idd_end = idd_start + iddlen
-                    idd = data[idd_start:idd_end]
-
-                    if tr_type == TR_TYPE_BARCODE:
-                        tag["barcode"] = idd.decode("ascii")
-
-                    elif tr_type == TR_TYPE_EPC_C1G2:
-                        # extract PC(2bytes)
-                        pc_len = 2
-                        pc_start = 0
-                        pc_end = pc_start + pc_len
-                        pc = idd[pc_start:pc_end]
-
-                        # get EPC
-                        epc_len = self._get_epc_len_from_protocol_bits(pc)
-                        epc_start = pc_end
-                        epc_end = epc_start + epc_len
-                        epc = hexlify(idd[epc_start:epc_end]).decode("ascii")
-
-                        # get TID only when IDDIB = 02 i.e EPC+TID
-                        tid = ""
-                        if iddib == IDDT_EPC_TID:
-                            tid_len = iddlen - epc_len - 2
-                            tid_start = epc_end
-                            tid_end = tid_start + tid_len
-                            tid = hexlify(idd[tid_start:tid_end]).decode("ascii")
-
-                        tag["epc"] = epc
-                        tag["tid"] = tid
-
-                        offset = offset + 3 + iddlen
-                        if ant_sel > 0:
-                            # Extracrt Antennas
-                            tag["antennas"] = []
-                            ant_cnt = data[offset]
-                            for _ in range(0, ant_cnt):
-                                ant_nr = data[offset + 1]
-                                ant_stat = data[offset + 2]
-                                rssi = data[offset + 3]
-                                phase = data[offset + 4] * 256 + data[offset + 5]
-                                phase = (phase * 360) // 4096
-                                tag["antennas"].append(
-                                    {
-                                        "ant_no": ant_nr,
-                                        "ant_stat": ant_stat,
-                                        "rssi": rssi,
-                                        "angle": phase,
-                                    }
-                                )
-                                offset = offset + 7
-                            offset = offset + 1
-
-                    data = data[offset:]
-                    tags.append(tag)
-            more = FeigBase._last_error is FeigError.MORE_DATA
+                more = self._last_error is FeigError.MORE_DATA
+                try:
+                    tags.extend(inventory_parser(data, ant_sel > 0))
+                except IndexError:
+                    self._last_error = FeigError.INVALID_RESPONSE
+                    return
 
         return more
 
@@ -245,18 +251,14 @@ class FeigHost(FeigBase):
             for ant in antennas:
                 ant_sel |= ant
 
+        # the reader sends next data sets only after the last are fetched
         tags = []
-        done = False
         more = False
-        while not done:  # loop till MORE is set
-            rsp = self._inventory(tags, ant_sel, more)
-            if rsp is None:
+        while True:  # loop till MORE is set
+            more = self._inventory(tags, ant_sel, more)
+            if not more:
                 break
 
-            more = rsp
-            if more is False:
-                done = True
-
         return tags
 
     def read_tid_memory(self, epc: str, tid: str, addr: int, count: int, access=None):
@@ -433,13 +435,13 @@ class FeigHost(FeigBase):
         cmd.append(len(access))
         cmd += access
 
-        FeigBase._last_error = FeigError.COMM_TIMEOUT
-        data = FeigBase._interface.transfer(1.0, cmd)
+        self._last_error = FeigError.COMM_TIMEOUT
+        data = self._interface.transfer(1.0, cmd)
         if data:
-            FeigBase._last_error = FeigError.INVALID_RESPONSE
+            self._last_error = FeigError.INVALID_RESPONSE
             if data[0] == 0xB3:
-                FeigBase._last_error = self._feig_status_parser(data[1])
-                if FeigBase._last_error is FeigError.OK:
+                self._last_error = self._feig_status_parser(data[1])
+                if self._last_error is FeigError.OK:
                     return True
 
         return False
@@ -2,95 +2,220 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import queue
+import selectors
 import socket
 import threading
-from binascii import unhexlify
+import time
 
 from ..common.feig_base import FeigBase
 from ..common.feig_errors import FeigError
-from ..common.feig_protocol import decode
+from ..common.feig_protocol import FrameAssembler, HEADER_LENGTH, CRC_LENGTH
 from ..common.feig_data_parser import brm_and_notif_parser
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
-# TODO: implement using asyncio
+# asyncio implementation: interface.feig_async.FeigNotificationServer
+
+ACK = bytes([0x02, 0x00, 0x07, 0xFF, 0x32, 0x54, 0x47])  # clear buffer
+
+# queue size when no queue is given to start()
+QUEUE_SIZE = 1000
+
+# incomplete frame is given up after FRAME_TIMEOUT seconds
+FRAME_TIMEOUT = 0.5
+
+# selector wakes up at least every SELECT_TIMEOUT seconds to check stop
+SELECT_TIMEOUT = 0.2
+
+
+class _Connection:
+    """State of one connected reader"""
+
+    __slots__ = ("sock", "address", "assembler", "last_rx")
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.assembler = FrameAssembler()
+        self.last_rx = time.monotonic()
+
+
+def _reader_stats():
+    return {
+        "connections": 0,  # currently open
+        "notifications": 0,  # queued
+        "tags": 0,
+        "dropped": 0,  # queue full
+        "errors": 0,  # crc, length, status errors
+    }
 
 
 class FeigNotification(FeigBase):
-    def __init__(self, interface, lastError):
+    def __init__(self, interface, lastError=None, state=None):
         """This class implements NOTIFICATION mode functionality of Feig reader.
 
+        One thread serves all reader connections through a selector, the
+        connections are kept open and frames are reassembled incrementally.
+        Every notification is ACKed in-line and queued as (address, tags),
+        a full queue drops the notification, counted per reader in stats().
+
         Args:
             interface: This the interface on which communication will happen.
-            lastError: This parameter is shared for reporting error
+            lastError: initial last error
+            state: FeigState of the reader, shared with it (interface and
+                last error) instead of the given ones
         """
 
-        super().__init__()
-        FeigBase._interface = interface
-        FeigBase._last_error = lastError
+        super().__init__(state)
+        if state is None:
+            self._interface = interface
+            self._last_error = lastError
 
         self._maxListner = 1
-        self._currentListner = 0
 
         self._thread = None
         self._event = threading.Event()
 
-    def _socket_comm_thread(self, conn, address, dataQ, ack):
-        FeigBase._last_error = FeigError.COMM_TIMEOUT
+        self.queue = None
+        self._ack = True
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _reader(self, address):
+        # counters per reader ip, reader reconnects from another port
+        reader = self._stats.get(address[0])
+        if reader is None:
+            with self._stats_lock:
+                reader = self._stats[address[0]] = _reader_stats()
+        return reader
+
+    def _accept(self, sel, sock):
+        try:
+            conn, address = sock.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+
+        conn.setblocking(False)
+        sel.register(conn, selectors.EVENT_READ, _Connection(conn, address))
+        self._reader(address)["connections"] += 1
+        logger.debug("NotificationListener connected %s", address)
+
+    def _close(self, sel, connection):
+        sel.unregister(connection.sock)
+        try:
+            connection.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        connection.sock.close()
+
+        reader = self._reader(connection.address)
+        reader["connections"] -= 1
+        self._frame_errors(connection)
+        logger.debug("NotificationListener closed %s", connection.address)
 
+    def _frame_errors(self, connection):
+        assembler = connection.assembler
+        self._reader(connection.address)["errors"] += (
+            assembler.crc_errors + assembler.length_errors
+        )
+        assembler.crc_errors = assembler.length_errors = 0
+
+    def _frames(self, connection, frames):
+        reader = self._reader(connection.address)
+        for frame in frames:
+            if self._ack is True:
+                try:
+                    connection.sock.sendall(ACK)
+                except BlockingIOError:
+                    logger.warning("NotificationListener ACK not sent %s", connection.address)
+
+            data = frame[HEADER_LENGTH:-CRC_LENGTH]
+            self._last_error = FeigError.INVALID_RESPONSE
+            if data[0] != 0x22:
+                reader["errors"] += 1
+                continue
+
+            self._last_error = self._feig_status_parser(data[1])
+            if (
+                self._last_error is not FeigError.MORE_DATA
+                and self._last_error is not FeigError.OK
+            ):
+                reader["errors"] += 1
+                continue
+
+            tags = brm_and_notif_parser(data[2:])
+            if not tags:
+                continue
+
+            try:
+                self.queue.put_nowait((connection.address, tags))
+                reader["notifications"] += 1
+                reader["tags"] += len(tags)
+            except queue.Full:
+                reader["dropped"] += 1
+                logger.warning("NotificationListener queue full, dropped %s", connection.address)
+
+        self._frame_errors(connection)
+
+    def _receive(self, sel, connection):
         try:
-            packet = conn.recv(4096)
-            if ack is True:
-                conn.sendall(unhexlify("020007FF325447"))  # clear buffer
-            data = decode(packet)
-            if data:
-                FeigBase._last_error = FeigError.INVALID_RESPONSE
-                if data[0] == 0x22:
-                    FeigBase._last_error = self._feig_status_parser(data[1])
-                    if (
-                        FeigBase._last_error is FeigError.MORE_DATA
-                        or FeigBase._last_error is FeigError.OK
-                    ):
-                        tags = brm_and_notif_parser(data[2:])
-                        if tags and len(tags) > 0:
-                            if not dataQ.full():
-                                dataQ.put((address, tags))
+            data = connection.sock.recv(65536)
+            if not data:
+                self._close(sel, connection)
+                return
+
+            connection.last_rx = time.monotonic()
+            self._frames(connection, connection.assembler.feed(data))
+
+        except (BlockingIOError, InterruptedError):
+            pass
 
         except (socket.timeout, socket.error):
             logger.exception("NotificationListener")
+            self._close(sel, connection)
 
-        finally:
-            conn.shutdown(socket.SHUT_RDWR)
-            conn.close()
+    def _resync(self, sel):
+        # give up frames whose rest did not arrive in time
+        now = time.monotonic()
+        for key in list(sel.get_map().values()):
+            connection = key.data
+            if connection and len(connection.assembler) and now - connection.last_rx > FRAME_TIMEOUT:
+                try:
+                    self._frames(connection, connection.assembler.resync())
+                except OSError:
+                    self._close(sel, connection)
 
-    def _notification_thread(self, port, dataQ, ack):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.bind(("", port))  # bind on all
-        sock.listen()
+    def _notification_thread(self, sock):
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ, None)
 
-        while not self._event.set():
+        try:
+            while not self._event.is_set():
+                for key, _ in sel.select(SELECT_TIMEOUT):
+                    if key.data is None:
+                        self._accept(sel, sock)
+                    else:
+                        self._receive(sel, key.data)
 
-            conn, address = sock.accept()
-            # spwan a new thread which does communication
-            threading.Thread(
-                target=self._socket_comm_thread,
-                args=(conn, address, dataQ, ack),
-                daemon=True,
-            ).start()
-
-        # close all connection
-        self._event.clear()
-        sock.shutdown(socket.SHUT_RDWR)
-        sock.close()
-
-    def start(self, port: int, dataQ, ack: bool, listners: int = 1):
+                self._resync(sel)
+
+        finally:
+            # close all connection
+            for key in list(sel.get_map().values()):
+                if key.data is not None:
+                    self._close(sel, key.data)
+            sel.close()
+            sock.close()
+
+    def start(self, port: int, dataQ=None, ack: bool = True, listners: int = 1):
         """Start Notification thread.
 
         Args:
             port: int, PORT on which to listen for incoming data
-            dataQ: queue, Queue in which data will be pushed
+            dataQ: queue, Queue in which data will be pushed,
+                None creates a queue of QUEUE_SIZE (available as .queue)
             ack: bool, True if data received is to be ACKed
             listners: int, Maximum number of listners for diffrent reader
         Returns:
@@ -98,15 +223,25 @@ class FeigNotification(FeigBase):
             True If thread is started or already started
         """
         # check if interface is Ethernet
-        if FeigBase._interface.ID != "Ethernet":
-            FeigBase._last_error = FeigError.INVALID_INTERFACE
+        if self._interface.ID != "Ethernet":
+            self._last_error = FeigError.INVALID_INTERFACE
             return False
 
         self._maxListner = listners
 
         if self._thread is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("", port))  # bind on all
+            sock.listen(max(listners, socket.SOMAXCONN))
+            sock.setblocking(False)
+            self.port = sock.getsockname()[1]
+
+            self.queue = dataQ if dataQ is not None else queue.Queue(QUEUE_SIZE)
+            self._ack = ack
+
             self._thread = threading.Thread(
-                target=self._notification_thread, args=(port, dataQ, ack), daemon=True
+                target=self._notification_thread, args=(sock,), daemon=True
             )
             self._event.clear()
             self._thread.start()
@@ -120,3 +255,10 @@ class FeigNotification(FeigBase):
             self._event.set()
             self._thread.join()
             self._thread = None
+
+    def stats(self) -> dict:
+        """Counters per reader ip: connections, notifications, tags,
+        dropped (queue full) and errors
+        """
+        with self._stats_lock:
+            return {address: dict(reader) for address, reader in self._stats.items()}
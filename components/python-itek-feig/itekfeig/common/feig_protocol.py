@@ -27,72 +27,241 @@ Direction: Backward
 
 """
 
+from binascii import crc_hqx
+
 STX = b"\x02"
+STX_INT = 0x02
 
+CRC_PRESET = 0xFFFF
+CRC_POLYNOM = 0x8408
 
-def crc16(data: bytes, length):
-    """Calculate CRC for the packet
-    """
-    CRC_PRESET = 0xFFFF
-    CRC_POLYNOM = 0x8408
-    crc = CRC_PRESET
-    for i in range(0, length):
-        crc = crc ^ data[i]
-        for _ in range(0, 8):
+# bytes before payload (STX, LEN MSB, LEN LSB, COM-ADR) and CRC bytes
+HEADER_LENGTH = 4
+CRC_LENGTH = 2
+MIN_LENGTH = 7
+
+
+def _crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
             if crc & 0x0001:
                 crc = (crc >> 1) ^ CRC_POLYNOM
             else:
                 crc = crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+# CRC of every byte value, one lookup per byte instead of 8 shifts
+CRC_TABLE = _crc_table()
+
+# bit reversed value of every byte
+_REVERSE = bytes(int("{:08b}".format(byte)[::-1], 2) for byte in range(256))
+
+
+def crc16_table(data, length=None):
+    """Calculate CRC for the packet, table driven, one lookup per byte.
+
+    Args:
+        data: bytes, bytearray, memoryview or list of int
+        length: number of bytes from start, None complete data
+    """
+    if length is None:
+        length = len(data)
+    if not isinstance(data, list):
+        data = memoryview(data)
 
-    return crc & 0xFFFF
+    crc = CRC_PRESET
+    table = CRC_TABLE
+    for byte in data[:length]:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+
+    return crc
 
 
-def encode(payload: list):
+def crc16(data, length=None):
+    """Calculate CRC for the packet
+
+    FEIG CRC is the bit reversed (backward) form of CCITT-CRC16, it is the
+    CCITT-CRC16 of binascii (forward) over bit reversed bytes, bit reversed,
+    computed in C without a python loop.
+
+    Args:
+        data: bytes, bytearray, memoryview or list of int
+        length: number of bytes from start, None complete data
+    """
+    if length is None:
+        length = len(data)
+
+    if isinstance(data, (bytes, bytearray)) and length == len(data):
+        reversed_data = data.translate(_REVERSE)
+    else:
+        reversed_data = bytes(data[:length]).translate(_REVERSE)
+
+    crc = crc_hqx(reversed_data, CRC_PRESET)
+    return (_REVERSE[crc & 0xFF] << 8) | _REVERSE[crc >> 8]
+
+
+def encode(payload):
     """Encode payload as per FEIG protocol.
     This function creates final packet by adding HEADER, FOOTER.
 
+    Args:
+        payload: list of int, bytes or bytearray, CONTROL BYTE and DATA
+
     Returns:
         packet:bytes Final packet to send as per FEIG
     """
-    packet_len = 1 + 2 + 1 + len(payload) + 2
-    len_lsb = packet_len & 0x00FF
-    len_msb = (packet_len >> 8) & 0x00FF
-
-    packet = [
-        0x02,
-        len_msb,
-        len_lsb,
-        0xFF,
-    ]
-    packet = packet + payload
-
-    packet_crc = crc16(packet, len(packet))
-    packet.append(packet_crc & 0x00FF)  # LSB
-    packet.append((packet_crc >> 8) & 0x00FF)  # MSB
+    packet_len = HEADER_LENGTH + len(payload) + CRC_LENGTH
+
+    packet = bytearray(packet_len)
+    packet[0] = STX_INT
+    packet[1] = (packet_len >> 8) & 0x00FF
+    packet[2] = packet_len & 0x00FF
+    packet[3] = 0xFF
+    packet[HEADER_LENGTH:-CRC_LENGTH] = payload
+
+    packet_crc = crc16(memoryview(packet), packet_len - CRC_LENGTH)
+    packet[-2] = packet_crc & 0x00FF  # LSB
+    packet[-1] = (packet_crc >> 8) & 0x00FF  # MSB
 
     return bytes(packet)
 
 
-def decode(packet: bytes):
+def decode(packet, view=False):
     """This function will decode the packet as per FEIG protocol. It will also
     verify the CRC of the packet. If OK, it will remove headers, footers from the
     packet and retun the remaining data
-    """
-    MIN_LENGTH = 7
 
-    data = None
+    Args:
+        packet: bytes, bytearray or memoryview of one complete frame
+        view: bool, return memoryview into packet instead of bytes copy
+
+    Returns:
+        data from COM-ADR+1 till CRC, None if frame is invalid
+    """
     plen = len(packet)
+    if plen < MIN_LENGTH or packet[0] != STX_INT:
+        return None
+
+    received_crc = (packet[plen - 1] << 8) | packet[plen - 2]
+    if received_crc != crc16(packet, plen - CRC_LENGTH):
+        return None
+
+    # comadr = packet[3]
+    data = memoryview(packet)[HEADER_LENGTH:-CRC_LENGTH]
+    if view:
+        return data
+    return bytes(data)
+
+
+# largest frame, LEN field is 2 bytes
+MAX_FRAME_LENGTH = 0xFFFF
+
+
+class FrameAssembler:
+    """Extract complete FEIG frames from a byte stream.
+
+    Received bytes are fed in any chunk size into one reusable buffer, every
+    complete frame with valid CRC is returned. Bytes before STX, frames with
+    invalid length or CRC are skipped and the stream is searched for the next
+    STX (resync).
+
+    Args:
+        max_frame_length: int, frames announcing a larger LEN are invalid
+    """
+
+    def __init__(self, max_frame_length=MAX_FRAME_LENGTH):
+        self._max_frame_length = max_frame_length
+        self._buffer = bytearray()
+        self._start = 0
+
+        self.frames = 0  # valid frames
+        self.crc_errors = 0
+        self.length_errors = 0
+        self.discarded = 0  # bytes skipped while searching frame start
+
+    def __len__(self):
+        """Bytes waiting for completion of a frame"""
+        return len(self._buffer) - self._start
+
+    def _skip(self, count):
+        self._start += count
+        self.discarded += count
+
+    def feed(self, data) -> list:
+        """Add received bytes, returns list of complete frames (bytes)"""
+        if data:
+            self._buffer += data
+
+        frames = []
+        buffer = self._buffer
+        while True:
+            stx = buffer.find(STX, self._start)
+            if stx < 0:
+                self._skip(len(buffer) - self._start)
+                break
+            if stx > self._start:
+                self._skip(stx - self._start)
+
+            if len(buffer) - stx < 3:
+                break  # wait for LEN
+
+            length = (buffer[stx + 1] << 8) | buffer[stx + 2]
+            if length < MIN_LENGTH or length > self._max_frame_length:
+                self.length_errors += 1
+                self._skip(1)
+                continue
+
+            if len(buffer) - stx < length:
+                break  # wait for rest of frame
+
+            end = stx + length
+            received_crc = (buffer[end - 1] << 8) | buffer[end - 2]
+            with memoryview(buffer) as view:
+                valid = received_crc == crc16(view[stx:end - CRC_LENGTH])
+                if valid:
+                    frames.append(bytes(view[stx:end]))
+
+            if valid:
+                self.frames += 1
+                self._start = end
+            else:
+                self.crc_errors += 1
+                self._skip(1)
+
+        # drop consumed bytes, buffer keeps only incomplete frame
+        if self._start:
+            del buffer[:self._start]
+            self._start = 0
 
-    if plen >= MIN_LENGTH:
-        # when indexing bytes, return value if of type int
-        STX_INT = int(STX.hex(), base=16)
-        if packet[0] == STX_INT:
+        return frames
 
-            calculated_crc = crc16(packet, plen - 2)
-            received_crc = (packet[plen - 1] * 256) + packet[plen - 2]
+    def resync(self):
+        """Give up incomplete frame, e.g. when rest of it did not arrive in
+        time. Every following STX still waiting for data is stale as well, the
+        waiting bytes are searched for complete frames only. Returns frames
+        found in them.
+        """
+        frames = []
+        while len(self):
+            self._skip(1)
+            frames += self.feed(b"")
+        return frames
 
-            if received_crc == calculated_crc:
-                # comadr = packet[3]
-                data = packet[4:-2]
+    def clear(self):
+        """Drop all waiting bytes"""
+        self._skip(len(self))
+        del self._buffer[:]
+        self._start = 0
 
-    return data
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "crc_errors": self.crc_errors,
+            "length_errors": self.length_errors,
+            "discarded": self.discarded,
+            "pending": len(self),
+        }
@@ -9,6 +9,7 @@ Feig SCAN mode.
 
 from ..common.feig_base import FeigBase
 #from ..common.feig_errors import FeigError
+from ..common.feig_tag import TagRead
 
 ####################################################################################
 ####    SCAN MODE API
@@ -19,15 +20,137 @@ from ..common.feig_base import FeigBase
 
 
 class FeigScan(FeigBase):
-    def __init__(self, interface, lastError):
+    def __init__(self, interface, lastError=None, state=None):
         """This class implements SCAN mode functionality of Feig reader.
 
         Args:
             interface: This the interface on which communication will happen.
-            lastError: This parameter is shared for reporting error
+            lastError: initial last error
+            state: FeigState of the reader, shared with it (interface and
+                last error) instead of the given ones
         """
         # print("feig_scan.py class FeigScan init")
-        super().__init__()
+        super().__init__(state)
+        if state is None:
+            self._interface = interface
+            self._last_error = lastError
 
-        FeigBase._interface = interface
-        FeigBase._last_error = lastError
+
+_new_tag = TagRead.__new__
+
+# bytes read from the stream at once
+MAX_READ = 4096
+
+
+class ScanFrameReader:
+    """Tag reads of the ASCII scan output of the reader, one frame per line:
+
+        USR_HDR + EPC + TID + SEP + ANT + END (CR LF)
+
+    Bytes waiting in the stream are read at once and all complete frames are
+    parsed from one decode of the received bytes, a partial frame is kept
+    for the next read. Frames of wrong length, without SEP after the TID or
+    END, or with a non numeric antenna are dropped and counted, see stats().
+
+    Args:
+        stream: serial.Serial or any object with read(size) and in_waiting
+        epc_len: EPC length in ASCII characters
+        tid_len: TID length in ASCII characters
+        header_len: USR_HDR length in ASCII characters
+        ant_len: antenna length in ASCII characters
+    """
+
+    def __init__(self, stream=None, epc_len=24, tid_len=24, header_len=4, ant_len=2):
+        self.stream = stream
+        self._tid_start = header_len + epc_len
+        self._tid_end = self._tid_start + tid_len
+        self._ant_start = self._tid_end + 1  # SEP
+        self._header_len = header_len
+        self._frame_len = self._ant_start + ant_len + 2  # END
+        self._max_pending = 4 * self._frame_len
+        self._pending = b""
+
+        self.frames = 0
+        self.malformed_length = 0
+        self.malformed_antenna = 0
+        self.discarded_bytes = 0
+
+    @property
+    def malformed(self) -> int:
+        return self.malformed_length + self.malformed_antenna
+
+    def feed(self, data) -> list:
+        """Returns tag reads (TagRead epc, tid, antno) of the complete frames
+        in data and the bytes kept from last call
+        """
+        if self._pending:
+            data = self._pending + data
+
+        end = data.rfind(b"\n") + 1
+        self._pending = bytes(data[end:])
+        if len(self._pending) > self._max_pending:
+            # no END for several frames, drop them
+            self.discarded_bytes += len(self._pending)
+            self.malformed_length += 1
+            self._pending = b""
+
+        if end == 0:
+            return []
+
+        # ASCII: one character per byte, offsets of text are offsets of data
+        text = str(memoryview(data)[:end], "ascii", "replace")
+
+        epc_start = self._header_len
+        tid_start = self._tid_start
+        tid_end = self._tid_end
+        ant_start = self._ant_start
+        frame_len = self._frame_len
+
+        tags = []
+        start = 0
+        while start < end:
+            next_start = text.find("\n", start) + 1
+            line_len = next_start - start
+            if line_len == frame_len and text[start + tid_end] == "," and text[next_start - 2] == "\r":
+                try:
+                    antno = int(text[start + ant_start:next_start - 2])
+                except ValueError:
+                    self.malformed_antenna += 1
+                else:
+                    tag = _new_tag(TagRead)
+                    tag.epc = text[start + epc_start:start + tid_start]
+                    tag.tid = text[start + tid_start:start + tid_end]
+                    tag.antno = antno
+                    tags.append(tag)
+
+            elif not text[start:next_start].isspace():  # empty lines are ignored
+                self.malformed_length += 1
+
+            start = next_start
+
+        self.frames += len(tags)
+        return tags
+
+    def read(self) -> list:
+        """Waits for bytes from stream, returns tag reads of the complete
+        frames (feed()), empty if none yet
+        """
+        size = min(max(self.stream.in_waiting, 1), MAX_READ)
+        data = self.stream.read(size)
+        if not data:
+            return []
+
+        return self.feed(data)
+
+    def clear(self):
+        """Drop partial frame e.g. after flushing the stream"""
+        self._pending = b""
+
+    def stats(self) -> dict:
+        """Frames parsed and malformed frames by reason"""
+        return {
+            "frames": self.frames,
+            "malformed_length": self.malformed_length,
+            "malformed_antenna": self.malformed_antenna,
+            "discarded_bytes": self.discarded_bytes,
+        }
@@ -0,0 +1,254 @@
+"""
+Tag read records returned by inventory, buffer read and notification.
+"""
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class _SlotView:
+    """Read / write dict view of a slotted record.
+
+    _KEYS gives the keys of the view in order with the attribute holding the
+    value, _ALIASES maps every accepted key (view keys and aliases) to
+    (attribute, to view value, from view value). Missing attributes are
+    missing keys.
+    """
+
+    __slots__ = ()
+
+    _KEYS = ()
+    _ALIASES = {}
+
+    def _has(self, attr) -> bool:
+        return hasattr(self, attr)
+
+    def __getitem__(self, key):
+        try:
+            attr, to_view, _ = self._ALIASES[key]
+            value = getattr(self, attr)
+        except (KeyError, AttributeError, TypeError):
+            raise KeyError(key) from None
+        return value if to_view is None else to_view(value)
+
+    def __setitem__(self, key, value):
+        try:
+            attr, _, from_view = self._ALIASES[key]
+        except (KeyError, TypeError):
+            raise KeyError(key) from None
+        setattr(self, attr, value if from_view is None else from_view(value))
+
+    def __delitem__(self, key):
+        try:
+            attr = self._ALIASES[key][0]
+            self.__getattribute__(attr)
+            delattr(self, attr)
+        except (KeyError, AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        try:
+            return self._has(self._ALIASES[key][0])
+        except (KeyError, TypeError):
+            return False
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return value
+
+    def keys(self) -> list:
+        has = self._has
+        return [key for key, attr in self._KEYS if has(attr)]
+
+    def values(self) -> list:
+        return [self[key] for key in self.keys()]
+
+    def items(self) -> list:
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def as_dict(self) -> dict:
+        return dict(self.items())
+
+    copy = as_dict
+
+    def __eq__(self, other):
+        if isinstance(other, (dict, _SlotView)):
+            return self.as_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.as_dict())
+
+    def __getstate__(self):
+        # lazy fields are decoded, the response is not kept
+        return {attr: getattr(self, attr) for _, attr in self._KEYS if self._has(attr)}
+
+    def __setstate__(self, state):
+        for attr, value in state.items():
+            setattr(self, attr, value)
+
+
+class AntennaObservation(_SlotView):
+    """RSSI and phase angle of a tag on one antenna.
+
+    The view has the keys antno, rssi, phase_angle and ant_stat (only if
+    status is given), ant_no and angle are accepted as aliases.
+    """
+
+    __slots__ = ("antno", "rssi", "phase_angle", "status")
+
+    _KEYS = (
+        ("antno", "antno"),
+        ("rssi", "rssi"),
+        ("phase_angle", "phase_angle"),
+        ("ant_stat", "status"),
+    )
+    _ALIASES = {
+        "antno": ("antno", None, None),
+        "ant_no": ("antno", None, None),
+        "rssi": ("rssi", None, None),
+        "phase_angle": ("phase_angle", None, None),
+        "angle": ("phase_angle", None, None),
+        "ant_stat": ("status", None, None),
+    }
+
+    def __init__(self, antno, rssi, phase_angle, status=None):
+        self.antno = antno
+        self.rssi = rssi
+        self.phase_angle = phase_angle
+        if status is not None:
+            self.status = status
+
+
+
+class TagRead(_SlotView):
+    """One tag read, only the fields sent by the reader are set.
+
+    Numbers are kept as int (rssi is RSSI max of tag statistics), the dict
+    view returns the keys and values of the former dict records: tag_cnt,
+    rssi_max and rssi_avg as str. Accepted aliases are ant_no (antno),
+    rssi (int RSSI) and EPC / TID / ANT of the fastgate scan.
+
+    Buffer read / notification records keep data, date, input, MAC and
+    antennas as offsets in the response, they are decoded on first access.
+    """
+
+    __slots__ = (
+        "epc", "tid", "barcode", "data", "rtime", "rdate", "antno", "tag_cnt",
+        "rssi", "rssi_avg", "input", "mac", "antennas", "time", "_view", "_lazy",
+    )
+
+    _KEYS = (
+        ("epc", "epc"),
+        ("tid", "tid"),
+        ("barcode", "barcode"),
+        ("data", "data"),
+        ("rtime", "rtime"),
+        ("rdate", "rdate"),
+        ("antno", "antno"),
+        ("tag_cnt", "tag_cnt"),
+        ("rssi_max", "rssi"),
+        ("rssi_avg", "rssi_avg"),
+        ("input", "input"),
+        ("mac", "mac"),
+        ("antennas", "antennas"),
+        ("time", "time"),
+    )
+    _ALIASES = {
+        key: (attr, None, None) for key, attr in _KEYS
+    }
+    _ALIASES.update({
+        "tag_cnt": ("tag_cnt", str, int),
+        "rssi_max": ("rssi", str, int),
+        "rssi_avg": ("rssi_avg", str, int),
+        "rssi": ("rssi", None, None),
+        "ant_no": ("antno", None, None),
+        "EPC": ("epc", None, None),
+        "TID": ("tid", None, None),
+        "ANT": ("antno", None, None),
+    })
+
+    def __init__(self, **fields):
+        for attr, value in fields.items():
+            setattr(self, attr, value)
+
+    def __getattr__(self, attr):
+        # only called for fields not set, decode lazy field on first access
+        if attr[0] != "_":
+            try:
+                lazy = self._lazy
+            except AttributeError:
+                lazy = None
+            if lazy and attr in lazy:
+                start, end = lazy.pop(attr)
+                if attr == "antennas":
+                    value = _antennas(self._view, start, end)
+                else:
+                    value = self._view[start:end].hex()
+                setattr(self, attr, value)
+                return value
+        raise AttributeError(attr)
+
+    def _has(self, attr) -> bool:
+        try:
+            if attr in self._lazy:
+                return True
+        except (AttributeError, TypeError):
+            pass
+        try:
+            self.__getattribute__(attr)
+        except AttributeError:
+            return False
+        return True
+
+    def __delitem__(self, key):
+        attr = self._ALIASES.get(key, (None,))[0]
+        try:
+            if attr in self._lazy:
+                del self._lazy[attr]
+                return
+        except (AttributeError, TypeError):
+            pass
+        _SlotView.__delitem__(self, key)
+
+    def raw(self, key) -> bytes:
+        """Undecoded bytes of a hex field (epc, tid, data, rdate, input, mac)"""
+        attr = self._ALIASES[key][0]
+        try:
+            if attr in self._lazy:
+                start, end = self._lazy[attr]
+                return bytes(self._view[start:end])
+        except (AttributeError, TypeError):
+            pass
+        return bytes.fromhex(self[key])
+
+
+def _antennas(view, offset, ant_cnt) -> list:
+    # antenna extension: ANT, RSSI, PHASE(2), RFU(2) per antenna
+    antennas = []
+    for _ in range(0, ant_cnt):
+        angle = view[offset + 2] * 256 + view[offset + 3]
+        antennas.append(AntennaObservation(view[offset], view[offset + 1], (angle * 360) // 4096))
+        offset += 6
+
+    return antennas
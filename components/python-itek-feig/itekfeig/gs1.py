@@ -11,7 +11,7 @@ http://www.gs1.org/sites/default/files/docs/tds/TDS_1_9_Standard.pdf
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import math
+import functools
 
 # Table defining partition sizes for SGTIN-96
 SGTIN_96_PARTITION_MAP = {
@@ -25,6 +25,19 @@ SGTIN_96_PARTITION_MAP = {
 }
 
 
+# Partition value -> (company digits, company mask, company limit, item bits,
+# item digits, item mask), company prefix and item reference are 44 bits
+_PARTITIONS = [None] * 8
+for _partition, (_m, _l, _n, _k) in SGTIN_96_PARTITION_MAP.items():
+    _PARTITIONS[_partition] = (_l, (1 << _m) - 1, pow(10, _l), _n, _k, (1 << _n) - 1)
+
+SERIAL_BITS = 38
+SERIAL_MASK = (1 << SERIAL_BITS) - 1
+
+EAN_CACHE_SIZE = 4096
+"""EANs kept by sgtin96_to_ean and decode_many, one per company/item prefix"""
+
+
 class Error(Exception):
     """base error class"""
 
@@ -33,69 +46,58 @@ class SGTINDecodeError(Error):
     """Raised when failed to decode SGTIN"""
 
 
-def sgtin96_decoder(sgtin96: str) -> tuple:
-    """Given a SGTIN-96 hex string, parse each segment.
-
-    Returns:
-        tuple: (company_prefix, item_reference, serial) in string
-
-    Raises:
-        ValueError
-    """
-
+def _sgtin96_value(sgtin96: str) -> int:
     if not sgtin96.startswith("30"):
         # not a sgtin, not handled
         raise SGTINDecodeError("Invalid SGTIN Header")
 
-    binary = "{0:020b}".format(int(sgtin96, 16)).zfill(96)
+    value = int(sgtin96, 16)
+    if value >> 96:
+        raise SGTINDecodeError("Invalid SGTIN Length")
 
-    # header = int(binary[:8], 2)
-    #tag_filter = int(binary[8:11], 2)
+    return value
 
-    partition = binary[11:14]
-    partition_value = int(partition, 2)
 
+def _split(prefix: int) -> tuple:
+    """Returns (company digits, company, item digits, item) of the bits above
+    the serial i.e. header, filter, partition, company prefix, item reference
+    """
+    partition = (prefix >> 44) & 0x07
     try:
-        m, l, n, k = SGTIN_96_PARTITION_MAP[partition_value]
-    except KeyError:
+        l, company_mask, company_limit, n, k, item_mask = _PARTITIONS[partition]
+    except TypeError:
         raise SGTINDecodeError("Invalid Partition")
 
-    company_start = 8 + 3 + 3
-    company_end = company_start + m
-    company_data = int(binary[company_start:company_end], 2)
-    if company_data > pow(10, l):
+    company = (prefix >> n) & company_mask
+    if company > company_limit:
         # can't be too large
         raise SGTINDecodeError("Invalid Company")
 
-    company_prefix = str(company_data).zfill(l)
+    return l, company, k, prefix & item_mask
+
+
+def sgtin96_decoder(sgtin96: str) -> tuple:
+    """Given a SGTIN-96 hex string, parse each segment.
 
-    item_start = company_end
-    item_end = item_start + n
-    item_data = binary[item_start:item_end]
-    item_number = int(item_data, 2)
-    item_reference = str(item_number).zfill(k)
+    Returns:
+        tuple: (company_prefix, item_reference, serial) in string
 
-    serial = str(int(binary[-38:], 2))
+    Raises:
+        ValueError
+    """
+    value = _sgtin96_value(sgtin96)
+    l, company, k, item = _split(value >> SERIAL_BITS)
 
-    return (company_prefix, item_reference, serial)
+    return (str(company).zfill(l), str(item).zfill(k), str(value & SERIAL_MASK))
 
 
 def gtin_check_digit(gtin: str) -> int:
     """Given a GTIN (8-14) or SSCC, calculate its appropriate check digit"""
 
-    reverse_gtin = gtin[::-1]
-    total = 0
-    count = 0
-    for char in reverse_gtin:
-        digit = int(char)
-        if count % 2 == 0:
-            digit = digit * 3
-        total = total + digit
-        count = count + 1
+    # weight 3 for the last digit and every second one before
+    total = 3 * sum(map(int, gtin[-1::-2])) + sum(map(int, gtin[-2::-2]))
 
-    nearest_multiple_of_ten = int(math.ceil(total / 10.0) * 10)
-
-    return nearest_multiple_of_ten - total
+    return -total % 10
 
 
 def gtin_check(ean: str) -> bool:
@@ -148,11 +150,56 @@ def tid_parser(tid: str) -> dict:
     return data
 
 
-def sgtin96_to_ean(sgtin96: str) -> tuple:
-    """Returns EAN and SerialNumber from SGTIN96"""
-    (company_prefix, item_reference, serialno) = sgtin96_decoder(sgtin96)
-    ean = company_prefix + item_reference[1:6]
-    ean = ean + str(gtin_check_digit(ean))
-    srno = serialno.zfill(12)
+def _prefix_ean(prefix: int) -> str:
+    # EAN is company prefix + item reference without indicator digit
+    l, company, k, item = _split(prefix)
+    ean = str(company).zfill(l) + str(item).zfill(k)[1:6]
+
+    return ean + str(gtin_check_digit(ean))
+
+
+_cached_prefix_ean = functools.lru_cache(maxsize=EAN_CACHE_SIZE)(_prefix_ean)
+
+# partition, company prefix and item reference, EAN does not depend on filter
+_PREFIX_MASK = (1 << 47) - 1
 
-    return (ean, srno)
+
+def sgtin96_to_ean(sgtin96: str, cache: bool = True) -> tuple:
+    """Returns EAN and SerialNumber from SGTIN96
+
+    Args:
+        sgtin96: SGTIN-96 hex string
+        cache: EAN of a company/item prefix is kept in a LRU cache
+
+    Raises:
+        SGTINDecodeError, ValueError
+    """
+    value = _sgtin96_value(sgtin96)
+    prefix = (value >> SERIAL_BITS) & _PREFIX_MASK
+    ean = _cached_prefix_ean(prefix) if cache else _prefix_ean(prefix)
+
+    return (ean, "%012d" % (value & SERIAL_MASK))
+
+
+def decode_many(sgtin96_list, cache: bool = True) -> list:
+    """Returns (EAN, SerialNumber) of every SGTIN96 in sgtin96_list, None for
+    the ones failed to decode
+    """
+    prefix_ean = _cached_prefix_ean if cache else _prefix_ean
+    result = [None] * len(sgtin96_list)
+    for idx, sgtin96 in enumerate(sgtin96_list):
+        if not sgtin96.startswith("30"):
+            continue
+
+        try:
+            value = int(sgtin96, 16)
+            if value >> 96:
+                continue
+            result[idx] = (
+                prefix_ean((value >> SERIAL_BITS) & _PREFIX_MASK),
+                "%012d" % (value & SERIAL_MASK),
+            )
+        except (SGTINDecodeError, ValueError):
+            pass
+
+    return result
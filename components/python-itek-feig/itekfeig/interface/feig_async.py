@@ -0,0 +1,386 @@
+"""
+Feig asyncio Interfaces
+"""
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import socket
+from binascii import hexlify
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+from ..common.feig_base import FeigBase
+from ..common.feig_errors import FeigError
+from ..common.feig_protocol import encode, FrameAssembler, HEADER_LENGTH, CRC_LENGTH
+from ..common.feig_data_parser import brm_and_notif_parser
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+MAX_RETRY = 3
+
+# buffer read commands, MAX 255 data set
+CMD_BRM_CLEAR = bytes([0x02, 0x00, 0x07, 0xFF, 0x32, 0x54, 0x47])
+CMD_BRM_READ = bytes([0x02, 0x00, 0x09, 0xFF, 0x22, 0x00, 0xFF, 0x79, 0x69])
+
+# incomplete notification frame is given up after FRAME_TIMEOUT seconds
+FRAME_TIMEOUT = 0.5
+
+_status = FeigBase()._feig_status_parser
+
+
+def _encode(txdata):
+    if isinstance(txdata, list):
+        # encode data with feig protocol
+        return encode(txdata)
+
+    if isinstance(txdata, bytes):
+        return txdata
+
+    raise ValueError("Invalid txdata")
+
+
+def parse_tags(data):
+    """Parse buffer read / notification response (without header and CRC).
+
+    Returns:
+        (FeigError, list of tags), tags is None if response has no tag data
+    """
+    if not data or data[0] != 0x22:
+        return FeigError.INVALID_RESPONSE, None
+
+    error = _status(data[1])
+    if error in (
+        FeigError.OK,
+        FeigError.MORE_DATA,
+        FeigError.DATA_BUFFER_OVERFLOW,
+        FeigError.RF_WARNING,
+    ):
+        return error, brm_and_notif_parser(data[2:])
+
+    if error in (FeigError.NO_TAG, FeigError.NO_VALID_DATA):
+        return error, []
+
+    return error, None
+
+
+class AsyncFeigEthernet:
+    """Ethernet interface on asyncio streams.
+
+    Same transfer() contract as FeigEthernet, a coroutine. Commands are
+    serialized with a lock, so several tasks can share one reader.
+    """
+
+    ID = "Ethernet"
+
+    def __init__(self):
+        self._reader = None
+        self._writer = None
+        self._assembler = FrameAssembler()
+        self._frames = []
+        self._lock = None
+        self.error = None
+        self._retry = 0
+
+    async def open(self, ipaddr: str, tcpport: int, timeout=5.0) -> bool:
+        """Open interface with given settings.
+
+        Returns:
+            True, if interface is/already opened
+        """
+        if self._writer is not None:
+            return True
+
+        self._lock = asyncio.Lock()
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(ipaddr, tcpport), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.debug("connect timeout")
+            self.error = FeigError.COMM_TIMEOUT
+            return False
+
+        except OSError:
+            logger.exception("connect error")
+            self.error = FeigError.INTERFACE_ERROR
+            return False
+
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        self._assembler.clear()
+        self._frames = []
+        self._retry = 0
+        self.error = FeigError.OK
+        return True
+
+    async def close(self):
+        """Close interface"""
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+            self._reader = None
+            self._writer = None
+            self._retry = 0
+
+    def _timeout(self, where):
+        logger.debug("%s= TIMEOUT", where)
+        self.error = FeigError.COMM_TIMEOUT
+        self._retry += 1
+        if self._retry == MAX_RETRY:
+            self.error = FeigError.INTERFACE_ERROR
+            logger.error("%s= MAX_RETRY", where)
+
+    async def _receive(self):
+        while not self._frames:
+            data = await self._reader.read(4096)
+            if not data:
+                raise ConnectionResetError("remote socket closed")
+            self._frames.extend(self._assembler.feed(data))
+        return self._frames.pop(0)
+
+    async def transfer(self, timeout: int, txdata: Union[list, bytes]) -> Union[None, bytes]:
+        """Send and receive through the interface.
+
+        Args:
+            timeout: int,
+            txdata: data to be send
+
+        Returns:
+            None, if error else bytes()
+
+        Raises:
+            ValueError for incorrect txdata
+        """
+        txdata = _encode(txdata)
+
+        # If interface error do not transfer, this error might happen
+        # - remote socket closed
+        if self._writer is None or self.error is FeigError.INTERFACE_ERROR:
+            return
+
+        async with self._lock:
+            # late responses of timed out commands are not the answer
+            self._frames = []
+            try:
+                logger.debug("TX= %s", hexlify(txdata))
+                self._writer.write(txdata)
+                await asyncio.wait_for(self._writer.drain(), timeout)
+
+            except asyncio.TimeoutError:
+                self._timeout("TX")
+                return
+
+            except OSError:
+                logger.exception("TX= ERROR")
+                self.error = FeigError.INTERFACE_ERROR
+                return
+
+            try:
+                frame = await asyncio.wait_for(self._receive(), timeout)
+
+            except asyncio.TimeoutError:
+                self._timeout("RX")
+                return
+
+            except OSError:
+                logger.exception("RX= ERROR")
+                self.error = FeigError.INTERFACE_ERROR
+                return
+
+        self.error = FeigError.OK
+        self._retry = 0
+        logger.debug("RX= %s", hexlify(frame))
+        return frame[HEADER_LENGTH:-CRC_LENGTH]
+
+
+class AsyncFeigSerial:
+    """Serial interface for asyncio.
+
+    pyserial is blocking, the FeigSerial is driven from one worker thread,
+    transfer() is a coroutine which does not block the event loop.
+    """
+
+    ID = "Serial"
+
+    def __init__(self, interface=None):
+        from .feig_serial import FeigSerial
+
+        self._interface = interface or FeigSerial()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feig-serial")
+
+    @property
+    def error(self):
+        return self._interface.error
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def open(self, port, baudrate, parity) -> bool:
+        return await self._run(self._interface.open, port, baudrate, parity)
+
+    async def close(self):
+        await self._run(self._interface.close)
+
+    async def transfer(self, timeout: int, txdata: Union[list, bytes]) -> Union[None, bytes]:
+        """Send and receive through the interface, see FeigSerial.transfer()"""
+        return await self._run(self._interface.transfer, timeout, _encode(txdata))
+
+    def stats(self) -> dict:
+        return self._interface.stats()
+
+
+async def buffer_read(interface, interval=0.02, clear=True):
+    """Async iterator over buffer read mode of a reader.
+
+    Polls the reader buffer every interval seconds through an async
+    interface, yields list of tags whenever the buffer had tags. Ends when
+    the reader does not respond or responds with an error.
+
+    Args:
+        interface: AsyncFeigEthernet or AsyncFeigSerial
+        interval: seconds between polls of an empty buffer
+        clear: clear buffer after tags are read
+    """
+    while True:
+        data = await interface.transfer(1.0, CMD_BRM_READ)
+        if data is None:
+            return
+
+        error, tags = parse_tags(data)
+        if tags is None:
+            logger.error("buffer read error %s", error.name)
+            return
+
+        if tags:
+            if clear:
+                await interface.transfer(1.0, CMD_BRM_CLEAR)
+            yield tags
+
+        if error is not FeigError.MORE_DATA:
+            await asyncio.sleep(interval)
+
+
+class FeigNotificationServer:
+    """Notification mode server on asyncio.
+
+    Readers connect to the server and push buffer read records, every
+    connection is served by a task with its own FrameAssembler. Tags are
+    queued as (address, tags) and consumed as async iterator:
+
+        server = FeigNotificationServer(4001, ack=True)
+        await server.start()
+        async for address, tags in server:
+            ...
+
+    Args:
+        port: int, PORT on which to listen for incoming data
+        ack: bool, True if data received is to be ACKed
+        maxsize: queue size, notifications are dropped (and counted) when full
+    """
+
+    def __init__(self, port: int, ack: bool = True, maxsize: int = 1000, host=""):
+        self._port = port
+        self._host = host
+        self._ack = ack
+        self._server = None
+        self._queue = asyncio.Queue(maxsize)
+
+        self.connections = 0
+        self.notifications = 0
+        self.dropped = 0
+        self.errors = 0
+
+    async def start(self):
+        if self._server is None:
+            self._server = await asyncio.start_server(
+                self._handle, self._host or None, self._port, reuse_address=True
+            )
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server else ()
+
+    async def _handle(self, reader, writer):
+        address = writer.get_extra_info("peername")
+        assembler = FrameAssembler()
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    # wait for rest of an incomplete frame only for a while
+                    data = await asyncio.wait_for(
+                        reader.read(4096), FRAME_TIMEOUT if len(assembler) else None
+                    )
+                except asyncio.TimeoutError:
+                    frames = assembler.resync()
+                else:
+                    if not data:
+                        break
+                    frames = assembler.feed(data)
+
+                for frame in frames:
+                    if self._ack is True:
+                        writer.write(CMD_BRM_CLEAR)
+                    self._notification(address, frame[HEADER_LENGTH:-CRC_LENGTH])
+
+                if self._ack is True:
+                    await writer.drain()
+
+        except OSError:
+            logger.exception("NotificationListener")
+
+        finally:
+            self.connections -= 1
+            self.errors += assembler.crc_errors + assembler.length_errors
+            writer.close()
+
+    def _notification(self, address, data):
+        error, tags = parse_tags(data)
+        if not tags:
+            if tags is None:
+                self.errors += 1
+                logger.debug("notification error %s", error.name)
+            return
+
+        try:
+            self._queue.put_nowait((address, tags))
+            self.notifications += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def get(self):
+        """Wait for next (address, tags)"""
+        return await self._queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self._queue.get()
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "notifications": self.notifications,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "queued": self._queue.qsize(),
+        }
@@ -7,17 +7,24 @@ Feig Ethernet Interface
 
 import logging
 import socket
+import time
 from binascii import hexlify
 from typing import Union
 
 from ..common.feig_errors import FeigError
-from ..common.feig_protocol import decode, encode
+from ..common.feig_protocol import encode, FrameAssembler, HEADER_LENGTH, CRC_LENGTH
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 MAX_RETRY = 3
 
+# reconnect backoff in seconds, doubled after every failed attempt
+RECONNECT_MIN = 0.5
+RECONNECT_MAX = 30.0
+
+RX_BUFFER_SIZE = 64 * 1024
+
 
 class FeigEthernet:
 
@@ -28,8 +35,33 @@ class FeigEthernet:
         self.error = None
         self._ipaddr = None
         self._tcpport = None
+        self._connect_timeout = 5.0
         self._retry = 0
 
+        # response may arrive in several segments, bytes of incomplete frame
+        # are kept across recv() calls
+        self._assembler = FrameAssembler()
+        self._rxbuffer = bytearray(RX_BUFFER_SIZE)
+        self._rxframes = []
+
+        self._backoff = RECONNECT_MIN
+        self._reconnect_time = 0.0
+        self.reconnects = 0
+        self.stale = 0  # frames received which are not response of the command
+
+    def _socket(self):
+        tcpsock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        tcpsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        tcpsock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 1)
+        tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 5)
+        tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 2)
+
+        tcpsock.settimeout(self._connect_timeout)
+        return tcpsock
+
     def _connect(self):
         status = False
         if self._tcpsock is not None:
@@ -38,6 +70,9 @@ class FeigEthernet:
                 self.error = FeigError.OK
                 status = True
                 self._retry = 0
+                self._backoff = RECONNECT_MIN
+                self._assembler.clear()
+                self._rxframes = []
 
             except socket.timeout:
                 logger.debug("connect timeout")
@@ -59,9 +94,87 @@ class FeigEthernet:
 
         return status
 
+    def _disconnect(self):
+        if self._tcpsock:
+            try:
+                self._tcpsock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+            self._tcpsock.close()
+            self._tcpsock = None
+
+    def _reconnect(self, force=False):
+        """Connect again, attempts are limited by backoff unless forced"""
+        now = time.monotonic()
+        if not force and now < self._reconnect_time:
+            return False
+
+        self._disconnect()
+        self._tcpsock = self._socket()
+        self.reconnects += 1
+        if self._connect():
+            logger.info("reconnected to %s:%s", self._ipaddr, self._tcpport)
+            return True
+
+        # connect failed, interface stays unusable till next attempt
+        self.error = FeigError.INTERFACE_ERROR
+        self._reconnect_time = now + self._backoff
+        self._backoff = min(self._backoff * 2, RECONNECT_MAX)
+        return False
+
+    def _timeout(self, where):
+        logger.debug("%s= TIMEOUT", where)
+        self.error = FeigError.COMM_TIMEOUT
+        self._retry += 1
+        if self._retry == MAX_RETRY:
+            self.error = FeigError.INTERFACE_ERROR
+            self._reconnect_time = time.monotonic() + self._backoff
+            logger.error("%s= MAX_RETRY", where)
+
+    def _closed_by_peer(self):
+        """True if reader closed the connection while idle"""
+        try:
+            self._tcpsock.settimeout(0.0)
+            return self._tcpsock.recv(1, socket.MSG_PEEK) == b""
+        except BlockingIOError:
+            return False  # alive, nothing to read
+        except socket.error:
+            return True
+
+    def _send(self, timeout, txdata):
+        self._tcpsock.settimeout(timeout)
+        self._tcpsock.sendall(txdata)
+
+    def _receive(self, timeout, command):
+        """Returns response frame of command, reads till its length is received"""
+        deadline = time.monotonic() + timeout
+        view = memoryview(self._rxbuffer)
+        while True:
+            while self._rxframes:
+                frame = self._rxframes.pop(0)
+                if command is None or frame[HEADER_LENGTH] == command:
+                    return frame
+                # late response of an earlier command
+                self.stale += 1
+                logger.debug("RX= stale %s", hexlify(frame))
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout
+
+            self._tcpsock.settimeout(remaining)
+            size = self._tcpsock.recv_into(view)
+            if size == 0:
+                raise ConnectionResetError("remote socket closed")
+            self._rxframes = self._assembler.feed(view[:size])
+
     def transfer(self, timeout: int, txdata: Union[list, bytes]) -> Union[None, bytes]:
         """Send and receive through the interface.
 
+        Response is read till the frame length is received, bytes of a
+        following frame are kept for next transfer. Broken connection is
+        connected again, attempts are spaced by an increasing backoff.
+
         Args:
             timeout: int,
             txdata: data to be send
@@ -82,56 +195,63 @@ class FeigEthernet:
         else:
             raise ValueError("Invalid txdata")
 
-        # If interface error do not transfer, this error might happen
-        # - remote socket closed
-        if self.error and self.error is FeigError.INTERFACE_ERROR:
+        if self._ipaddr is None:
             return
 
+        # If interface error connect again, this error might happen
+        # - remote socket closed
+        # - MAX_RETRY timeouts
+        if self._tcpsock is None or self.error is FeigError.INTERFACE_ERROR:
+            if not self._reconnect():
+                return
+
+        elif self._closed_by_peer():
+            logger.debug("connection closed by reader")
+            if not self._reconnect(force=True):
+                return
+
+        command = txdata[HEADER_LENGTH] if len(txdata) > HEADER_LENGTH else None
+
         # time.sleep(0.020) # DO_NOT_MODIFY
 
         # Send Data
         try:
             logger.debug("TX= %s", hexlify(txdata))
-            self._tcpsock.settimeout(timeout)
-            self._tcpsock.sendall(txdata)
+            try:
+                self._send(timeout, txdata)
+            except (BrokenPipeError, ConnectionResetError):
+                # connection closed by reader while idle, send once again
+                if not self._reconnect(force=True):
+                    return
+                self._send(timeout, txdata)
             self.error = FeigError.OK
 
         except socket.timeout:
-            logger.debug("TX= TIMEOUT")
-            self.error = FeigError.COMM_TIMEOUT
-            self._retry += 1
-            if self._retry == MAX_RETRY:
-                self.error = FeigError.INTERFACE_ERROR
-                logger.error("TX= MAX_RETRY")
+            self._timeout("TX")
             return
 
         except socket.error:
             logger.exception("TX= ERROR")
             self.error = FeigError.INTERFACE_ERROR
+            self._disconnect()
             return
 
         # Receive Data
         try:
-            self._tcpsock.settimeout(timeout)
-            rxdata = self._tcpsock.recv(4096)
+            rxdata = self._receive(timeout, command)
             self.error = FeigError.OK
             self._retry = 0
             logger.debug("RX= %s", hexlify(rxdata))
-            if rxdata:
-                return decode(rxdata)
+            return rxdata[HEADER_LENGTH:-CRC_LENGTH]
 
         except socket.timeout:
-            logger.debug("RX= TIMEOUT")
-            self.error = FeigError.COMM_TIMEOUT
-            self._retry += 1
-            if self._retry == MAX_RETRY:
-                self.error = FeigError.INTERFACE_ERROR
-                logger.error("RX= MAX_RETRY")
+            self._timeout("RX")
             return
 
         except socket.error:
             logger.exception("RX= ERROR")
             self.error = FeigError.INTERFACE_ERROR
+            self._disconnect()
 
     def open(self, ipaddr: str, tcpport: int, timeout=5.0) -> bool:
         """Open interface with given settings.
@@ -142,24 +262,27 @@ class FeigEthernet:
         if self._tcpsock is None:
             self._ipaddr = ipaddr
             self._tcpport = tcpport
+            self._connect_timeout = timeout
 
             # configure tcp port
-            self._tcpsock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self._tcpsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
-            self._tcpsock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-            self._tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 1)
-            self._tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 5)
-            self._tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 2)
-
-            self._tcpsock.settimeout(timeout)
+            self._tcpsock = self._socket()
+            self._backoff = RECONNECT_MIN
+            self._reconnect_time = 0.0
 
             return self._connect()
 
+        return True
+
     def close(self):
         """Close interface"""
         if self._tcpsock:
-            self._tcpsock.shutdown(socket.SHUT_RDWR)
-            self._tcpsock.close()
+            self._disconnect()
             self._retry = 0
-            self._tcpsock = None
+        self._ipaddr = None
+
+    def stats(self) -> dict:
+        """Receive counters, reconnects and stale frames"""
+        stats = self._assembler.stats()
+        stats["reconnects"] = self.reconnects
+        stats["stale"] = self.stale
+        return stats
@@ -0,0 +1,192 @@
+"""
+Feig Record and Replay Interfaces
+"""
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import threading
+import time
+from typing import Union
+
+from ..common.feig_errors import FeigError
+from ..common.feig_protocol import decode
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+def _payload(txdata) -> Union[None, bytes]:
+    """Command payload of txdata, list payload or complete frame"""
+    if isinstance(txdata, list):
+        return bytes(txdata)
+
+    if isinstance(txdata, bytes):
+        return decode(txdata)
+
+    raise ValueError("Invalid txdata")
+
+
+class FeigRecorder:
+    """Interface writing every transfer of another interface to a capture
+    file, one JSON line per command:
+
+    .. code:: python
+        {"tx": "b00100", "rx": "b00001...", "rtt": 0.012}
+
+    tx and rx are hex payloads from the command byte, rx is null if the
+    reader did not answer. Captures are appended, FeigReplayInterface
+    answers from them.
+
+    Args:
+        interface: opened interface e.g. FeigSerial, FeigEthernet
+        path: capture file
+    """
+
+    def __init__(self, interface, path):
+        self.interface = interface
+        self.path = path
+        self._fp = open(path, "a", buffering=1)
+
+    @property
+    def ID(self):
+        return self.interface.ID
+
+    @property
+    def error(self):
+        return self.interface.error
+
+    def transfer(self, timeout: int, txdata: Union[list, bytes]) -> Union[None, bytes]:
+        """Transfer through the interface and record command and response"""
+        start = time.monotonic()
+        rxdata = self.interface.transfer(timeout, txdata)
+        rtt = time.monotonic() - start
+
+        cmd = _payload(txdata)
+        if cmd is not None and self._fp is not None:
+            entry = {
+                "tx": cmd.hex(),
+                "rx": bytes(rxdata).hex() if rxdata is not None else None,
+                "rtt": round(rtt, 6),
+            }
+            self._fp.write(json.dumps(entry) + "\n")
+
+        return rxdata
+
+    def open(self, *args, **kwargs) -> bool:
+        return self.interface.open(*args, **kwargs)
+
+    def close(self):
+        """Close interface and capture file"""
+        self.interface.close()
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+    def stats(self) -> dict:
+        return self.interface.stats()
+
+
+class FeigReplayInterface:
+    """Interface answering commands from captures of FeigRecorder instead of
+    a reader. Pass it to connect() of a reader in place of INTERFACE_SERIAL /
+    INTERFACE_ETHERNET.
+
+    A command is answered with the responses recorded for the same command
+    payload, in recorded order. After the last one they start again if loop
+    is set, else the command times out. Unknown commands time out.
+
+    Args:
+        captures: capture file or list of (tx, rx) hex strings / bytes
+        loop: repeat the responses of a command
+        realtime: every transfer takes its recorded round trip time
+    """
+
+    ID = "Serial"
+
+    def __init__(self, captures, loop=True, realtime=False):
+        self.error = FeigError.OK
+        self.loop = loop
+        self.realtime = realtime
+        self._lock = threading.Lock()
+
+        self._responses = {}  # tx: [(rx, rtt), ...]
+        self._next = {}  # tx: index of next response
+        if isinstance(captures, str):
+            captures = self.load(captures)
+        for entry in captures:
+            tx, rx = entry[0], entry[1]
+            rtt = entry[2] if len(entry) > 2 else 0.0
+            tx = bytes.fromhex(tx) if isinstance(tx, str) else bytes(tx)
+            if isinstance(rx, str):
+                rx = bytes.fromhex(rx)
+            elif rx is not None:
+                rx = bytes(rx)
+            self._responses.setdefault(tx, []).append((rx, rtt))
+
+        self.commands = 0
+        self.unknown = 0
+
+    @staticmethod
+    def load(path) -> list:
+        """Returns (tx, rx, rtt) of every command in capture file"""
+        captures = []
+        with open(path, "r") as fp:
+            for line in fp:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                captures.append((entry["tx"], entry["rx"], entry.get("rtt", 0.0)))
+        return captures
+
+    def transfer(self, timeout: int, txdata: Union[list, bytes]) -> Union[None, bytes]:
+        """Answer a command from the captures.
+
+        Returns:
+            None, if not recorded or reader did not answer else bytes()
+
+        Raises:
+            ValueError for incorrect txdata
+        """
+        cmd = _payload(txdata)
+
+        with self._lock:
+            self.commands += 1
+            responses = self._responses.get(cmd)
+            if responses is None:
+                self.unknown += 1
+                logger.debug("TX= not recorded %s", cmd.hex() if cmd else txdata)
+                self.error = FeigError.COMM_TIMEOUT
+                return
+
+            idx = self._next.get(cmd, 0)
+            if idx == len(responses):
+                if not self.loop:
+                    self.error = FeigError.COMM_TIMEOUT
+                    return
+                idx = 0
+            self._next[cmd] = idx + 1
+            rxdata, rtt = responses[idx]
+
+        if self.realtime:
+            time.sleep(rtt)
+
+        self.error = FeigError.OK if rxdata is not None else FeigError.COMM_TIMEOUT
+        return rxdata
+
+    def rewind(self):
+        """Start all commands with their first recorded response again"""
+        with self._lock:
+            self._next = {}
+
+    def open(self, *args, **kwargs) -> bool:
+        return True
+
+    def close(self):
+        """Position in the captures is kept for next connect"""
+
+    def stats(self) -> dict:
+        return {"commands": self.commands, "unknown": self.unknown}
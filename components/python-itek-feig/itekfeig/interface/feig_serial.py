@@ -8,17 +8,63 @@ Feig Serial Interface
 import logging
 import serial
 import threading
+import time
 from typing import Union
 
-from copy import deepcopy
 from binascii import hexlify
 
 from ..common.feig_errors import FeigError
-from ..common.feig_protocol import STX, encode, decode
+from ..common.feig_protocol import (
+    encode,
+    FrameAssembler,
+    HEADER_LENGTH,
+    CRC_LENGTH,
+)
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+# blocking read wakes up at least every RX_POLL_TIME seconds to check close
+RX_POLL_TIME = 0.1
+
+
+class CommandStats:
+    """Round trip time and timeouts per command code"""
+
+    def __init__(self):
+        self._commands = {}
+
+    def _entry(self, command):
+        entry = self._commands.get(command)
+        if entry is None:
+            entry = self._commands[command] = [0, 0.0, 0.0, 0]
+        return entry
+
+    def response(self, command, rtt):
+        entry = self._entry(command)
+        entry[0] += 1
+        entry[1] += rtt
+        if rtt > entry[2]:
+            entry[2] = rtt
+
+    def timeout(self, command):
+        self._entry(command)[3] += 1
+
+    def clear(self):
+        self._commands.clear()
+
+    def summary(self) -> dict:
+        """Returns {command: {count, avg_ms, max_ms, timeouts}}"""
+        return {
+            command: {
+                "count": count,
+                "avg_ms": round(total / count * 1000, 3) if count else None,
+                "max_ms": round(rtt_max * 1000, 3),
+                "timeouts": timeouts,
+            }
+            for command, (count, total, rtt_max, timeouts) in self._commands.items()
+        }
+
 
 class FeigSerial:
 
@@ -31,81 +77,68 @@ class FeigSerial:
 
         self._close = False
 
-        self._rxdone_event = threading.Event()
-        self._rxdone_event.clear()
-
-        self._rxstart_event = threading.Event()
-        self._rxstart_event.clear()
+        # frame is delivered only while a response is expected,
+        # late or unexpected frames are dropped
+        self._rxcond = threading.Condition(threading.Lock())
+        self._rxwaiting = False
+        self._rxdata = None
+        self._rxdropped = 0
 
-        self._rxtimeout_event = threading.Event()
-        self._rxtimeout_event.clear()
+        # command in flight, send time of it
+        self._command = None
+        self._txtime = 0.0
+        self._rxtime = 0.0
+        self._command_stats = CommandStats()
 
-        self._rxdata = None
+        self._assembler = FrameAssembler()
 
         self._rxthread = None
 
+    def _deliver(self, frame):
+        with self._rxcond:
+            if self._rxwaiting:
+                self._rxdata = frame
+                self._rxtime = time.perf_counter()
+                self._rxwaiting = False
+                self._rxcond.notify()
+                return
+
+            self._rxdropped += 1
+        logger.debug("RX= unexpected frame dropped %s", hexlify(frame))
+
     def _receive_thread(self):
 
         logger.info("receive thread started")
 
-        packet_len = 0
-        packet = b""
-
-        state = 0
-
-        start = False
-
-        while True:
-
-            if start is False:
-                # wait forever till start event is generated
-                self._rxstart_event.wait()
-                self._rxstart_event.clear()
-                if self._close is True:
-                    break  # exit thread
-                start = True
-                state = 0
-                packet = b""
-
-            # Read Data
-            byte = self._serial.read(size=1)
-            if byte != b"":
-                if state == 0:
-                    if byte == STX:
-                        packet = packet + byte
-                        state = 1
-
-                elif state == 1:
-                    packet = packet + byte
-                    packet_len = int(byte.hex(), base=16)
-                    state = 2
-
-                elif state == 2:
-                    packet = packet + byte
-
-                    packet_len = packet_len * 256 + int(byte.hex(), base=16)
-                    packet_len = packet_len - 3  # we already received 3bytes
-
-                    # read remainig bytes or timeout
-                    # WARNING: Do not reduce the offset = 100,
-                    #          this will cause TIMEOUT
-                    self._serial.timeout = self._inter_byte_time * (packet_len + 100)
-                    data = self._serial.read(size=packet_len)
-                    self._serial.timeout = 0
-
-                    if data and len(data) == packet_len:
-                        packet = packet + data
-                        self._rxdata = deepcopy(packet)
-                    else:
-                        self._rxdata = None
-                    self._rxdone_event.set()
-                    start = False
-
-            # Timeout
-            if self._rxtimeout_event.isSet():
-                self._rxdata = None
-                self._rxdone_event.set()
-                start = False
+        assembler = self._assembler
+        last_rx = time.monotonic()
+
+        while self._close is False:
+            # block till at least one byte or poll time, then take all waiting bytes
+            try:
+                data = self._serial.read(self._serial.in_waiting or 1)
+            except serial.serialutil.SerialException:
+                if self._close is False:
+                    logger.exception("Serial exception")
+                    time.sleep(RX_POLL_TIME)
+                continue
+
+            now = time.monotonic()
+            if data:
+                last_rx = now
+                frames = assembler.feed(data)
+
+            elif len(assembler) and now - last_rx > self._frame_timeout:
+                # rest of the frame did not arrive, search next frame
+                logger.debug("RX= incomplete frame, resync")
+                frames = assembler.resync()
+                last_rx = now
+
+            else:
+                continue
+
+            for frame in frames:
+                self._deliver(frame)
 
         logger.info("receive thread closed")
 
@@ -126,7 +159,7 @@ class FeigSerial:
                     bytesize=serial.EIGHTBITS,
                     parity=parity,
                     stopbits=serial.STOPBITS_ONE,
-                    timeout=0,  # Read timeout
+                    timeout=RX_POLL_TIME,  # Read timeout
                 )
                 self.error = FeigError.OK
             except ValueError:
@@ -142,8 +175,13 @@ class FeigSerial:
             bit_time = 1 / baudrate
             byte_time = 10 * bit_time  # 1-Start + 8-Data + 1-Stop BITS
             self._inter_byte_time = round(byte_time, 6)
+            # gap after which incomplete frame is given up
+            # WARNING: Do not reduce the offset = 100, this will cause TIMEOUT
+            self._frame_timeout = max(self._inter_byte_time * 100, RX_POLL_TIME)
 
             self._serial.reset_input_buffer()
+            self._assembler.clear()
+            self._close = False
 
             # start recevie thread
             self._rxthread = threading.Thread(
@@ -157,64 +195,90 @@ class FeigSerial:
         """Close interface"""
         if self._serial:
             self._close = True
-            self._rxstart_event.set()
             self._rxthread.join()
             self._serial.close()
             self._serial = None
 
-    def _timer_callback(self):
-        self._rxtimeout_event.set()
+    def _expect_response(self, command=None):
+        with self._rxcond:
+            self._rxdata = None
+            self._rxwaiting = True
+            self._command = command
+            self._txtime = time.perf_counter()
 
     def read(self, timeout):
-        # self._serial.reset_input_buffer()
-
-        # clear events
-        self._rxdone_event.clear()
-        self._rxtimeout_event.clear()
-
-        self._rxstart_event.set()
-
-        # start timer
-        rxtimer = None
-        if timeout is not None:
-            rxtimer = threading.Timer(timeout, self._timer_callback)
-            rxtimer.start()
-
-        self._rxdone_event.wait()  # wait till timeout or data
-
-        # self._rxdone_event.clear()
-        # self._startEvent.clear()
+        """Wait for response of the last command written.
 
-        if self._rxdata:  # data is received
-            logger.debug("RX= %s", hexlify(self._rxdata))
-
-            if rxtimer:
-                rxtimer.cancel()
-                self._rxtimeout_event.clear()
+        Args:
+            timeout: seconds, None waits forever
 
-            # validate, decode raw frame received
-            return decode(self._rxdata)
+        Returns:
+            None, if timeout else bytes() without header and CRC
+        """
+        with self._rxcond:
+            # response of transfer() is expected since write()
+            if self._rxwaiting is False and self._rxdata is None:
+                self._rxwaiting = True
+                self._command = None
+                self._txtime = time.perf_counter()
+
+            if timeout is None:
+                while self._rxwaiting:
+                    self._rxcond.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while self._rxwaiting:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._rxcond.wait(remaining)
+
+            rxdata = self._rxdata
+            self._rxdata = None
+            self._rxwaiting = False
+            command = self._command
+
+        if rxdata:  # data is received
+            logger.debug("RX= %s", hexlify(rxdata))
+            self._command_stats.response(command, self._rxtime - self._txtime)
+
+            # frame CRC is verified by assembler, remove header, footer
+            return rxdata[HEADER_LENGTH:-CRC_LENGTH]
 
         # response timeout
         logger.debug("RX= TIMEOUT")
+        self._command_stats.timeout(command)
 
     def write(self, txdata):
         if isinstance(txdata, list):
             # encode data with feig protocol
+            command = txdata[0] if txdata else None
             txdata = encode(txdata)
 
         elif isinstance(txdata, bytes):
-            pass
+            command = txdata[HEADER_LENGTH] if len(txdata) > HEADER_LENGTH else None
 
         else:
             raise ValueError("Invalid txdata")
 
         logger.debug("TX= %s", hexlify(txdata))
 
+        # RX thread reads all the time, response may arrive before read()
+        self._expect_response(command)
+
         # self._serial.reset_output_buffer()
         self._serial.write(txdata)
         # self._serial.flushOutput() # note: this line works in windows, but breaks in pi3
 
+    def stats(self) -> dict:
+        """Receive counters, frames dropped as no response was expected and
+        round trip time per command code
+        """
+        stats = self._assembler.stats()
+        stats["dropped"] = self._rxdropped
+        stats["commands"] = self._command_stats.summary()
+        return stats
+
     def transfer(self, timeout: int, txdata: Union[list, bytes]) -> Union[None, bytes]:
         """Send and receive through the interface.
 
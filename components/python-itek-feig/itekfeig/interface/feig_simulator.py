@@ -0,0 +1,344 @@
+"""
+Feig Simulated Reader
+"""
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import threading
+import time
+from typing import Union
+
+from ..common.feig_errors import FeigError
+from ..common.feig_protocol import decode
+from ..common.feig_reader_ids import FEIG_READER_IDS
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+CONFIG_PAGES = 64
+CONFIG_PAGE_SIZE = 14
+
+# buffer read records: IDD, antenna, tag statistics and antenna extension
+TR_DATA1 = 0x91
+TR_DATA2 = 0x18
+
+MODE_BRM = 0x80
+
+
+class SimulatedTag:
+    """Tag in the field of a FeigSimulator.
+
+    Args:
+        epc: hex string
+        tid: hex string
+        rssi: dict {antenna no: RSSI}, antennas the tag is seen on
+    """
+
+    __slots__ = ("epc", "tid", "rssi")
+
+    def __init__(self, epc: str, tid: str, rssi: dict = None):
+        self.epc = epc
+        self.tid = tid
+        self.rssi = rssi if rssi is not None else {1: 60}
+
+    def __repr__(self):
+        return "SimulatedTag({!r}, {!r}, {!r})".format(self.epc, self.tid, self.rssi)
+
+
+def tag_population(count: int, rssi: dict = None, epc_len=12, tid_len=12) -> list:
+    """Returns count tags with random SGTIN-96 like EPC and random TID
+
+    Args:
+        rssi: dict {antenna no: RSSI} of every tag, default antenna 1
+    """
+    return [
+        SimulatedTag(
+            "30" + os.urandom(epc_len - 1).hex(),
+            "e2" + os.urandom(tid_len - 1).hex(),
+            dict(rssi) if rssi is not None else None,
+        )
+        for _ in range(count)
+    ]
+
+
+class FeigSimulator:
+    """Interface with a scripted reader model instead of a reader, for tests
+    and load tests without hardware. Pass it to connect() of a reader in
+    place of INTERFACE_SERIAL / INTERFACE_ETHERNET.
+
+    The model answers reader info, configuration pages, RF and output
+    commands, host mode inventory and the buffer commands. In buffer read
+    mode (page 1, byte 13 = 0x80) the tags are read at `rate` reads per
+    second one after the other; reads beyond `buffer_size` are dropped and
+    reported as DATA_BUFFER_OVERFLOW by the next read buffer.
+
+    Args:
+        reader: reader name in FEIG_READER_IDS
+        tags: list of SimulatedTag, see tag_population()
+        rate: reads per second put in buffer
+        buffer_size: records the buffer holds
+        device_id: hex string of 4 bytes
+        firmware: hex string of 2 bytes
+        baudrate: if given, every transfer takes the time of its bytes
+        clock: time source in seconds
+    """
+
+    ID = "Serial"
+
+    def __init__(
+        self,
+        reader="LRU1002",
+        tags=None,
+        rate=0.0,
+        buffer_size=8000,
+        device_id="00000001",
+        firmware="0102",
+        baudrate=None,
+        clock=time.monotonic,
+    ):
+        self.error = FeigError.OK
+        self.reader_type = FEIG_READER_IDS[reader] & 0xFF
+        self.tags = tags if tags is not None else []
+        self.rate = rate
+        self.buffer_size = buffer_size
+        self.device_id = bytes.fromhex(device_id)
+        self.firmware = bytes.fromhex(firmware)
+        self.byte_time = 10 / baudrate if baudrate else 0.0
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self.pages = [[0] * CONFIG_PAGE_SIZE for _ in range(CONFIG_PAGES)]
+        self.pages[3][2] = 0x19  # antenna 1 power 1W
+        self.pages[20][10:13] = [0x19, 0x19, 0x19]  # antenna 2..4 power 1W
+
+        self._records = None
+        self._buffer = []  # index of tag per buffered read
+        self._pending_clear = 0  # records returned by last read buffer
+        self._brm_start = None
+        self._reads = 0  # reads since buffer read mode started
+        self._overflow = False
+        self._inventory = []  # data sets left for MORE DATA
+
+        self.commands = 0
+        self.dropped = 0
+
+    def _page(self, addr) -> list:
+        return self.pages[addr & 0x3F]
+
+    def _set_mode(self):
+        brm = self.pages[1][13] == MODE_BRM
+        if brm and self._brm_start is None:
+            self._brm_start = self._clock()
+            self._reads = 0
+        elif not brm:
+            self._brm_start = None
+
+    def _fill(self):
+        """Put the reads since last command in buffer"""
+        if self._brm_start is None or not self.tags or self.rate <= 0:
+            return
+
+        reads = int((self._clock() - self._brm_start) * self.rate)
+        count = reads - self._reads
+        if count <= 0:
+            return
+
+        space = self.buffer_size - len(self._buffer)
+        stored = min(count, space)
+        tag_cnt = len(self.tags)
+        self._buffer.extend((self._reads + idx) % tag_cnt for idx in range(stored))
+        if count > stored:
+            self.dropped += count - stored
+            self._overflow = True
+        self._reads = reads
+
+    def _record(self, idx) -> bytes:
+        if self._records is None:
+            self._records = [self._brm_record(tag) for tag in self.tags]
+        return self._records[idx]
+
+    @staticmethod
+    def _brm_record(tag) -> bytes:
+        epc = bytes.fromhex(tag.epc)
+        idd = bytes([(len(epc) // 2) << 3, 0x00]) + epc + bytes.fromhex(tag.tid)
+        antennas = sorted(tag.rssi.items(), key=lambda item: item[1], reverse=True)
+        rssi = antennas[0][1] if antennas else 0
+
+        record = bytearray([0x84, 0x02, len(idd)]) + idd
+        # ANT, TAG_CNT(2), RSSI max, RSSI avg, RFU(3)
+        record += bytes([antennas[0][0] if antennas else 0, 0x00, 0x01, rssi, rssi, 0, 0, 0])
+        record.append(len(antennas))
+        for antno, rssi in antennas:
+            record += bytes([antno, rssi, 0x04, 0x00, 0x00, 0x00])  # ANT, RSSI, PHASE, RFU
+
+        length = len(record) + 2
+        return bytes([length >> 8, length & 0xFF]) + bytes(record)
+
+    def _reader_info(self, mode) -> bytes:
+        if mode == 0x00:
+            # SW revision, HW type, reader type, TR types, RX / TX buffer size
+            return bytes([0x03, 0x0A, 0x00, 0x00, self.reader_type, 0x00, 0x04, 0x10, 0x00, 0x10, 0x00])
+        if mode == 0x80:
+            return self.device_id + bytes(4) + self.firmware + bytes(4)
+        return bytes(30)
+
+    def _inventory_response(self, cmd) -> bytes:
+        mode = cmd[2] if len(cmd) > 2 else 0
+        ant_sel = cmd[3] if mode & 0x10 and len(cmd) > 3 else 0
+
+        if not mode & 0x80:
+            self._inventory = []
+            for tag in self.tags:
+                if ant_sel:
+                    antennas = [(antno, rssi) for antno, rssi in tag.rssi.items() if ant_sel & (1 << (antno - 1))]
+                    if not antennas:
+                        continue
+                else:
+                    antennas = None
+                self._inventory.append((tag, antennas))
+
+        if not self._inventory:
+            return bytes([0xB0, 0x01])  # NO_TAG
+
+        data_sets = self._inventory[:255]
+        self._inventory = self._inventory[255:]
+        status = 0x94 if self._inventory else 0x00
+
+        response = bytearray([0xB0, status, len(data_sets)])
+        for tag, antennas in data_sets:
+            epc = bytes.fromhex(tag.epc)
+            idd = bytes([(len(epc) // 2) << 3, 0x00]) + epc + bytes.fromhex(tag.tid)
+            if antennas is not None:
+                response.append(0x01)  # FLAGS
+            response += bytes([0x84, 0x02, len(idd)]) + idd
+            if antennas is not None:
+                response.append(len(antennas))
+                for antno, rssi in antennas:
+                    # ANT_NR, ANT_STAT, RSSI, PHASE(2), RFU(2)
+                    response += bytes([antno, 0x00, rssi, 0x04, 0x00, 0x00, 0x00])
+        return bytes(response)
+
+    def _read_buffer(self, cmd) -> bytes:
+        data_sets = cmd[1] * 256 + cmd[2] if len(cmd) > 2 else 255
+        count = min(data_sets, len(self._buffer))
+        self._pending_clear = count
+        if count == 0:
+            return bytes([0x22, 0x92])  # NO_VALID_DATA
+
+        if self._overflow:
+            status = 0x93
+            self._overflow = False
+        else:
+            status = 0x94 if len(self._buffer) > count else 0x00
+
+        payload = bytearray([0x22, status, TR_DATA1, TR_DATA2, count >> 8, count & 0xFF])
+        for idx in self._buffer[:count]:
+            payload += self._record(idx)
+        return bytes(payload)
+
+    def _response(self, cmd) -> bytes:
+        command = cmd[0]
+        self._fill()
+
+        if command == 0x66:
+            return bytes([0x66, 0x00]) + self._reader_info(cmd[1])
+
+        if command == 0x65:
+            info = self._reader_info(0x00)
+            return bytes([0x65, 0x00]) + info[0:4] + bytes([self.firmware[0]]) + info[5:11]
+
+        if command == 0x80:
+            return bytes([0x80, 0x00] + self._page(cmd[1]))
+
+        if command == 0x81:
+            self.pages[cmd[1] & 0x3F] = list(cmd[2:2 + CONFIG_PAGE_SIZE])
+            self._set_mode()
+            return bytes([0x81, 0x00])
+
+        if command == 0xB0 and len(cmd) > 1 and cmd[1] == 0x01:
+            return self._inventory_response(cmd)
+
+        if command == 0x22:
+            return self._read_buffer(cmd)
+
+        if command == 0x32:
+            del self._buffer[:self._pending_clear]
+            self._pending_clear = 0
+            return bytes([0x32, 0x00])
+
+        if command == 0x33:
+            self._buffer = []
+            self._pending_clear = 0
+            self._overflow = False
+            return bytes([0x33, 0x00])
+
+        if command == 0x31:
+            length = len(self._buffer)
+            size = self.buffer_size
+            return bytes([0x31, 0x00, size >> 8, size & 0xFF, 0x00, 0x00, length >> 8, length & 0xFF])
+
+        if command == 0x74:
+            return bytes([0x74, 0x00, 0x00])
+
+        if command in (0x63, 0x64, 0x69, 0x6A, 0x72, 0x83, 0xA0):
+            return bytes([command, 0x00])
+
+        return bytes([command, 0x80])  # UNKNOWN_COMMAND
+
+    def transfer(self, timeout: int, txdata: Union[list, bytes]) -> Union[None, bytes]:
+        """Answer a command like the reader.
+
+        Args:
+            timeout: int, not used
+            txdata: data to be send, payload list or complete frame
+
+        Returns:
+            None, if frame is invalid else bytes() response payload
+
+        Raises:
+            ValueError for incorrect txdata
+        """
+        if isinstance(txdata, list):
+            txlen = len(txdata) + 6
+            cmd = bytes(txdata)
+
+        elif isinstance(txdata, bytes):
+            txlen = len(txdata)
+            cmd = decode(txdata)
+            if cmd is None:
+                self.error = FeigError.COMM_TIMEOUT
+                return
+
+        else:
+            raise ValueError("Invalid txdata")
+
+        with self._lock:
+            self.commands += 1
+            rxdata = self._response(cmd)
+
+        if self.byte_time:
+            time.sleep((txlen + len(rxdata) + 6) * self.byte_time)
+
+        self.error = FeigError.OK
+        return rxdata
+
+    def open(self, *args, **kwargs) -> bool:
+        """Reader stays powered, nothing to open"""
+        return True
+
+    def close(self):
+        """Reader stays powered, buffer and pages are kept"""
+
+    def stats(self) -> dict:
+        """Commands answered, reads put in buffer and dropped on overflow"""
+        with self._lock:
+            self._fill()
+            return {
+                "commands": self.commands,
+                "reads": self._reads,
+                "buffered": len(self._buffer),
+                "dropped": self.dropped,
+            }
@@ -133,14 +133,14 @@ class HyWear(FeigBase):
             else:
                 raise ValueError("NotSupported:Parity")
 
-            FeigBase._interface = FeigSerial()
-            opened = FeigBase._interface.open(
+            self._interface = FeigSerial()
+            opened = self._interface.open(
                 settings["PORT"], settings["BAUDRATE"], parity
             )
             if opened is False:
-                FeigBase._last_error = FeigError.SERIAL
+                self._last_error = FeigError.SERIAL
                 err_msg = "Failed to connect to {} {}".format(
-                    settings["PORT"], FeigBase._interface.error
+                    settings["PORT"], self._interface.error
                 )
                 logger.error(err_msg)
                 return False
@@ -148,17 +148,17 @@ class HyWear(FeigBase):
         elif interface == self.INTERFACE_ETHERNET:
             from ..interface.feig_ethernet import FeigEthernet
 
-            FeigBase._interface = FeigEthernet()
-            opened = FeigBase._interface.open(settings["IP"], settings["PORT"])
+            self._interface = FeigEthernet()
+            opened = self._interface.open(settings["IP"], settings["PORT"])
             if opened is False:
-                FeigBase._last_error = FeigError.ETHERNET
+                self._last_error = FeigError.ETHERNET
                 return False
 
         else:
             raise ValueError("NotSupported:Interface")
 
-        if FeigBase._interface._error is not None:
-            FeigBase._last_error = FeigBase._interface._error
+        if self._interface._error is not None:
+            self._last_error = self._interface._error
             return False
 
         # Forced: Antenna OFF, if tags are present in the feild
@@ -174,9 +174,9 @@ class HyWear(FeigBase):
             return False
 
         if ret != self.READER_TYPE:
-            FeigBase._last_error = FeigError.INVALID_READER
-            FeigBase._interface.close()
-            FeigBase._interface = None
+            self._last_error = FeigError.INVALID_READER
+            self._interface.close()
+            self._interface = None
             err_msg = "Expected ID={}, received ID={}".format(self.READER_TYPE, ret)
             logger.error(err_msg)
             return False
@@ -195,17 +195,17 @@ class HyWear(FeigBase):
 
         # Configure operating modes
         from ..common.feig_host import FeigHost
-        self.HostMode = FeigHost(FeigBase._interface, FeigBase._last_error) # pylint: disable=C0103
+        self.HostMode = FeigHost(self._interface, self._last_error, state=self._state) # pylint: disable=C0103
 
         from ..common.feig_notification import FeigNotification
-        self.NotificationMode = FeigNotification(FeigBase._interface, FeigBase._last_error) # pylint: disable=C0103
+        self.NotificationMode = FeigNotification(self._interface, self._last_error, state=self._state) # pylint: disable=C0103
 
         return True
 
     def disconnect(self):
         """Disconnect from current reader"""
-        if FeigBase._interface:
-            FeigBase._interface.close()
+        if self._interface:
+            self._interface.close()
 
     def rf_onoff(self, onoff: bool, maintainhost=False):
         """Turn ON/OFF individual antenna"""
@@ -219,15 +219,15 @@ class HyWear(FeigBase):
             rf_output += 0x80
 
         cmd = [0x6A, rf_output]
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x6A:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
         return False
@@ -318,18 +318,18 @@ class HyWear(FeigBase):
             raise TypeError("Invalid output record type")
 
         if skipRx is True:
-            FeigBase._interface.write(cmd)
+            self._interface.write(cmd)
             return True
 
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x72:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
     def adjust_scanmode(self, idd: bool, button: bool, scanner_id: bool) -> bool:
@@ -358,15 +358,15 @@ class HyWear(FeigBase):
         else:
             cmd.append(tr_data1)
 
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return False
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x2A:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
         return False
@@ -575,15 +575,15 @@ class HyWear(FeigBase):
 
             for mode in READER_INFO_MODE_LIST:
                 cmd = [0x66, mode]
-                data = FeigBase._interface.transfer(1.0, cmd)
+                data = self._interface.transfer(1.0, cmd)
                 if data is None:
-                    FeigBase._last_error = FeigError.COMM_TIMEOUT
+                    self._last_error = FeigError.COMM_TIMEOUT
                     return
 
-                FeigBase._last_error = FeigError.INVALID_RESPONSE
+                self._last_error = FeigError.INVALID_RESPONSE
                 if data[0] == 0x66:
-                    FeigBase._last_error = self._feig_status_parser(data[1])
-                    if FeigBase._last_error is FeigError.OK:
+                    self._last_error = self._feig_status_parser(data[1])
+                    if self._last_error is FeigError.OK:
                         self._reader_info_parser(mode, data[2:])
 
         return deepcopy(self._reader_info)
@@ -630,15 +630,15 @@ class HyWear(FeigBase):
     def diagnostic(self) -> dict:
         """Perform reader diagnostic"""
         cmd = [0x02, 0x00, 0x08, 0xFF, 0x6E, 0xFF, 0x30, 0xD3]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x6E:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return self._diagnostic_parser(data[2:])
 
     def device_id(self) -> str:
@@ -107,12 +107,15 @@ class MRU102(FeigBase):
 
     def connect(self, interface, settings):
         """Connect to the reader using one of its interface with given settings.
-        Onece the connection is established, a complete aconfiguration is read
-        from the reader.
+        Onece the connection is established, the reader is identified by its
+        device ID and firmware version, configuration pages are read on first
+        use or taken from config_cache (ConfigCache) if set.
 
         Args:
-            interface: one of the supported interface
-            settings: of selected interface
+            interface: one of the supported interface or an interface object
+                e.g. FeigSimulator, FeigReplayInterface
+            settings: of selected interface, commands are recorded to the
+                file "RECORD" if given (FeigRecorder)
 
         Returns:
             bool: True if connection is sccessfull
@@ -132,14 +135,14 @@ class MRU102(FeigBase):
             else:
                 raise ValueError("NotSupported:Parity")
 
-            FeigBase._interface = FeigSerial()
-            opened = FeigBase._interface.open(
+            self._interface = FeigSerial()
+            opened = self._interface.open(
                 settings["PORT"], settings["BAUDRATE"], parity
             )
             if opened is False:
-                FeigBase._last_error = FeigError.SERIAL
+                self._last_error = FeigError.SERIAL
                 err_msg = "Failed to connect to {} {}".format(
-                    settings["PORT"], FeigBase._interface.error
+                    settings["PORT"], self._interface.error
                 )
                 logger.error(err_msg)
                 return False
@@ -147,18 +150,31 @@ class MRU102(FeigBase):
         elif interface == self.INTERFACE_ETHERNET:
             from ..interface.feig_ethernet import FeigEthernet
 
-            FeigBase._interface = FeigEthernet()
-            opened = FeigBase._interface.open(settings["IP"], settings["PORT"])
+            self._interface = FeigEthernet()
+            opened = self._interface.open(settings["IP"], settings["PORT"])
             if opened is False:
-                FeigBase._last_error = FeigError.ETHERNET
+                self._last_error = FeigError.ETHERNET
                 return False
+        elif hasattr(interface, "transfer"):
+            # interface object e.g. FeigSimulator, FeigReplayInterface
+            self._interface = interface
+            if interface.ID == "Ethernet":
+                interface = self.INTERFACE_ETHERNET
+            else:
+                interface = self.INTERFACE_SERIAL
+
         else:
             raise ValueError("NotSupported:Interface")
 
-        if FeigBase._interface.error != FeigError.OK:
-            FeigBase._last_error = FeigBase._interface.error
+        if self._interface.error != FeigError.OK:
+            self._last_error = self._interface.error
             return False
 
+        if settings and settings.get("RECORD"):
+            from ..interface.feig_replay import FeigRecorder
+
+            self._interface = FeigRecorder(self._interface, settings["RECORD"])
+
         # Forced: Antenna OFF, if tags are present in the feild
         # connection to reader takes time or fail
         self.rf_onoff(self.ANTENNA_OFF)
@@ -172,49 +188,57 @@ class MRU102(FeigBase):
             return False
 
         if ret != self.READER_TYPE:
-            FeigBase._last_error = FeigError.INVALID_READER
-            FeigBase._interface.close()
-            FeigBase._interface = None
+            self._last_error = FeigError.INVALID_READER
+            self._interface.close()
+            self._interface = None
             err_msg = "Expected ID={}, received ID={}".format(self.READER_TYPE, ret)
             logger.error(err_msg)
             return False
 
-        # Get ALL INFO from the reader
-        self.get_reader_info()
-
-        # Get ALL CONFIGURATION from reader memory
-        ret = self.read_all_config()
+        # Reader info and configuration pages are cached by device ID and
+        # firmware version, configuration pages are read on first use
+        ret = self._check_config_cache()
         if ret is None:
             return False
 
-        time.sleep(0.1)
+        if ret is False:
+            self._reader_info = {}
+
+        # Get ALL INFO from the reader
+        self.get_reader_info()
 
         # Configure operating modes
         from ..common.feig_host import FeigHost
 
-        self.HostMode = FeigHost(FeigBase._interface, FeigBase._last_error)
+        self.HostMode = FeigHost(self._interface, self._last_error, state=self._state)
 
         from ..common.feig_buffer_read import FeigBufferRead
 
-        self.BufferReadMode = FeigBufferRead(FeigBase._interface, FeigBase._last_error)
+        self.BufferReadMode = FeigBufferRead(self._interface, self._last_error, state=self._state)
 
         if interface == self.INTERFACE_SERIAL:
             from ..common.feig_scan import FeigScan
 
-            self.ScanMode = FeigScan(FeigBase._interface, FeigBase._last_error)
+            self.ScanMode = FeigScan(self._interface, self._last_error, state=self._state)
         elif interface == self.INTERFACE_ETHERNET:
             from ..common.feig_notification import FeigNotification
 
             self.NotificationMode = FeigNotification(
-                FeigBase._interface, FeigBase._last_error
+                self._interface, self._last_error, state=self._state
             )
 
+        # reader info and pages read while connecting, in one write
+        self.save_config_cache()
+
         return True
 
     def disconnect(self):
-        """Disconnect from current reader"""
-        if FeigBase._interface:
-            FeigBase._interface.close()
+        """Disconnect from current reader, pages read since connect are
+        written to config_cache
+        """
+        self.save_config_cache()
+        if self._interface:
+            self._interface.close()
 
     ####################################################################################
     ####    READER CONTROL API
@@ -228,15 +252,15 @@ class MRU102(FeigBase):
         rf_output += antno
 
         cmd = [0x6A, rf_output]
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x6A:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
         return False
@@ -295,29 +319,29 @@ class MRU102(FeigBase):
             (out_time >> 8) & 0xFF,
             (out_time >> 0) & 0xFF,
         ]
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x72:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
     def get_input(self):
         """Get reader INPUT pin status"""
         cmd = [0x02, 0x00, 0x07, 0xFF, 0x74, 0x66, 0x60]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x74:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 in1 = data[2] & 0x01
                 in2 = (data[2] >> 1) & 0x01
                 return in1, in2
@@ -337,7 +361,7 @@ class MRU102(FeigBase):
             return False
 
         if cfgData[13] == mode:  # Current Mode is same
-            FeigBase._last_error = FeigError.MODE_SAME
+            self._last_error = FeigError.MODE_SAME
             return False
 
         # update mode
@@ -347,7 +371,7 @@ class MRU102(FeigBase):
         if ret is None:
             return False
 
-        FeigBase._current_mode = mode
+        self._current_mode = mode
 
         return True
 
@@ -383,15 +407,15 @@ class MRU102(FeigBase):
     def diagnostic(self):
         """Perform reader diagnostic"""
         cmd = [0x02, 0x00, 0x08, 0xFF, 0x6E, 0xFF, 0x30, 0xD3]
-        data = FeigBase._interface.transfer(1.0, bytes(cmd))
+        data = self._interface.transfer(1.0, bytes(cmd))
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x6E:
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return self._diagnostic_parser(data[2:])
 
     ####################################################################################
@@ -549,17 +573,12 @@ class MRU102(FeigBase):
         if len(self._reader_info) == 0:
 
             for mode in READER_INFO_MODE_LIST:
-                cmd = [0x66, mode]
-                data = FeigBase._interface.transfer(1.0, cmd)
-                if data is None:
-                    FeigBase._last_error = FeigError.COMM_TIMEOUT
-                    return
+                data = self._read_reader_info(mode)
+                if data is not None:
+                    self._reader_info_parser(mode, data)
 
-                FeigBase._last_error = FeigError.INVALID_RESPONSE
-                if data[0] == 0x66:
-                    FeigBase._last_error = self._feig_status_parser(data[1])
-                    if FeigBase._last_error is FeigError.OK:
-                        self._reader_info_parser(mode, data[2:])
+                elif self._last_error is FeigError.COMM_TIMEOUT:
+                    return
 
         return deepcopy(self._reader_info)
 
@@ -681,20 +700,20 @@ class MRU102(FeigBase):
 
             cmd = [0x85, hour, minutes, (milli >> 8) & 0xFF, (milli >> 0) & 0xFF]
 
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x85:  # Set
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
         elif data[0] == 0x86:  # Get
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return data[2], data[3], (data[4] * 256 + data[5])
 
     def system_date_time(self, date_value=None, timer_value=None):
@@ -741,20 +760,20 @@ class MRU102(FeigBase):
                 (milli >> 0) & 0xFF,
             ]
 
-        data = FeigBase._interface.transfer(1.0, cmd)
+        data = self._interface.transfer(1.0, cmd)
         if data is None:
-            FeigBase._last_error = FeigError.COMM_TIMEOUT
+            self._last_error = FeigError.COMM_TIMEOUT
             return
 
-        FeigBase._last_error = FeigError.INVALID_RESPONSE
+        self._last_error = FeigError.INVALID_RESPONSE
         if data[0] == 0x87:  # Set
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return True
 
         elif data[0] == 0x88:  # Get
-            FeigBase._last_error = self._feig_status_parser(data[1])
-            if FeigBase._last_error is FeigError.OK:
+            self._last_error = self._feig_status_parser(data[1])
+            if self._last_error is FeigError.OK:
                 return (
                     (data[2], data[3], data[4], data[5], data[6]),
                     (data[7], data[8], (data[9] * 256 + data[10])),
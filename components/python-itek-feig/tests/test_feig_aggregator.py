@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+
+from itekfeig.common.feig_aggregator import TagAggregator
+from itekfeig.common.feig_buffer_read import FeigBufferRead
+
+
+def _update_antennas_reference(current_antennalist, new_antennalist):
+    for i in range(0, len(current_antennalist)):
+        for j in range(0, len(new_antennalist)):
+            if current_antennalist[i]["antno"] == new_antennalist[j]["antno"]:
+                current_antennalist[i]["phase_angle"] = new_antennalist[j]["phase_angle"]
+                current_antennalist[i]["rssi"] = new_antennalist[j]["rssi"]
+                new_antennalist.pop(j)
+                break
+
+    for ant in new_antennalist:
+        current_antennalist.append(ant)
+
+    return current_antennalist
+
+
+def _unique_tags_reference(taglist):
+    # former FeigBufferRead._unique_tags
+    unique_tags = {}
+    for tag in taglist:
+        tid = tag["tid"]
+        try:
+            unique_tags[tid]["seen_count"] += 1
+            unique_tags[tid]["last_seen"] = tag["time"]
+            unique_tags[tid]["antennas"] = _update_antennas_reference(
+                unique_tags[tid]["antennas"], tag["antennas"]
+            )
+        except KeyError:
+            timestamp = tag.pop("time")
+            unique_tags[tid] = tag
+            unique_tags[tid]["first_seen"] = timestamp
+            unique_tags[tid]["last_seen"] = timestamp
+            unique_tags[tid]["seen_count"] = 1
+    return unique_tags
+
+
+def _records(count, tids=50):
+    records = []
+    for idx in range(count):
+        tid = "e280{:020x}".format(random.randrange(tids))
+        antennas = [
+            {"antno": antno, "rssi": random.randint(30, 90), "phase_angle": random.randint(0, 359)}
+            for antno in random.sample(range(1, 5), random.randint(1, 4))
+        ]
+        records.append({
+            "epc": "3000" + tid[4:], "tid": tid, "antno": antennas[0]["antno"],
+            "rssi_max": str(antennas[0]["rssi"]), "antennas": antennas, "time": float(idx),
+        })
+    return records
+
+
+def _copy(records):
+    return [dict(record, antennas=[dict(ant) for ant in record["antennas"]]) for record in records]
+
+
+def test_unique_tags():
+    records = _records(2000)
+    expected = _unique_tags_reference(_copy(records))
+
+    aggregator = TagAggregator()
+    new_tids = aggregator.update(_copy(records))
+    assert(aggregator.tags() == expected)
+    assert(list(aggregator.tags()) == list(expected))
+    assert(sorted(new_tids) == sorted(expected))
+    assert(list(aggregator.tags()[new_tids[0]]) == list(expected[new_tids[0]]))
+
+    mode = FeigBufferRead(None, None)
+    assert(mode._unique_tags(_copy(records)) == expected)
+
+    current = [dict(ant) for ant in records[0]["antennas"]]
+    new = [dict(ant) for ant in records[1]["antennas"]]
+    assert(
+        mode._update_antennas([dict(ant) for ant in current], [dict(ant) for ant in new])
+        == _update_antennas_reference(current, new)
+    )
+
+
+def test_rssi_limits():
+    aggregator = TagAggregator({1: 50})
+    record = {"tid": "a", "epc": "b", "time": 1.0}
+    assert(not aggregator.add(dict(record, antennas=[{"antno": 1, "rssi": 60, "phase_angle": 0}])))
+    assert("a" not in aggregator)
+
+    assert(aggregator.add(dict(record, antennas=[
+        {"antno": 1, "rssi": 60, "phase_angle": 0},
+        {"antno": 2, "rssi": 60, "phase_angle": 10},
+    ])))
+    assert(aggregator.antennas("a") == [{"antno": 2, "rssi": 60, "phase_angle": 10}])
+
+    aggregator.annotate("a", ean="123")
+    assert(aggregator.tag("a")["ean"] == "123")
+    assert(aggregator.seen_count("a") == 1)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from itekfeig.common.feig_protocol import encode, FrameAssembler
+from itekfeig.interface.feig_async import (
+    AsyncFeigEthernet,
+    FeigNotificationServer,
+    buffer_read,
+)
+
+EPC = bytes(range(12))
+TID = bytes(range(0xE0, 0xE0 + 12))
+
+
+def _brm_payload(records):
+    # TR-DATA1 = IDD only
+    idd = bytes([0x30, 0x00]) + EPC + TID
+    record = bytes([0x84, 0x02, len(idd)]) + idd
+    record = bytes([0x00, len(record) + 2]) + record
+    return bytes([0x22, 0x00, 0x01, 0x00, records]) + record * records
+
+
+async def _fake_reader(reader, writer):
+    # answers every buffer read with 2 tags, every other command with OK
+    assembler = FrameAssembler()
+    while True:
+        data = await reader.read(4096)
+        if not data:
+            break
+        for frame in assembler.feed(data):
+            if frame[4] == 0x22:
+                writer.write(encode(_brm_payload(2)))
+            else:
+                writer.write(encode([frame[4], 0x00]))
+    writer.close()
+
+
+def test_async_ethernet():
+    async def main():
+        server = await asyncio.start_server(_fake_reader, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        interface = AsyncFeigEthernet()
+        assert(await interface.open("127.0.0.1", port))
+
+        # concurrent commands are serialized on one connection
+        results = await asyncio.gather(*[interface.transfer(1.0, [0x52, i]) for i in range(20)])
+        assert(results == [b"\x52\x00"] * 20)
+
+        reads = []
+        async for tags in buffer_read(interface):
+            reads.append(tags)
+            if len(reads) == 3:
+                break
+        assert([len(tags) for tags in reads] == [2, 2, 2])
+        assert(reads[0][0]["epc"] == EPC.hex())
+        assert(reads[0][0]["tid"] == TID.hex())
+
+        await interface.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(main())
+
+
+def test_notification_server():
+    async def main():
+        server = await FeigNotificationServer(0, ack=True, host="127.0.0.1").start()
+        port = server.sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        frame = encode(_brm_payload(3))
+        # one notification split, one corrupted, one complete
+        writer.write(frame[:10])
+        await writer.drain()
+        writer.write(frame[10:] + frame[:-1] + b"\x00" + frame)
+        await writer.drain()
+
+        first = await asyncio.wait_for(server.get(), 1.0)
+        second = await asyncio.wait_for(server.get(), 1.0)
+        assert(len(first[1]) == 3 and len(second[1]) == 3)
+
+        # every notification is acked with clear buffer
+        ack = await asyncio.wait_for(reader.readexactly(14), 1.0)
+        assert(ack == encode([0x32]) * 2)
+
+        writer.close()
+        await server.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from itekfeig.common.feig_base import FeigBase
+from itekfeig.common.feig_config_cache import ConfigCache
+from itekfeig.common.feig_errors import FeigError
+
+
+class _Reader:
+    """Interface answering reader info and configuration commands"""
+
+    def __init__(self, firmware=b"\x01\x02"):
+        self.firmware = firmware
+        self.pages = {addr: [addr] * 14 for addr in range(64)}
+        self.commands = []
+
+    def transfer(self, timeout, cmd):
+        self.commands.append(cmd[0])
+        if cmd[0] == 0x66:
+            if cmd[1] == 0x80:
+                return bytes([0x66, 0x00]) + bytes.fromhex("0011aabb") + bytes(4) + self.firmware + bytes(4)
+            return bytes([0x66, 0x00, cmd[1]])
+        if cmd[0] == 0x80:
+            return bytes([0x80, 0x00] + self.pages[cmd[1] - 0x80])
+        if cmd[0] == 0x81:
+            self.pages[cmd[1] - 0x80] = list(cmd[2:])
+            return bytes([0x81, 0x00])
+        return bytes([cmd[0], 0x80])
+
+
+class _Cache(ConfigCache):
+    """ConfigCache counting writes"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.stores = 0
+
+    def store(self, *args):
+        self.stores += 1
+        return super().store(*args)
+
+
+def _connect(reader, cache):
+    base = FeigBase()
+    base.config_cache = cache
+    base._interface = reader
+    return base
+
+
+def test_config_cache(tmp_path):
+    reader = _Reader()
+    cache = _Cache(str(tmp_path / "cache"))
+    base = _connect(reader, cache)
+    assert(base._check_config_cache() is False)
+    assert(base.read_config(1) == [1] * 14)
+    assert(base._read_reader_info(0x10) == bytes([0x10]))
+    assert(reader.commands == [0x66, 0x80, 0x66])
+
+    # pages read are written once
+    assert(cache.stores == 0)
+    base.save_config_cache()
+    base.save_config_cache()
+    assert(cache.stores == 1)
+
+    # same reader: served from memory
+    assert(base._check_config_cache() is True)
+    cfg = base.read_config(1)
+    cfg[0] = 0xFF  # caller's copy
+    assert(base.read_config(1) == [1] * 14)
+    assert(base.get_last_error() is FeigError.OK)
+    assert(reader.commands == [0x66, 0x80, 0x66, 0x66])
+
+    assert(base.write_config(2, [7] * 14))
+    assert(base.read_config(2) == [7] * 14)
+    assert(cache.stores == 2)
+
+    # next run: pages and reader info from disk
+    reader.commands = []
+    base = _connect(reader, cache)
+    assert(base._check_config_cache() is False)
+    assert(base.read_config(1) == [1] * 14)
+    assert(base.read_config(2) == [7] * 14)
+    assert(base._read_reader_info(0x10) == bytes([0x10]))
+    assert(reader.commands == [0x66])
+
+    # other firmware: read from reader again
+    reader.commands = []
+    base = _connect(_Reader(firmware=b"\x01\x03"), cache)
+    assert(base._check_config_cache() is False)
+    assert(base.read_config(2) == [2] * 14)
+    assert(base._interface.commands == [0x66, 0x80])
+
+    base.save_config_cache()
+    assert(cache.load("0011aabb", "0102") is None)
+    assert(cache.load("0011aabb", "0103")[1] == {2: [2] * 14})
+
+
+def test_config_cache_invalidate(tmp_path):
+    reader = _Reader()
+    cache = ConfigCache(str(tmp_path))
+    base = _connect(reader, cache)
+    base._check_config_cache()
+    assert(base.read_config(1) == [1] * 14)
+    base.save_config_cache()
+
+    # page changed by another tool
+    reader.pages[1] = [9] * 14
+    assert(base.read_config(1) == [1] * 14)
+    base.invalidate_config_cache()
+    assert(cache.load("0011aabb", "0102") is None)
+
+    reader.commands = []
+    assert(base.read_config(1) == [9] * 14)
+    assert(base.read_config(1) == [9] * 14)
+    assert(reader.commands == [0x80])
+    base.save_config_cache()
+    assert(cache.load("0011aabb", "0102")[1] == {1: [9] * 14})
+
+
+def test_config_cache_corrupt(tmp_path):
+    cache = ConfigCache(str(tmp_path))
+    (tmp_path / "0011aabb.json").write_text("{")
+    assert(cache.load("0011aabb", "0102") is None)
+    assert(cache.load("missing", "0102") is None)
+
+    assert(cache.store("0011aabb", "0102", {0x80: b"\x00"}, {1: [1, 2]}))
+    assert(cache.load("0011aabb", "0102") == ({0x80: b"\x00"}, {1: [1, 2]}))
+    cache.remove("0011aabb")
+    assert(cache.load("0011aabb", "0102") is None)
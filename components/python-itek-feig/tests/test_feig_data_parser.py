@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pickle
+
+from itekfeig.common.feig_data_parser import brm_and_notif_parser
+from itekfeig.common.feig_tag import TagRead, AntennaObservation
+
+EPC = bytes.fromhex("3000112233445566778899aa")
+TID = bytes.fromhex("e28011052000123456789abc")
+
+
+def _record(*fields):
+    record = b"".join(fields)
+    length = len(record) + 2
+    return bytes([length >> 8, length & 0xFF]) + record
+
+
+def _idd():
+    idd = bytes([(len(EPC) // 2) << 3, 0x00]) + EPC + TID
+    return bytes([0x84, 0x02, len(idd)]) + idd
+
+
+def _response(tr1, tr2, records):
+    head = bytes([tr1]) if tr2 is None else bytes([tr1, tr2])
+    return head + bytes([len(records) >> 8, len(records) & 0xFF]) + b"".join(records)
+
+
+def test_epc_tid():
+    tags = brm_and_notif_parser(_response(0x01, None, [_record(_idd())] * 3))
+    assert(len(tags) == 3)
+    assert(isinstance(tags[0], TagRead))
+    assert(list(tags[0]) == ["epc", "tid", "time"])
+    assert(tags[0]["epc"] == EPC.hex())
+    assert(tags[0]["tid"] == TID.hex())
+
+    assert(brm_and_notif_parser(bytes([0x01, 0x00, 0x00])) == [])
+
+
+def test_statistics_and_antennas():
+    record = _record(
+        _idd(),
+        bytes([0x02, 0x00, 0x05, 0xC0, 0xB8, 0x00, 0x00, 0x00]),  # antenna, statistics
+        bytes([0x02]),  # antenna extension
+        bytes([0x01, 0x40, 0x04, 0x00, 0x00, 0x00]),
+        bytes([0x02, 0x3A, 0x08, 0x00, 0x00, 0x00]),
+    )
+    data = _response(0x91, 0x18, [record, record])
+
+    for tags in (brm_and_notif_parser(data), brm_and_notif_parser(memoryview(data)), brm_and_notif_parser(bytearray(data))):
+        tag = tags[0]
+        assert(isinstance(tag, TagRead))
+        assert("antennas" in tag)
+        assert(tag["antno"] == 2)
+        assert(tag["tag_cnt"] == "5")
+        assert(tag["rssi_max"] == "192")
+        assert(tag["rssi_avg"] == "184")
+        assert(tag["antennas"] == [
+            {"antno": 1, "rssi": 0x40, "phase_angle": 90},
+            {"antno": 2, "rssi": 0x3A, "phase_angle": 180},
+        ])
+
+    # lazy record compares, copies and pickles like the dict it stands for
+    tags = brm_and_notif_parser(data)
+    expected = dict(tags[0].items())
+    expected["antennas"] = [dict(ant) for ant in expected["antennas"]]
+    assert(tags[1] == expected)
+    assert(tags[1] == tags[0])
+    assert(type(tags[1].copy()) is dict)
+    assert(pickle.loads(pickle.dumps(brm_and_notif_parser(data)[1]))["antennas"] == expected["antennas"])
+    assert(list(tags[1]) == ["epc", "tid", "antno", "tag_cnt", "rssi_max", "rssi_avg", "antennas", "time"])
+    assert(tags[1].rssi == 192)
+    assert(isinstance(tags[1].antennas[0], AntennaObservation))
+
+    tag = brm_and_notif_parser(data)[1]
+    assert(len(tag.pop("antennas")) == 2)
+    assert("antennas" not in tag)
+
+
+def test_lazy_fields():
+    record = _record(
+        _idd(),
+        bytes([0x00, 0x02, 0x04]) + bytes(range(8)),  # data blocks
+        bytes([0x00, 0x01, 0x02, 0x03]),  # time
+        bytes([0x16, 0x05, 0x19, 0x0C, 0x1E]),  # date
+        bytes([0x01]),  # antenna without statistics
+        bytes([0x00, 0x03]),  # input
+        bytes([0x00, 0x11, 0x22, 0x33, 0x44, 0x55]),  # mac
+    )
+    tag = brm_and_notif_parser(_response(0xF3, 0x03, [record]))[0]
+
+    assert(tag.raw("mac") == bytes([0x00, 0x11, 0x22, 0x33, 0x44, 0x55]))
+    assert(tag.raw("epc") == EPC)
+    assert(tag.get("missing") is None)
+    assert(tag["rtime"] == 0x00010203)
+    assert(tag["antno"] == 1)
+    assert(tag["data"] == "0001020304050607")
+    assert(tag["rdate"] == "1605190c1e")
+    assert(tag["input"] == "0003")
+    assert(tag["mac"] == "001122334455")
+    assert("antennas" not in tag)
+    assert(len(tag) == 9)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import socket
+import threading
+import time
+
+from itekfeig.common.feig_errors import FeigError
+from itekfeig.common.feig_protocol import encode, FrameAssembler
+from itekfeig.interface.feig_ethernet import FeigEthernet
+
+
+class _FakeReader(threading.Thread):
+    """Answers every command with a large response sent in small segments,
+    closes the connection after `close_after` commands
+    """
+
+    def __init__(self, payload, close_after=None):
+        super().__init__(daemon=True)
+        self.payload = payload
+        self.close_after = close_after
+        self.connections = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+
+    def run(self):
+        while True:
+            conn, _ = self.sock.accept()
+            self.connections += 1
+            self._serve(conn)
+            conn.close()
+
+    def _serve(self, conn):
+        assembler = FrameAssembler()
+        commands = 0
+        while True:
+            data = conn.recv(4096)
+            if not data:
+                return
+            for frame in assembler.feed(data):
+                response = encode(bytes([frame[4], 0x00]) + self.payload)
+                for idx in range(0, len(response), 500):
+                    conn.sendall(response[idx:idx + 500])
+                    time.sleep(0.001)
+                commands += 1
+                if commands == self.close_after:
+                    return
+
+
+def test_framed_receive():
+    payload = os.urandom(8000)
+    server = _FakeReader(payload)
+    server.start()
+
+    interface = FeigEthernet()
+    assert(interface.open("127.0.0.1", server.port))
+    for _ in range(5):
+        assert(interface.transfer(1.0, [0x22, 0x00, 0xFF]) == b"\x22\x00" + payload)
+
+    # late response of another command is skipped
+    interface._rxframes = [encode([0x31, 0x00])]
+    assert(interface.transfer(1.0, [0x22, 0x00, 0xFF]) == b"\x22\x00" + payload)
+    assert(interface.stale == 1)
+    interface.close()
+
+
+def test_reconnect():
+    server = _FakeReader(b"", close_after=1)
+    server.start()
+
+    interface = FeigEthernet()
+    assert(interface.open("127.0.0.1", server.port))
+    for _ in range(3):
+        assert(interface.transfer(1.0, [0x52, 0x00]) == b"\x52\x00")
+        time.sleep(0.05)  # reader closes connection
+
+    assert(interface.error is FeigError.OK)
+    assert(interface.reconnects == 2)
+    assert(server.connections == 3)
+    interface.close()
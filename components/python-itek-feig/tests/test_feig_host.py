@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from itekfeig.common.feig_errors import FeigError
+from itekfeig.common.feig_host import FeigHost, inventory_parser
+
+
+class _Reader:
+    """Interface answering inventory commands with given responses"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.commands = []
+
+    def transfer(self, timeout, cmd):
+        self.commands.append(cmd)
+        return self.responses.pop(0)
+
+
+EPC = bytes([0x30, 0x00]) + bytes.fromhex("e2003412012345678901abcd")
+TID = bytes.fromhex("e2801105")
+
+
+def _data_set(tr_type, iddib, idd, antennas=None):
+    data = bytearray()
+    if antennas is not None:
+        data.append(0x01)  # FLAGS
+    data += bytes([tr_type, iddib, len(idd)]) + idd
+    if antennas is not None:
+        data.append(len(antennas))
+        for ant_nr, rssi in antennas:
+            data += bytes([ant_nr, 0x00, rssi, 0x04, 0x00, 0x00, 0x00])
+    return bytes(data)
+
+
+def test_inventory_parser():
+    data = bytes([0xB0, 0x00, 3])
+    data += _data_set(0x84, 0x02, EPC + TID)
+    data += _data_set(0x84, 0x00, EPC)
+    data += _data_set(0xC2, 0x00, b"4006381333931")
+    tags = inventory_parser(data)
+    assert(tags == [
+        {"epc": "e2003412012345678901abcd", "tid": "e2801105"},
+        {"epc": "e2003412012345678901abcd", "tid": ""},
+        {"barcode": "4006381333931"},
+    ])
+
+    data = bytes([0xB0, 0x00, 2])
+    data += _data_set(0xC2, 0x00, b"12", antennas=[(1, 60)])
+    data += _data_set(0x84, 0x02, EPC + TID, antennas=[(1, 60), (2, 50)])
+    tags = inventory_parser(bytearray(data), antennas=True)
+    assert(tags[0]["barcode"] == "12")
+    assert(tags[1]["tid"] == "e2801105")
+    assert(tags[1]["antennas"] == [
+        {"antno": 1, "rssi": 60, "phase_angle": 90, "ant_stat": 0},
+        {"antno": 2, "rssi": 50, "phase_angle": 90, "ant_stat": 0},
+    ])
+
+    try:
+        inventory_parser(data[:-3], antennas=True)
+        assert(False)
+    except IndexError:
+        pass
+
+
+def test_inventory_more_data():
+    first = bytes([0xB0, 0x94, 1]) + _data_set(0x84, 0x02, EPC + TID, antennas=[(1, 60)])
+    last = bytes([0xB0, 0x00, 1]) + _data_set(0x84, 0x00, EPC, antennas=[(2, 50)])
+    reader = _Reader([first, last])
+    host = FeigHost(reader, FeigError.OK)
+
+    tags = host.inventory([1, 2])
+    assert([tag.antennas[0].antno for tag in tags] == [1, 2])
+    assert(reader.commands == [[0xB0, 0x01, 0x10, 0x03], [0xB0, 0x01, 0x90, 0x03]])
+    assert(host.get_last_error() is FeigError.OK)
+
+    host = FeigHost(_Reader([first[:-4]]), FeigError.OK)
+    assert(host.inventory([1, 2]) == [])
+    assert(host.get_last_error() is FeigError.INVALID_RESPONSE)
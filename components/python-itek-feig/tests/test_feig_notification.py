@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import queue
+import socket
+import time
+
+from itekfeig.common.feig_notification import FeigNotification, ACK
+from itekfeig.common.feig_protocol import encode
+
+
+class _Ethernet:
+    ID = "Ethernet"
+
+
+def _notification(records):
+    # TR-DATA1 = IDD only
+    idd = bytes([0x30, 0x00]) + bytes(range(12)) + bytes(range(0xE0, 0xEC))
+    record = bytes([0x84, 0x02, len(idd)]) + idd
+    record = bytes([0x00, len(record) + 2]) + record
+    return encode(bytes([0x22, 0x00, 0x01, 0x00, records]) + record * records)
+
+
+def _get(dq, count):
+    return [dq.get(timeout=1.0) for _ in range(count)]
+
+
+def test_notification_server():
+    dq = queue.Queue(3)
+    notification = FeigNotification(_Ethernet(), None)
+    assert(notification.start(0, dq, True))
+
+    readers = [socket.create_connection(("127.0.0.1", notification.port)) for _ in range(2)]
+    frame = _notification(2)
+
+    # persistent connection, frames split and merged in segments
+    readers[0].sendall(frame[:20])
+    time.sleep(0.05)
+    readers[0].sendall(frame[20:] + frame)
+    readers[1].sendall(b"\x02\x00" + frame)
+
+    items = _get(dq, 3)
+    assert(all(len(tags) == 2 for _, tags in items))
+
+    # every notification is acked in-line
+    readers[0].settimeout(1.0)
+    ack = b""
+    while len(ack) < 2 * len(ACK):
+        ack += readers[0].recv(64)
+    assert(ack == ACK * 2)
+
+    # bounded queue, overflow is counted per reader
+    for _ in range(5):
+        readers[1].sendall(frame)
+    time.sleep(0.2)
+    stats = notification.stats()["127.0.0.1"]
+    assert(stats["connections"] == 2)
+    assert(stats["notifications"] == 6)
+    assert(stats["dropped"] == 2)
+
+    for reader in readers:
+        reader.close()
+    notification.stop()
+    assert(notification.stats()["127.0.0.1"]["connections"] == 0)
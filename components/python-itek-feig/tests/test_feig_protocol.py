@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+from itekfeig.common.feig_protocol import *
+
+
+def _crc16_bitwise(data):
+    crc = 0xFFFF
+    for byte in data:
+        crc = crc ^ byte
+        for _ in range(0, 8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0x8408
+            else:
+                crc = crc >> 1
+    return crc
+
+
+def test_crc16():
+    # commands with known CRC used by buffer read mode
+    assert(crc16(bytes([0x02, 0x00, 0x07, 0xFF, 0x33])) == 0x56DD)
+    assert(crc16(bytes([0x02, 0x00, 0x09, 0xFF, 0x22, 0x00, 0xFF])) == 0x6979)
+    assert(crc16(b"") == 0xFFFF)
+
+    for length in (1, 2, 7, 255, 4096):
+        data = os.urandom(length)
+        assert(crc16(data) == _crc16_bitwise(data))
+        assert(crc16_table(data) == _crc16_bitwise(data))
+        assert(crc16(list(data)) == _crc16_bitwise(data))
+        assert(crc16(memoryview(data)) == _crc16_bitwise(data))
+        assert(crc16(data, length // 2) == _crc16_bitwise(data[:length // 2]))
+        assert(crc16_table(data, length // 2) == _crc16_bitwise(data[:length // 2]))
+
+
+def test_encode():
+    assert(encode([0x31]) == bytes([0x02, 0x00, 0x07, 0xFF, 0x31, 0xCF, 0x75]))
+    assert(encode([0x22, 0x00, 0xFF]) == bytes([0x02, 0x00, 0x09, 0xFF, 0x22, 0x00, 0xFF, 0x79, 0x69]))
+    assert(encode(b"\x22\x00\xFF") == encode([0x22, 0x00, 0xFF]))
+
+    packet = encode(list(range(256)) * 2)
+    assert(packet[1] * 256 + packet[2] == len(packet))
+
+
+def test_decode():
+    payload = bytes([0x22, 0x00]) + os.urandom(300)
+    packet = encode(payload)
+    assert(decode(packet) == payload)
+    assert(isinstance(decode(packet), bytes))
+    assert(decode(bytearray(packet)) == payload)
+    assert(bytes(decode(packet, view=True)) == payload)
+
+    corrupted = bytearray(packet)
+    corrupted[10] ^= 0x01
+    assert(decode(corrupted) is None)
+    assert(decode(b"\x03" + packet[1:]) is None)
+    assert(decode(packet[:6]) is None)
+
+
+def test_frame_assembler():
+    frames = [encode(bytes([0x22, 0x00]) + os.urandom(n)) for n in (0, 1, 50, 600)]
+    stream = b"\x00\x13" + frames[0] + frames[1] + b"\xFF" + frames[2] + frames[3]
+
+    # any chunk size gives the same frames
+    for chunk in (1, 3, 64, len(stream)):
+        assembler = FrameAssembler()
+        received = []
+        for idx in range(0, len(stream), chunk):
+            received += assembler.feed(stream[idx:idx + chunk])
+        assert(received == frames)
+        assert(len(assembler) == 0)
+        assert(assembler.discarded == 3)
+
+
+def test_frame_assembler_resync():
+    frame = encode([0x22, 0x00, 0xFF])
+
+    # corrupted frame is skipped, next frame is found
+    corrupted = bytearray(frame)
+    corrupted[5] ^= 0x01
+    assembler = FrameAssembler()
+    assert(assembler.feed(bytes(corrupted) + frame) == [frame])
+    assert(assembler.crc_errors == 1)
+
+    # invalid length is skipped
+    assembler = FrameAssembler(max_frame_length=1024)
+    assert(assembler.feed(b"\x02\xFF\xFF" + frame) == [frame])
+    assert(assembler.length_errors == 1)
+
+    # STX announcing a long frame waits till resync
+    assembler = FrameAssembler()
+    assert(assembler.feed(b"\x02\x10\x00" + frame) == [])
+    assert(len(assembler) == 3 + len(frame))
+    assert(assembler.resync() == [frame])
+    assert(len(assembler) == 0)
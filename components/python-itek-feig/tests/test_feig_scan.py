@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from itekfeig.common.feig_scan import ScanFrameReader
+
+EPC = "3036" + "1fad281e5557487b6d45"
+TID = "e2801105" + "2000723c1e2c0942"
+
+
+def _frame(epc=EPC, tid=TID, ant="01", header="0000"):
+    return (header + epc + tid + "," + ant + "\r\n").encode("ascii")
+
+
+class _Stream:
+    """Serial port with received bytes"""
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def in_waiting(self):
+        return len(self.data)
+
+    def read(self, size):
+        data, self.data = self.data[:size], self.data[size:]
+        return data
+
+
+def test_feed():
+    reader = ScanFrameReader()
+    assert(len(_frame()) == 57)
+
+    data = _frame() + _frame(ant="02") + _frame()
+    tags = reader.feed(data[:70])
+    assert(tags == [{"epc": EPC, "tid": TID, "antno": 1}])
+    assert(tags[0]["EPC"] == EPC)
+    assert(tags[0]["ANT"] == 1)
+
+    tags = reader.feed(data[70:])
+    assert([tag.antno for tag in tags] == [2, 1])
+    assert(reader.frames == 3)
+    assert(reader.malformed == 0)
+
+
+def test_malformed():
+    reader = ScanFrameReader()
+    data = _frame(ant="xx") + _frame()[:30] + b"\r\n" + b"\r\n" + _frame() + b"\xff" + _frame()[1:]
+    tags = reader.feed(data)
+    assert(len(tags) == 2)
+    assert(tags[1].epc == EPC)
+    assert(reader.stats() == {
+        "frames": 2,
+        "malformed_length": 1,
+        "malformed_antenna": 1,
+        "discarded_bytes": 0,
+    })
+
+    # no END at all
+    assert(reader.feed(_frame()[:-2] * 10) == [])
+    assert(reader.discarded_bytes == 550)
+
+
+def test_wrong_length():
+    reader = ScanFrameReader()
+    frame = _frame()
+    truncated = frame[:10] + frame[11:]  # lost one EPC byte
+    extra = frame[:10] + b"0" + frame[10:]
+    single = _frame(ant="1")
+    tags = reader.feed(truncated + frame + extra + single + frame)
+    assert([tag.epc for tag in tags] == [EPC, EPC])
+    assert(reader.malformed_length == 3)
+    assert(reader.malformed_antenna == 0)
+
+    # right length, SEP moved into the TID
+    moved = _frame(tid=TID[:-1], ant="001")
+    assert(len(moved) == len(frame))
+    assert(reader.feed(moved) == [])
+    # right length without CR
+    assert(reader.feed(frame[:-2] + b"0\n") == [])
+    assert(reader.malformed_length == 5)
+
+
+def test_lengths_and_read():
+    epc = EPC + "00000000"
+    stream = _Stream(_frame(epc=epc, tid=TID[:16], header="AB") * 100)
+    reader = ScanFrameReader(stream, epc_len=32, tid_len=16, header_len=2)
+    tags = reader.read()  # at most MAX_READ bytes
+    tags += reader.read()
+    assert(len(tags) == 100)
+    assert(tags[99].epc == epc)
+    assert(tags[99].tid == TID[:16])
+    assert(reader.read() == [])
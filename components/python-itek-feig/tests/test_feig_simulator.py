@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from itekfeig import LRU1002, MRU102
+from itekfeig.common.feig_errors import FeigError
+from itekfeig.interface.feig_replay import FeigReplayInterface
+from itekfeig.interface.feig_simulator import FeigSimulator, SimulatedTag, tag_population
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_connect_and_inventory():
+    tags = [
+        SimulatedTag("3000aa01", "e280bb", {1: 60, 2: 40}),
+        SimulatedTag("3000cc01", "e280dd", {2: 50}),
+    ]
+    reader = LRU1002()
+    assert(reader.connect(FeigSimulator(tags=tags, device_id="0011aabb"), None))
+    assert(reader.device_id() == "0011aabb")
+    assert(reader.antenna_power(reader.ANTENNA_No1) == 1000)
+    assert(hasattr(reader, "ScanMode"))
+
+    assert(reader.HostMode.inventory() == [
+        {"epc": "3000aa01", "tid": "e280bb"},
+        {"epc": "3000cc01", "tid": "e280dd"},
+    ])
+    tags = reader.HostMode.inventory([0x01])
+    assert(len(tags) == 1)
+    assert(tags[0]["antennas"] == [{"antno": 1, "rssi": 60, "phase_angle": 90, "ant_stat": 0}])
+
+    # wrong reader type
+    assert(MRU102().connect(FeigSimulator(tags=tags), None) is False)
+
+
+def test_buffer_read_rate_and_overflow():
+    clock = _Clock()
+    simulator = FeigSimulator(tags=tag_population(10, {1: 60, 3: 55}), rate=100, buffer_size=300, clock=clock)
+    reader = LRU1002()
+    assert(reader.connect(simulator, {}))
+    assert(reader.change_mode(reader.MODE_BRM))
+
+    mode = reader.BufferReadMode
+    assert(mode.read() == [])
+    assert(reader.get_last_error() is FeigError.NO_VALID_DATA)
+
+    clock.now = 1.0
+    tags = mode.read()
+    assert(len(tags) == 100)
+    assert(tags[0]["rssi_max"] == "60")
+    assert([ant["antno"] for ant in tags[0]["antennas"]] == [1, 3])
+    assert(len({tag["tid"] for tag in tags}) == 10)
+    assert(mode.clear())
+    assert(mode.info()["TableLength"] == 0)
+
+    # 500 reads, 300 kept
+    clock.now = 6.0
+    assert(len(mode.read()) == 255)
+    assert(reader.get_last_error() is FeigError.DATA_BUFFER_OVERFLOW)
+    assert(simulator.stats()["dropped"] == 200)
+
+
+def test_scheduler_overflow_backlog():
+    clock = _Clock()
+    simulator = FeigSimulator(tags=tag_population(10), rate=100, buffer_size=300, clock=clock)
+    reader = LRU1002()
+    assert(reader.connect(simulator, {}))
+    assert(reader.change_mode(reader.MODE_BRM))
+    scheduler = reader.BufferReadMode.scheduler(min_interval=0.001)
+
+    # overflow, 45 records left after the first read are read at once
+    clock.now = 6.0
+    assert(len(scheduler.poll()) == 255)
+    assert(scheduler.table_length == 300)
+    assert(scheduler.backlog == 45)
+    assert(scheduler._next_poll == 0.0)
+    assert(len(scheduler.poll()) == 45)
+    assert(scheduler.backlog == 0)
+    assert(scheduler._next_poll > 0.0)
+    assert(scheduler.poll() == [])
+
+    # overflow, everything read with first read
+    simulator.buffer_size = 100
+    clock.now = 12.0
+    assert(len(scheduler.poll()) == 100)
+    assert(scheduler.stats()["overflows"] == 2)
+    assert(scheduler.backlog == 0)
+    assert(scheduler._next_poll > 0.0)
+
+
+def test_record_and_replay(tmp_path):
+    capture = str(tmp_path / "capture.jsonl")
+    reader = LRU1002()
+    assert(reader.connect(FeigSimulator(tags=tag_population(300)), {"RECORD": capture}))
+    tags = reader.HostMode.inventory()
+    assert(len(tags) == 300)
+    reader.disconnect()
+
+    replay = FeigReplayInterface(capture)
+    reader = LRU1002()
+    assert(reader.connect(replay, None))
+    assert(reader.HostMode.inventory() == tags)
+    assert(replay.stats()["unknown"] == 0)
+
+    # not recorded
+    assert(reader.HostMode.inventory([0x01]) == [])
+    assert(reader.get_last_error() is FeigError.COMM_TIMEOUT)
+
+    replay = FeigReplayInterface([("6a00", "6a00")], loop=False)
+    assert(replay.transfer(1.0, [0x6A, 0x00]) == bytes([0x6A, 0x00]))
+    assert(replay.transfer(1.0, [0x6A, 0x00]) is None)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+from itekfeig.common.feig_base import FeigBase, FeigState
+from itekfeig.common.feig_buffer_read import FeigBufferRead
+from itekfeig.common.feig_errors import FeigError
+from itekfeig.common.feig_host import FeigHost
+
+
+class _Empty:
+    """Reader with empty buffer"""
+
+    def transfer(self, timeout, cmd):
+        return bytes([0x22, 0x92])
+
+
+class _Silent:
+    """Reader not answering"""
+
+    def transfer(self, timeout, cmd):
+        return None
+
+
+def test_modes_share_reader_state():
+    reader = FeigBase()
+    reader._interface = _Empty()
+
+    mode = FeigBufferRead(None, None, state=reader._state)
+    assert(mode._interface is reader._interface)
+    assert(mode.read() == [])
+    assert(reader.get_last_error() is FeigError.NO_VALID_DATA)
+
+    # without state a mode keeps its own
+    mode = FeigHost(_Silent(), FeigError.OK)
+    assert(mode.get_last_error() is FeigError.OK)
+    assert(reader.get_last_error() is FeigError.NO_VALID_DATA)
+    assert(isinstance(mode._state, FeigState))
+
+
+def test_readers_in_threads():
+    readers = []
+    for interface in (_Empty(), _Silent()):
+        reader = FeigBase()
+        reader._interface = interface
+        readers.append((reader, FeigBufferRead(None, state=reader._state)))
+
+    errors = {0: set(), 1: set()}
+
+    def run(idx):
+        reader, mode = readers[idx]
+        for _ in range(2000):
+            mode.read()
+            errors[idx].add(reader.get_last_error())
+
+    threads = [threading.Thread(target=run, args=(idx,)) for idx in errors]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert(errors[0] == {FeigError.NO_VALID_DATA})
+    assert(errors[1] == {FeigError.COMM_TIMEOUT})
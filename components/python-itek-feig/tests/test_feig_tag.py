@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import pickle
+
+from itekfeig.common.feig_tag import TagRead, AntennaObservation
+
+
+def test_antenna_observation():
+    ant = AntennaObservation(2, 60, 90)
+    assert(ant == {"antno": 2, "rssi": 60, "phase_angle": 90})
+    assert(ant["ant_no"] == 2)
+    assert(ant["angle"] == 90)
+    assert("ant_stat" not in ant)
+    assert(ant.get("ant_stat") is None)
+
+    ant["rssi"] = 50
+    assert(ant.rssi == 50)
+
+    ant = AntennaObservation(1, 60, 90, status=0)
+    assert(list(ant) == ["antno", "rssi", "phase_angle", "ant_stat"])
+    assert(pickle.loads(pickle.dumps(ant)) == ant)
+
+
+def test_tag_read():
+    tag = TagRead(epc="3000", tid="e280", antno=1, rssi=60, tag_cnt=3, time=1.0)
+    tag.antennas = [AntennaObservation(1, 60, 90)]
+
+    assert(list(tag) == ["epc", "tid", "antno", "tag_cnt", "rssi_max", "antennas", "time"])
+    assert(tag["rssi_max"] == "60")
+    assert(tag["tag_cnt"] == "3")
+    assert(tag["rssi"] == 60)
+    assert(tag["EPC"] == "3000")
+    assert(tag["TID"] == "e280")
+    assert(tag["ANT"] == tag["ant_no"] == 1)
+    assert("rssi_avg" not in tag)
+    assert("unknown" not in tag)
+    assert(tag.get("data", "none") == "none")
+
+    expected = {
+        "epc": "3000", "tid": "e280", "antno": 1, "tag_cnt": "3", "rssi_max": "60",
+        "antennas": [{"antno": 1, "rssi": 60, "phase_angle": 90}], "time": 1.0,
+    }
+    assert(tag == expected)
+    assert(json.loads(json.dumps(tag.as_dict(), default=dict)) == expected)
+    assert(pickle.loads(pickle.dumps(tag)) == tag)
+
+    tag["rssi_max"] = "55"
+    assert(tag.rssi == 55)
+    assert(tag.pop("time") == 1.0)
+    assert("time" not in tag)
+    assert(len(tag) == 6)
+
+    try:
+        tag["unknown"] = 1
+        assert(False)
+    except KeyError:
+        pass
+
+    try:
+        tag["time"]
+        assert(False)
+    except KeyError:
+        pass
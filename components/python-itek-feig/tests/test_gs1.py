@@ -19,3 +19,25 @@ def test_sgtin96_to_ean():
 
     with pytest.raises(SGTINDecodeError):
         assert(sgtin96_to_ean("00361fad281e5557487b6d45"))
+
+def test_sgtin96_decoder():
+    assert(sgtin96_decoder("30361fad281e5557487b6d45") == ("8907594", "031061", "100000296261"))
+    assert(gtin_check_digit("000000000000") == 0)
+    assert(gtin_check_digit("890759431061") == 9)
+
+    with pytest.raises(SGTINDecodeError):
+        sgtin96_decoder("303e1fad281e5557487b6d45")  # partition 7
+    with pytest.raises(SGTINDecodeError):
+        sgtin96_decoder("30361fad281e5557487b6d4500")
+
+
+def test_decode_many():
+    epcs = ["30361fad281e5557487b6d45", "00361fad281e5557487b6d45", "30zz", "30361fad281e5557487b6d46"]
+    assert(decode_many(epcs) == [
+        ("8907594310619", "100000296261"),
+        None,
+        None,
+        ("8907594310619", "100000296262"),
+    ])
+    assert(decode_many(epcs, cache=False) == decode_many(epcs))
+    assert(sgtin96_to_ean(epcs[0], cache=False) == sgtin96_to_ean(epcs[0]))
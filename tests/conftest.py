@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import itertools
+import logging
+import os
+import time
+
+import pytest
+
+from app.access_rules import NO_DATE
+from app.database import Database, DB_PATH
+
+
+@pytest.fixture(autouse=True)
+def _no_db_log(monkeypatch):
+    # keep tests out of application logs
+    monkeypatch.setattr(logging.getLogger("db"), "disabled", True)
+
+
+@pytest.fixture
+def make_database(tmp_path):
+    """Returns factory of Database objects on a database file in tmp_path"""
+    databases = []
+
+    def make(max_trans_count=100, max_vehicle_count=100, name="fastgate.sqlite3"):
+        settings = {
+            # Database joins db_path with application root path
+            "db_path": os.path.relpath(str(tmp_path / name), DB_PATH),
+            "max_trans_count": max_trans_count,
+            "max_vehicle_count": max_vehicle_count,
+        }
+        database = Database(settings)
+        databases.append(database)
+        return database
+
+    yield make
+
+    for database in databases:
+        database.close()
+
+
+def _windows():
+    """Access / block windows around current time, (dates, times, days)"""
+    now = time.localtime()
+    today = str(now.tm_wday + 1)
+    other_day = str((now.tm_wday + 1) % 7 + 1)
+    hour = (now.tm_hour + 2) % 24
+
+    dates = [
+        ("2000-01-01 00:00:00", "2099-12-31 00:00:00"),
+        ("2000-01-01 00:00:00", "2001-01-01 00:00:00"),
+        ("2098-01-01 00:00:00", "2099-12-31 00:00:00"),
+        (time.strftime("%Y-%m-%d 00:00:00", now), time.strftime("%Y-%m-%d 00:00:00", now)),
+        ("01-01-2000 00:00:00", "31-12-2099 00:00:00"),  # invalid format
+    ]
+    times = [
+        ("00:00:00", "23:59:59"),
+        ("{:02d}:00:00".format(hour), "{:02d}:59:59".format(hour)),
+        ("25:00:00", "26:00:00"),
+    ]
+    days = ["A", today, "{},{}".format(other_day, today), other_day, "0"]
+    return list(itertools.product(dates, times, days))
+
+
+@pytest.fixture
+def fleet_rows():
+    """UserList rows of every combination of access and block window"""
+    rows = []
+    windows = _windows()
+    access = windows + [((NO_DATE, NO_DATE), ("00:00:00", "00:00:00"), "A")]
+    block = windows + [((NO_DATE, NO_DATE), ("00:00:00", "00:00:00"), "0")]
+    for idx, (acc, blk) in enumerate(itertools.product(access, block)):
+        rows.append(
+            (idx, "TAG{}".format(idx), "None", "2022-01-01 00:00:00", "None", "None")
+            + acc[0] + acc[1] + (acc[2],) + blk[0] + blk[1] + (blk[2], 1)
+        )
+    return rows
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from app.access_engine import (
+    AccessEngine, TR_ACC1, TR_BLK1, TR_NDB1,
+    API_VEHICLE_ACCESS, API_SAVE_TRANSACTION_LIMIT, API_FLEET_ACCESS,
+)
+
+ALLOWED = {"tagId": "A", "fromDate": "2000-01-01 00:00:00", "toDate": "2099-12-31 00:00:00",
+           "fromTime": "00:00:00", "toTime": "23:59:59", "weekDay": "A"}
+BLOCKED = {"tagId": "B", "fromDate": "2000-01-01 00:00:00", "toDate": "2001-01-01 00:00:00",
+           "fromTime": "00:00:00", "toTime": "23:59:59", "weekDay": "A"}
+
+
+def test_decide(make_database):
+    database = make_database(max_trans_count=2)
+    database.add_user_vehicle([ALLOWED, BLOCKED])
+    engine = AccessEngine(database)
+
+    flag, row = engine.decide("A")
+    assert(flag == TR_ACC1)
+    assert(row[1] == "A")
+    assert(engine.decide("B")[0] == TR_BLK1)
+    assert(engine.decide("C") == (TR_NDB1, None))
+
+    for tag_id in ("A", "B", "C"):
+        engine.record(tag_id, "IN", engine.decide(tag_id)[0])
+    rows = database._pool.fetchall("SELECT TAG_ID, TR_FLAG FROM Transactions ORDER BY SR_NO")
+    assert(rows == [("B", TR_BLK1), ("C", TR_NDB1)])
+
+
+def test_fleet_access(make_database):
+    database = make_database()
+    database.add_user_vehicle([ALLOWED, BLOCKED])
+    engine = AccessEngine(database)
+
+    access = engine.fleet_access("2000-06-01 10:00:00")
+    assert(access["time"] == "2000-06-01 10:00:00")
+    assert(access["total"] == 2)
+    assert(access["allowed"] == ["A", "B"])
+    assert(engine.fleet_access()["denied"] == ["B"])
+
+    # matrix is rebuilt after the fleet changed
+    database.delete_user_vehicle(["B"])
+    assert(engine.fleet_access()["total"] == 1)
+
+
+def test_handle_api(make_database):
+    database = make_database()
+    database.add_user_vehicle([ALLOWED])
+    engine = AccessEngine(database)
+
+    response, status = engine.handle_api(API_VEHICLE_ACCESS, body="A")
+    assert(status == 200)
+    assert(response["data"][1] == "A")
+    assert(engine.handle_api(API_VEHICLE_ACCESS, body="C") == ({"data": []}, 201))
+
+    frame = {"tagid": "A", "ANT": "IN", "tr_flag": TR_ACC1, "limit": 5}
+    assert(engine.handle_api(API_SAVE_TRANSACTION_LIMIT, frame=frame)[1] == 200)
+    assert(engine.handle_api(API_SAVE_TRANSACTION_LIMIT, frame={"tagid": "A"})[1] == 400)
+    assert(database.get_count("Transactions") == 1)
+
+    assert(engine.handle_api(API_FLEET_ACCESS, frame={"at": "invalid"})[1] == 400)
+    assert(engine.handle_api("unknown")[1] == 404)
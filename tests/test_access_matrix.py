@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from app.access_matrix import AccessMatrix
+from app.access_rules import compile_rule, access_time, ALWAYS, NEVER
+from app.validation import Validator
+
+
+def test_matrix_matches_validator(fleet_rows):
+    fleet = fleet_rows
+    tag_ids = [row[1] for row in fleet]
+    matrix = AccessMatrix(tag_ids, [compile_rule(row) for row in fleet], version=3)
+    assert(len(matrix) == len(fleet))
+    assert(matrix.version == 3)
+
+    validator = Validator()
+    expected = [bool(validator.run(row)) for row in fleet]
+    now = access_time()
+    assert(matrix.evaluate(now).tolist() == expected)
+    assert(matrix.allowed(now) == [tag_id for tag_id, valid in zip(tag_ids, expected) if valid])
+
+
+def test_always_never():
+    matrix = AccessMatrix(["A", "N"], [ALWAYS, NEVER])
+    assert(matrix.evaluate().tolist() == [True, False])
+    assert(len(AccessMatrix([], [])) == 0)
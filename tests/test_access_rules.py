@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+
+from app.access_rules import compile_rule, access_time, ALWAYS, NEVER, NO_DATE
+from app.validation import Validator
+
+
+def test_rules_match_validator(fleet_rows):
+    validator = Validator()
+    now = access_time()
+    results = set()
+    for row in fleet_rows:
+        expected = validator.run(row)
+        assert(compile_rule(row).evaluate(now) == expected), row
+        results.add(expected)
+    # both outcomes are covered
+    assert(results == {True, False})
+
+
+def test_special_rules(fleet_rows):
+    row = fleet_rows[-1]
+    assert(row[6] == NO_DATE)
+    assert(compile_rule(row) is ALWAYS)
+    assert(compile_rule(row[:8]) is ALWAYS)
+    assert(compile_rule(row[:2]) is NEVER)
+    assert(compile_rule(list(row[:6]) + [[]] * 11) is NEVER)
+    assert(not Validator().run(row[:2]))
+
+
+def test_rules_shared(fleet_rows):
+    first = second = fleet_rows[0]
+    second = second[:1] + ("OTHER",) + second[2:]
+    assert(compile_rule(first) is compile_rule(second))
+
+
+def test_access_time(fleet_rows):
+    # 2022-06-16 10:30:15 local time, thursday
+    timestamp = time.mktime((2022, 6, 16, 10, 30, 15, 0, 0, -1))
+    now = access_time(timestamp)
+    assert(now.day_bit == 1 << 4)
+
+    row = fleet_rows[0][:6] + (
+        "2022-06-16 00:00:00", "2022-06-16 00:00:00", "10:30:15", "10:30:15", "4",
+        NO_DATE, NO_DATE, "00:00:00", "00:00:00", "0", 1,
+    )
+    rule = compile_rule(row)
+    assert(rule.evaluate(now))
+    assert(not rule.evaluate(access_time(timestamp + 1)))
+    assert(not rule.evaluate(access_time(timestamp + 24 * 3600)))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from app.database import Database
+
+
+def _srnos(database):
+    return [row[0] for row in database._pool.fetchall("SELECT SR_NO FROM Transactions ORDER BY SR_NO")]
+
+
+def _insert(database, count, gap=1):
+    with database._pool.transaction() as cursor:
+        for idx in range(count):
+            cursor.execute(
+                "INSERT INTO Transactions (SR_NO, TAG_ID, DATE_TIME, ANT_NAME, TR_FLAG) VALUES (?, ?, ?, ?, ?)",
+                (1000 + idx * gap, "TAG{}".format(idx), "2022-01-01 00:00:00", "IN", "Authorized"),
+            )
+
+
+def _as_version_1(database):
+    with database._pool.transaction() as cursor:
+        cursor.execute("DELETE FROM Config WHERE NAME = ?", (Database.SCHEMA_VERSION_NAME,))
+
+
+def test_new_database_version(make_database):
+    database = make_database()
+    assert(database.get_config_value(Database.SCHEMA_VERSION_NAME) == str(Database.SCHEMA_VERSION))
+
+
+def test_migrate_keeps_newest(make_database):
+    database = make_database(max_trans_count=10)
+    _as_version_1(database)
+    # old rotation deleted rows in between
+    _insert(database, 25, gap=3)
+
+    migrated = make_database(max_trans_count=10)
+    srnos = _srnos(migrated)
+    assert(len(srnos) == 10)
+    assert(srnos[-1] == 1000 + 24 * 3)
+    assert(srnos[0] == 1000 + 15 * 3)
+    assert(migrated.get_config_value(Database.SCHEMA_VERSION_NAME) == str(Database.SCHEMA_VERSION))
+
+    # migrated once
+    _insert(migrated, 5, gap=1)
+    assert(len(_srnos(make_database(max_trans_count=10))) == 15)
+
+
+def test_migrate_below_limit(make_database):
+    database = make_database(max_trans_count=10)
+    _as_version_1(database)
+    _insert(database, 4)
+    assert(len(_srnos(make_database(max_trans_count=10))) == 4)
+
+
+def test_rotate_keeps_limit(make_database):
+    database = make_database(max_trans_count=5)
+    for idx in range(12):
+        database.save_transaction_withLimit("TAG{}".format(idx), "IN", "Authorized", 5)
+        assert(len(_srnos(database)) == min(idx + 1, 5))
+    tags = database._pool.fetchall("SELECT TAG_ID FROM Transactions ORDER BY SR_NO")
+    assert([row[0] for row in tags] == ["TAG{}".format(idx) for idx in range(7, 12)])
+
+    # limit lowered
+    srnos = _srnos(database)
+    database.trim_transactions(3)
+    assert(_srnos(database) == srnos[-3:])
+
+
+def test_write_transactions_rotate(make_database):
+    database = make_database()
+    records = [("TAG{}".format(idx), "2022-01-01 00:00:00", "IN", "Authorized", 4) for idx in range(10)]
+    database.write_transactions(records[:6], spool_seq=6)
+    database.write_transactions(records[6:], spool_seq=10)
+    assert(len(_srnos(database)) == 4)
+    assert(database.get_config_value("txn_spool_seq") == "10")
+
+    # without limit nothing is rotated
+    database.write_transactions([record[:4] + (None,) for record in records])
+    assert(len(_srnos(database)) == 14)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+from app.db_pool import ConnectionManager
+
+
+def _in_thread(func):
+    thread = threading.Thread(target=func)
+    thread.start()
+    thread.join()
+
+
+def test_connection_per_thread(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "pool.db"))
+    with manager.transaction() as cursor:
+        cursor.execute("CREATE TABLE t (a INTEGER)")
+
+    conns = []
+    _in_thread(lambda: conns.append(manager.connection()))
+    assert(conns[0] is not manager.connection())
+    manager.close_all()
+
+
+def test_ended_threads_reuse_connection(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "pool.db"), max_idle=2)
+    with manager.transaction() as cursor:
+        cursor.execute("CREATE TABLE t (a INTEGER)")
+
+    conns = []
+
+    def insert():
+        with manager.transaction() as cursor:
+            cursor.execute("INSERT INTO t VALUES (?)", (1,))
+        conns.append(manager.connection())
+
+    for _ in range(20):
+        _in_thread(insert)
+
+    # main thread and one idle connection, used by every request thread
+    assert(len(manager._connections) == 2)
+    assert(len(set(map(id, conns))) == 1)
+    assert(manager.fetchone("SELECT COUNT(*) FROM t") == (20,))
+
+    # threads at the same time, idle connections above max_idle are closed
+    start = threading.Barrier(5)
+
+    def hold():
+        manager.connection()
+        start.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert(len(manager._idle) == 2)
+    assert(len(manager._connections) == 3)
+
+    manager.close()
+    assert(len(manager._connections) == 2)
+    manager.close_all()
+    assert(manager._connections == [])
+
+
+def test_ended_thread_rolls_back(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "pool.db"), max_idle=1)
+    with manager.transaction() as cursor:
+        cursor.execute("CREATE TABLE t (a INTEGER)")
+
+    def abandoned():
+        # transaction never ended by the thread
+        manager.connection().execute("INSERT INTO t VALUES (1)")
+
+    _in_thread(abandoned)
+    assert(manager.fetchone("SELECT COUNT(*) FROM t") == (0,))
+    _in_thread(lambda: manager.execute("INSERT INTO t VALUES (2)").connection.commit())
+    assert(manager.fetchone("SELECT COUNT(*) FROM t") == (1,))
+    manager.close_all()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from app.tag_index import TagIndex
+
+
+def _vehicle(tag_id, **fields):
+    frame = {
+        "tagId": tag_id,
+        "ownerName": "owner " + tag_id,
+        "fromDate": "2022-01-01",
+        "toDate": "2099-12-31",
+        "fromTime": "00:00:00",
+        "toTime": "23:59:59",
+        "weekDay": "A",
+    }
+    frame.update(fields)
+    return frame
+
+
+def _row(sr_no, tag_id, auth=1):
+    return (sr_no, tag_id, "owner", "2022-01-01 00:00:00", "None", "None",
+            "2022-01-01", "2099-12-31", "00:00:00", "23:59:59", "A",
+            "0000-00-00 00:00:00", "0000-00-00 00:00:00", "00:00:00", "00:00:00", "0", auth)
+
+
+def test_index():
+    index = TagIndex()
+    assert(not index.loaded)
+    index.load([_row(1, "A"), _row(2, "B")])
+    assert(index.loaded)
+    assert(len(index) == 2)
+    assert(index.get("A")[1] == "A")
+    assert(index.rule("B") is not None)
+    version = index.version
+
+    index.patch(["A", "C"], [_row(3, "C")])
+    assert("A" not in index)
+    assert(index.get("C")[0] == 3)
+    index.remove("B")
+    assert(index.rules()[1] == ["C"])
+    assert(index.version == version + 2)
+
+    # values shared by the fleet are stored once
+    index.put(_row(4, "D"))
+    assert(index.get("C")[6] is index.get("D")[6])
+
+    index.invalidate()
+    assert(not index.loaded)
+
+
+def test_database_changes(make_database):
+    database = make_database()
+    assert(database.add_user_vehicle([_vehicle("A"), _vehicle("B")]) == 1)
+    assert(database.vehicle_access("A")[0][2] == "owner A")
+    assert(database.access_rule("B") is not None)
+
+    database.update_user_vehicle([_vehicle("A", toDate="2022-06-30")])
+    assert(database.vehicle_access("A")[0][7] == "2022-06-30")
+
+    database.delete_user_vehicle(["B"])
+    assert(database.vehicle_access("B") == [])
+    assert(database.access_rule("B") is None)
+
+    # index is shared with other Database objects of the same file
+    other = make_database()
+    assert(other.vehicle_access("A")[0][7] == "2022-06-30")
+
+
+def test_failed_write_invalidates(make_database):
+    database = make_database()
+    database.add_user_vehicle([_vehicle("A")])
+    index = database._tag_index
+
+    # second vehicle has no tagId, transaction is rolled back
+    assert(database.add_user_vehicle([_vehicle("B"), {"ownerName": "nobody"}]) is None)
+    assert(not index.loaded)
+    assert(database.vehicle_access("B") == [])
+    assert(index.loaded)
+    assert(database.vehicle_access("A") != [])
+
+    database.update_user_vehicle([_vehicle("A", toDate="2022-06-30"), {"toDate": "2022-06-30"}])
+    assert(not index.loaded)
+    assert(database.vehicle_access("A")[0][7] == "2099-12-31")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from app.tag_pipeline import TagPipeline, DROP_OLDEST, DROP_NEWEST
+
+
+def test_fifo():
+    pipeline = TagPipeline(maxsize=4)
+    for tag in ("A", "B", "C"):
+        assert(pipeline.put(tag))
+    assert(len(pipeline) == 3)
+    assert([pipeline.get(0) for _ in range(3)] == ["A", "B", "C"])
+    assert(pipeline.get(timeout=0.01) is None)
+
+
+def test_drop_oldest():
+    pipeline = TagPipeline(maxsize=2, policy=DROP_OLDEST, put_timeout=0)
+    for tag in ("A", "B", "C"):
+        assert(pipeline.put(tag, key=tag))
+    assert(pipeline.get(0) == "B")
+    assert(pipeline.get(0) == "C")
+
+    # key of dropped tag is queued again
+    assert(pipeline.put("A", key="A"))
+    stats = pipeline.stats()
+    assert(stats["dropped"] == 1)
+    assert(stats["queued"] == 4)
+    assert(stats["max_depth"] == 2)
+
+
+def test_drop_newest():
+    pipeline = TagPipeline(maxsize=2, policy=DROP_NEWEST, put_timeout=0)
+    assert(pipeline.put("A", key="A"))
+    assert(pipeline.put("B", key="B"))
+    assert(not pipeline.put("C", key="C"))
+    assert(pipeline.get(0) == "A")
+    assert(pipeline.get(0) == "B")
+    assert(pipeline.stats()["dropped"] == 1)
+
+
+def test_coalesce():
+    pipeline = TagPipeline(maxsize=4)
+    assert(pipeline.put({"EPC": "A", "ANT": 1}, key="A"))
+    assert(not pipeline.put({"EPC": "A", "ANT": 2}, key="A"))
+    assert(pipeline.put({"EPC": "B", "ANT": 1}, key="B"))
+    # without key every read is queued
+    assert(pipeline.put({"EPC": "B", "ANT": 1}))
+    assert(len(pipeline) == 3)
+
+    # first read is kept
+    assert(pipeline.get(0) == {"EPC": "A", "ANT": 1})
+    # taken for decision, same key is queued again
+    assert(pipeline.put({"EPC": "A", "ANT": 2}, key="A"))
+    stats = pipeline.stats(reset=True)
+    assert(stats["coalesced"] == 1)
+    assert(stats["processed"] == 1)
+    assert(pipeline.stats()["coalesced"] == 0)
+
+
+def test_backpressure():
+    pipeline = TagPipeline(maxsize=1, policy=DROP_NEWEST, put_timeout=5.0)
+    pipeline.put("A")
+    consumer = threading.Timer(0.05, pipeline.get)
+    consumer.start()
+    # waits for the consumer instead of dropping
+    assert(pipeline.put("B"))
+    consumer.join()
+    assert(pipeline.get(0) == "B")
+    assert(pipeline.stats()["dropped"] == 0)
+
+
+def test_clear_and_arguments():
+    pipeline = TagPipeline(maxsize=2)
+    pipeline.put("A", key="A")
+    pipeline.clear()
+    assert(len(pipeline) == 0)
+    assert(pipeline.put("A", key="A"))
+
+    with pytest.raises(ValueError):
+        TagPipeline(maxsize=0)
+    with pytest.raises(ValueError):
+        TagPipeline(policy="drop_all")
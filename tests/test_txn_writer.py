@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+
+from app.txn_writer import TransactionWriter, SPOOL_SEQ_NAME
+
+
+def _tag_ids(database):
+    return [row[0] for row in database._pool.fetchall("SELECT TAG_ID FROM Transactions ORDER BY SR_NO")]
+
+
+def test_group_commit_and_flush(make_database):
+    database = make_database()
+    writer = TransactionWriter(database, batch_size=64, flush_interval=30.0)
+    writer.start()
+    database.attach_writer(writer)
+
+    for idx in range(3):
+        database.save_transaction("TAG{}".format(idx), "IN", "Authorized")
+    assert(os.path.getsize(writer._spool_path) > 0)
+
+    # commits now, not after flush_interval
+    start = time.monotonic()
+    assert(writer.flush(timeout=5.0))
+    assert(time.monotonic() - start < 5.0)
+    assert(_tag_ids(database) == ["TAG0", "TAG1", "TAG2"])
+    assert(database.get_config_value(SPOOL_SEQ_NAME) == "3")
+    assert(writer.stats() == {"pending": 0, "written": 3, "commits": 1, "errors": 0})
+
+    # everything is in database, spool is truncated
+    assert(os.path.getsize(writer._spool_path) == 0)
+    assert(writer.flush(timeout=0))
+
+    writer.close()
+    assert(not writer.put("TAG9", "2022-01-01 00:00:00", "IN", "Authorized"))
+
+
+def test_batch_size(make_database):
+    database = make_database()
+    writer = TransactionWriter(database, batch_size=4, flush_interval=30.0)
+    writer.start()
+    for idx in range(8):
+        writer.put("TAG{}".format(idx), "2022-01-01 00:00:00", "IN", "Authorized")
+
+    # two full batches are written without flush
+    deadline = time.monotonic() + 5.0
+    while writer.stats()["written"] < 8 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert(writer.stats()["commits"] == 2)
+    writer.close()
+
+
+def test_spool_replay(make_database):
+    database = make_database()
+    writer = TransactionWriter(database)
+
+    # previous run crashed after commit of sequence 3, 4 and 5 only in spool
+    with database._pool.transaction() as cursor:
+        database._set_config(cursor, SPOOL_SEQ_NAME, 3)
+    with open(writer._spool_path, "w") as spool:
+        for seq in range(1, 6):
+            spool.write(json.dumps([seq, "TAG{}".format(seq), "2022-01-01 00:00:00", "IN", "Authorized", None]) + "\n")
+        spool.write('[6, "TAG6", "2022-')  # interrupted write
+
+    writer.start()
+    assert(writer.flush(timeout=5.0))
+    assert(_tag_ids(database) == ["TAG4", "TAG5"])
+    assert(os.path.getsize(writer._spool_path) == 0)
+
+    # sequence continues after the replayed records
+    writer.put("TAG7", "2022-01-01 00:00:00", "IN", "Authorized")
+    writer.close()
+    assert(_tag_ids(database) == ["TAG4", "TAG5", "TAG7"])
+    assert(database.get_config_value(SPOOL_SEQ_NAME) == "6")
+
+
+def test_committed_spool_truncated_on_start(make_database):
+    database = make_database()
+    writer = TransactionWriter(database)
+    with database._pool.transaction() as cursor:
+        database._set_config(cursor, SPOOL_SEQ_NAME, 2)
+    with open(writer._spool_path, "w") as spool:
+        for seq in range(1, 3):
+            spool.write(json.dumps([seq, "TAG{}".format(seq), "2022-01-01 00:00:00", "IN", "Authorized", None]) + "\n")
+
+    writer.start()
+    assert(os.path.getsize(writer._spool_path) == 0)
+    assert(_tag_ids(database) == [])
+    writer.close()
+
+
+def test_rotation_limit(make_database):
+    database = make_database(max_trans_count=5)
+    writer = TransactionWriter(database, batch_size=3, flush_interval=30.0)
+    writer.start()
+    database.attach_writer(writer)
+    for idx in range(12):
+        database.save_transaction_withLimit("TAG{}".format(idx), "IN", "Authorized", 5)
+    writer.close()
+    assert(_tag_ids(database) == ["TAG{}".format(idx) for idx in range(7, 12)])